@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Validation and field-level repair of generated articles
+
+LLM output is often not quite the requested JSON: cut off at the token
+limit, unescaped newlines in strings, a missing excerpt, an SEO title twice
+the allowed length. Throwing it away means paying for the whole 2000-token
+article again. Instead:
+
+1. salvage_article() recovers every field it can, from valid JSON, from
+   broken JSON field by field, or from plain text as the content.
+2. check_article() compares the fields with ARTICLE_SCHEMA. Too-long values
+   are trimmed and the category and sources are normalised locally.
+3. Missing or too-short fields are asked for in one short follow-up
+   prompt (title and an extract of the content in, a small JSON object out).
+   What is still missing after MAX_REPAIR_ROUNDS is derived from the
+   content where possible.
+
+Only an article without usable content, or still without a title after the
+repair, is rejected (ArticleValidationError). RepairStats counts the
+repairs, their time and their tokens for the run report.
+
+Usage:
+    python scripts/article_schema.py check response.txt
+"""
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from content_quality import count_words
+from records import NewsItem
+
+logger = logging.getLogger(__name__)
+
+# Articles shorter than this are not worth repairing
+MIN_CONTENT_WORDS = 100
+MAX_REPAIR_ROUNDS = 2
+# Characters of the article body shown to the repair prompt
+REPAIR_CONTEXT_CHARS = 1500
+CATEGORIES = ('Cricket', 'iGaming')
+
+LANGUAGE_NAMES = {'en': 'English', 'hi': 'Hindi', 'zh': 'Simplified Chinese'}
+
+TAG_RE = re.compile(r'<[^>]+>')
+WHITESPACE_RE = re.compile(r'\s+')
+# "field": "value — the closing quote may be missing when the output was cut off
+STRING_FIELD_RE = r'"{name}"\s*:\s*"((?:[^"\\]|\\.)*)("?)'
+LIST_FIELD_RE = r'"{name}"\s*:\s*\[([^\]]*)\]?'
+QUOTED_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+class ArticleValidationError(ValueError):
+    """The response has no usable article content or title"""
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Length limits for one text field and how the repair prompt asks for it"""
+    name: str
+    description: str
+    min_chars: int
+    max_chars: int
+    # Tokens the repair prompt allows for this field
+    repair_tokens: int
+
+
+ARTICLE_SCHEMA = (
+    FieldSpec('title', 'Article title', 5, 150, 40),
+    FieldSpec('excerpt', 'Brief summary (150 chars)', 20, 300, 80),
+    FieldSpec('seo_title', 'SEO title (60 chars)', 5, 70, 40),
+    FieldSpec('seo_description', 'Meta description (160 chars)', 20, 170, 80),
+)
+SCHEMA_FIELDS = {spec.name: spec for spec in ARTICLE_SCHEMA}
+
+
+# Salvage
+
+def _unescape(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        # A dangling backslash from a cut-off string, or an invalid escape
+        return raw.rstrip('\\').replace('\\"', '"').replace('\\n', '\n')
+
+
+def _field_by_field(text: str) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for name in ('title', 'excerpt', 'content', 'seo_title', 'seo_description', 'category'):
+        match = re.search(STRING_FIELD_RE.format(name=name), text)
+        if match:
+            data[name] = _unescape(match.group(1))
+    match = re.search(LIST_FIELD_RE.format(name='sources'), text)
+    if match:
+        data['sources'] = [_unescape(value) for value in QUOTED_RE.findall(match.group(1))]
+    return data
+
+
+def salvage_article(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Recover article fields from an LLM response
+
+    Returns:
+        (fields, how) where how is 'json', 'partial' or 'text'
+    """
+    start = text.find('{')
+    if start >= 0:
+        end = text.rfind('}')
+        if end > start:
+            try:
+                data = json.loads(text[start:end + 1], strict=False)
+                if isinstance(data, dict):
+                    return data, 'json'
+            except json.JSONDecodeError:
+                pass
+        data = _field_by_field(text[start:])
+        if data:
+            return data, 'partial'
+
+    # No JSON at all: the text is the article, a leading heading its title
+    lines = text.strip().split('\n', 1)
+    data = {'content': text.strip()}
+    if lines[0].startswith('#') and len(lines) > 1:
+        data = {'title': lines[0].strip('#').strip(), 'content': lines[1].strip()}
+    return data, 'text'
+
+
+# Validation
+
+def _trim(value: str, max_chars: int) -> str:
+    """Cut at a word boundary"""
+    if len(value) <= max_chars:
+        return value
+    cut = value[:max_chars - 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:-') + '…'
+
+
+def plain_text(html: str) -> str:
+    return WHITESPACE_RE.sub(' ', TAG_RE.sub(' ', html)).strip()
+
+
+def check_article(data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Normalise fields in place and report the ones that need the LLM
+
+    Returns:
+        field -> problem ('missing', 'too short'), for schema fields only
+
+    Raises:
+        ArticleValidationError: the content itself is missing or too short
+    """
+    content = data.get('content')
+    if not isinstance(content, str) or count_words(plain_text(content)) < MIN_CONTENT_WORDS:
+        words = count_words(plain_text(content)) if isinstance(content, str) else 0
+        raise ArticleValidationError(f"article content has {words} words, need {MIN_CONTENT_WORDS}")
+
+    category = str(data.get('category') or '').strip().lower()
+    data['category'] = next((name for name in CATEGORIES if name.lower() in category), CATEGORIES[1])
+
+    sources = data.get('sources')
+    if isinstance(sources, str):
+        sources = [sources]
+    data['sources'] = [value for value in sources or [] if isinstance(value, str) and value.strip()]
+
+    problems = {}
+    for spec in ARTICLE_SCHEMA:
+        value = data.get(spec.name)
+        value = WHITESPACE_RE.sub(' ', plain_text(value)) if isinstance(value, str) else ''
+        if not value:
+            problems[spec.name] = 'missing'
+        elif len(value) < spec.min_chars:
+            problems[spec.name] = 'too short'
+        else:
+            value = _trim(value, spec.max_chars)
+        data[spec.name] = value
+    return problems
+
+
+def derive_missing(data: Dict[str, Any], problems: Dict[str, str]) -> Dict[str, str]:
+    """Last resort for fields the repair did not fix; returns what is still missing"""
+    text = plain_text(data['content'])
+    fallbacks = {
+        'excerpt': lambda: _trim(text, 150),
+        'seo_title': lambda: _trim(data['title'], SCHEMA_FIELDS['seo_title'].max_chars) if 'title' not in problems else '',
+        'seo_description': lambda: _trim(data['excerpt'] or text, SCHEMA_FIELDS['seo_description'].max_chars),
+    }
+    for name in ('excerpt', 'seo_title', 'seo_description'):
+        if name in problems:
+            value = fallbacks[name]()
+            if value:
+                data[name] = value
+                del problems[name]
+    return problems
+
+
+# Repair
+
+def repair_prompt(data: Dict[str, Any], problems: Dict[str, str], language: str) -> Tuple[str, int]:
+    """A prompt for just the fields in `problems`, and its token allowance"""
+    wanted = {name: SCHEMA_FIELDS[name].description for name in problems}
+    context = plain_text(data['content'])[:REPAIR_CONTEXT_CHARS]
+    title = data.get('title') if 'title' not in problems else ''
+    prompt = (
+        f"Here is a blog article{f' titled {title!r}' if title else ''}:\n\n{context}\n\n"
+        f"Write the following fields for it in {LANGUAGE_NAMES.get(language, language)}. "
+        f"Reply with only a JSON object with exactly these keys:\n"
+        f"{json.dumps(wanted, ensure_ascii=False, indent=2)}"
+    )
+    return prompt, sum(SCHEMA_FIELDS[name].repair_tokens for name in problems) + 20
+
+
+class RepairStats:
+    """Counts of salvaged and repaired articles, with repair time and tokens"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.salvaged = 0
+        self.repaired = 0
+        self.rejected = 0
+        self.requests = 0
+        self.seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.fields: Counter = Counter()
+
+    def add(self, **counts: Any) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                if name == 'fields':
+                    self.fields.update(value)
+                else:
+                    setattr(self, name, getattr(self, name) + value)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'checked': self.checked,
+            'salvaged': self.salvaged,
+            'repaired': self.repaired,
+            'rejected': self.rejected,
+            'requests': self.requests,
+            'seconds': round(self.seconds, 2),
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'fields': dict(self.fields),
+        }
+
+    def log_report(self) -> None:
+        if self.requests or self.salvaged or self.rejected:
+            logger.info(
+                f"Article checks: {self.checked} checked, {self.salvaged} salvaged, {self.repaired} repaired "
+                f"({self.requests} requests, {self.seconds:.1f}s, "
+                f"{self.prompt_tokens}+{self.completion_tokens} tokens), {self.rejected} rejected"
+            )
+
+
+# Sends a prompt with a token limit; returns (text, prompt tokens, completion tokens)
+CompleteFn = Callable[[str, int], Tuple[str, int, int]]
+
+
+def validate_article(
+    text: str,
+    news_items: List[NewsItem],
+    language: str,
+    complete: Optional[CompleteFn],
+    stats: RepairStats,
+) -> Dict[str, Any]:
+    """
+    Article fields from an LLM response, repaired where needed
+
+    Args:
+        complete: Cheap follow-up request for missing fields; None to only
+            salvage and derive locally
+
+    Raises:
+        ArticleValidationError: no usable content, or no title after repair
+    """
+    data, how = salvage_article(text)
+    stats.add(checked=1, salvaged=int(how != 'json'))
+    if how != 'json':
+        logger.info(f"Salvaged article fields from {how} output: {', '.join(sorted(data))}")
+    try:
+        problems = check_article(data)
+    except ArticleValidationError:
+        stats.add(rejected=1)
+        raise
+
+    if problems and complete is not None:
+        stats.add(repaired=1)
+    for _ in range(MAX_REPAIR_ROUNDS if complete is not None else 0):
+        if not problems:
+            break
+        prompt, max_tokens = repair_prompt(data, problems, language)
+        logger.info(f"Repairing article fields: {', '.join(f'{name} ({why})' for name, why in problems.items())}")
+        started = time.perf_counter()
+        try:
+            reply, prompt_tokens, completion_tokens = complete(prompt, max_tokens)
+        except Exception as e:
+            # Includes an exhausted run deadline; fall back to what can be derived
+            logger.warning(f"Field repair request failed: {e}")
+            stats.add(requests=1, seconds=time.perf_counter() - started)
+            break
+        stats.add(
+            requests=1,
+            seconds=time.perf_counter() - started,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+        fixed, _ = salvage_article(reply)
+        for name in problems:
+            if isinstance(fixed.get(name), str) and fixed[name].strip():
+                data[name] = fixed[name]
+        before = set(problems)
+        problems = {name: why for name, why in check_article(data).items() if name in before}
+        stats.add(fields=before - set(problems))
+
+    problems = derive_missing(data, problems)
+    if problems:
+        stats.add(rejected=1)
+        raise ArticleValidationError(f"article fields still invalid: {', '.join(problems)}")
+
+    data['sources'] = list(data['sources']) + [item.url for item in news_items]
+    return data
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != 'check':
+        print(__doc__)
+        return 1
+
+    with open(sys.argv[2], 'r', encoding='utf-8') as f:
+        text = f.read()
+    data, how = salvage_article(text)
+    print(f"Parsed as {how}: {', '.join(sorted(data)) or 'nothing'}")
+    try:
+        problems = check_article(data)
+    except ArticleValidationError as e:
+        print(f"Rejected: {e}")
+        return 1
+    for name, why in problems.items():
+        print(f"  {name}: {why}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
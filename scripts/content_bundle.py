@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Packed content bundle for tooling readers on the generating host
+
+Instead of opening thousands of index.mdx files, readers map one file:
+
+    <bundle_dir>/posts.bundle      MDX documents back to back (append-only)
+    <bundle_dir>/posts.index.json  slug -> offset, length, sha256, source path
+
+ContentPublisher appends every indexable post as it is published; a
+re-published post is appended again and its old bytes become dead space.
+The bundle is compacted (live records rewritten in slug order) once dead
+bytes outweigh live ones, or on demand. BundleReader gives random access by
+slug through a read-only mmap, with no per-post file opens.
+
+The bundle is a host-local cache under <cache_dir>/bundle (gitignored), not
+a build input: the site build and CI read src/content directly and never
+see it, and on a fresh runner it holds only the posts published there since
+the cache was created. Run `rebuild` to fill it from the content tree before
+relying on it for the whole archive.
+
+Writers in several processes take the index's lock and reload the index
+before appending, so each append starts at the bundle's real end instead of
+truncating another process's records. Readers do not lock: compaction and
+rebuilds write a new bundle file and swap it in, and the index records the
+inode of the bundle it describes, so an open BundleReader notices the swap,
+reloads the index and maps the new file (its old mapping stays valid until
+then).
+
+Usage:
+    python scripts/content_bundle.py rebuild
+    python scripts/content_bundle.py verify [--repair]
+    python scripts/content_bundle.py compact
+    python scripts/content_bundle.py get 2025-12-29-ipl-2025-team-squads
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from content_files import atomic_write, iter_post_files, split_frontmatter
+from file_locks import file_lock
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FILE = 'posts.bundle'
+INDEX_FILE = 'posts.index.json'
+BUNDLE_VERSION = 1
+# How long a reader waits for a compaction to save the index of the file it swapped in
+MAP_ATTEMPTS = 100
+MAP_RETRY_INTERVAL = 0.01
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ContentBundle:
+    """Writer side: appends, removals, compaction and verification"""
+
+    def __init__(self, bundle_dir: Path):
+        self.dir = Path(bundle_dir)
+        self.bundle_path = self.dir / BUNDLE_FILE
+        self.index_path = self.dir / INDEX_FILE
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.size = 0
+        self.dead_bytes = 0
+        # Inode of the bundle file the entries describe
+        self.inode: Optional[int] = None
+        self._load()
+
+    def _load(self) -> None:
+        self.entries = {}
+        self.size = 0
+        self.dead_bytes = 0
+        self.inode = None
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != BUNDLE_VERSION:
+            logger.warning(f"Ignoring bundle index version {data.get('version')}, rebuild required")
+            return
+        self.entries = data['entries']
+        self.size = data['size']
+        self.dead_bytes = data['dead_bytes']
+        self.inode = data.get('inode')
+
+    def _save(self) -> None:
+        try:
+            self.inode = os.stat(self.bundle_path).st_ino
+        except FileNotFoundError:
+            self.inode = None
+        data = {
+            'version': BUNDLE_VERSION,
+            'size': self.size,
+            'dead_bytes': self.dead_bytes,
+            'inode': self.inode,
+            'entries': self.entries,
+        }
+        atomic_write(self.index_path, json.dumps(data, sort_keys=True, ensure_ascii=False) + '\n')
+
+    @property
+    def live_bytes(self) -> int:
+        return self.size - self.dead_bytes
+
+    def _append(self, f, slug: str, source: Path, data: bytes) -> None:
+        previous = self.entries.get(slug)
+        if previous:
+            self.dead_bytes += previous['length']
+        f.write(data)
+        self.entries[slug] = {'offset': self.size, 'length': len(data), 'sha256': _sha256(data), 'path': str(source)}
+        self.size += len(data)
+
+    def _open_for_append(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        f = open(self.bundle_path, 'ab')
+        # Anything past the indexed size is a torn append from a crash
+        f.truncate(self.size)
+        return f
+
+    @contextmanager
+    def _replacement(self) -> Iterator[BinaryIO]:
+        """A new bundle file, swapped in for the current one when the block succeeds"""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=f'.{BUNDLE_FILE}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.bundle_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put(self, slug: str, source: Path, force: bool = False) -> None:
+        """Append the current content of a post file"""
+        data = Path(source).read_bytes()
+        with file_lock(self.index_path):
+            self._load()
+            previous = self.entries.get(slug)
+            if not force and previous and previous['sha256'] == _sha256(data) and previous['path'] == str(source):
+                return
+
+            with self._open_for_append() as f:
+                self._append(f, slug, source, data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._save()
+            self._maybe_compact()
+
+    def remove(self, slug: str) -> None:
+        with file_lock(self.index_path):
+            self._load()
+            previous = self.entries.pop(slug, None)
+            if previous is None:
+                return
+            self.dead_bytes += previous['length']
+            self._save()
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if self.dead_bytes > max(self.live_bytes, 1 << 20):
+            self._compact()
+
+    def compact(self) -> int:
+        """Rewrite live records back to back; returns bytes reclaimed"""
+        with file_lock(self.index_path):
+            self._load()
+            return self._compact()
+
+    def _compact(self) -> int:
+        reclaimed = self.dead_bytes
+        entries: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+
+        with self._replacement() as out, BundleReader(self.dir, self) as reader:
+            for slug in sorted(self.entries):
+                data = reader.get_bytes(slug)
+                out.write(data)
+                entries[slug] = dict(self.entries[slug], offset=offset)
+                offset += len(data)
+
+        self.entries = entries
+        self.size = offset
+        self.dead_bytes = 0
+        self._save()
+        logger.info(f"Compacted bundle: {len(entries)} posts, {reclaimed} bytes reclaimed")
+        return reclaimed
+
+    def rebuild(self, content_dir: Path) -> int:
+        """Re-create the bundle from the MDX files on disk"""
+        with file_lock(self.index_path):
+            self.entries = {}
+            self.size = 0
+            self.dead_bytes = 0
+            with self._replacement() as f:
+                for path in iter_post_files(Path(content_dir)):
+                    self._append(f, path.parent.name, path, path.read_bytes())
+            self._save()
+        return len(self.entries)
+
+    def verify(self, content_dir: Path, repair: bool = False) -> Dict[str, List[str]]:
+        """
+        Compare the bundle against the MDX files on disk
+
+        Returns:
+            Slugs that are missing from the bundle, stale (file changed),
+            orphaned (file gone) or corrupt (bundle bytes do not match hash)
+        """
+        report: Dict[str, List[str]] = {'missing': [], 'stale': [], 'orphaned': [], 'corrupt': []}
+        on_disk = {path.parent.name: path for path in iter_post_files(Path(content_dir))}
+
+        with BundleReader(self.dir, self) as reader:
+            for slug, entry in self.entries.items():
+                if slug not in on_disk:
+                    report['orphaned'].append(slug)
+                elif _sha256(reader.get_bytes(slug)) != entry['sha256']:
+                    report['corrupt'].append(slug)
+
+        for slug, path in on_disk.items():
+            entry = self.entries.get(slug)
+            if entry is None:
+                report['missing'].append(slug)
+            elif slug not in report['corrupt'] and (
+                entry['path'] != str(path) or _sha256(path.read_bytes()) != entry['sha256']
+            ):
+                report['stale'].append(slug)
+
+        if repair:
+            for slug in report['orphaned']:
+                self.remove(slug)
+            for slug in report['missing'] + report['stale'] + report['corrupt']:
+                self.put(slug, on_disk[slug], force=True)
+
+        return report
+
+
+class BundleReader:
+    """Read-only random access to bundled posts through mmap"""
+
+    def __init__(self, bundle_dir: Path, bundle: Optional[ContentBundle] = None):
+        self.bundle = bundle or ContentBundle(bundle_dir)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        # Inode of the mapped file, and identity of the index last loaded
+        self._inode: Optional[int] = None
+        self._index_key: Optional[Tuple[int, int, int]] = None
+        self._remap()
+
+    def _reload_index(self) -> None:
+        """Pick up an index a writer replaced since it was loaded"""
+        try:
+            stat = os.stat(self.bundle.index_path)
+        except FileNotFoundError:
+            return
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key != self._index_key:
+            self.bundle._load()
+            self._index_key = key
+
+    def _remap(self) -> None:
+        """Map the bundle file the current index describes"""
+        self.close()
+        path = self.bundle.bundle_path
+        for _ in range(MAP_ATTEMPTS):
+            self._reload_index()
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                return
+            stat = os.fstat(f.fileno())
+            # Indexes written before inodes were recorded have none
+            if self.bundle.inode in (None, stat.st_ino):
+                self._file = f
+                self._inode = stat.st_ino
+                if stat.st_size:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return
+            # Swapped in by a compaction that has not saved its index yet
+            f.close()
+            time.sleep(MAP_RETRY_INTERVAL)
+        raise OSError(f"{path} does not match {self.bundle.index_path}")
+
+    def _refresh(self) -> None:
+        self._reload_index()
+        if self.bundle.inode is not None and self.bundle.inode != self._inode:
+            # Compacted or rebuilt since it was mapped
+            self._remap()
+
+    def __enter__(self) -> 'BundleReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._inode = None
+
+    def __contains__(self, slug: str) -> bool:
+        self._reload_index()
+        return slug in self.bundle.entries
+
+    def __len__(self) -> int:
+        self._reload_index()
+        return len(self.bundle.entries)
+
+    def slugs(self) -> List[str]:
+        self._reload_index()
+        return sorted(self.bundle.entries)
+
+    def get_bytes(self, slug: str) -> bytes:
+        self._refresh()
+        entry = self.bundle.entries[slug]
+        end = entry['offset'] + entry['length']
+        if self._map is None or end > len(self._map):
+            # Appended to since it was mapped
+            self._remap()
+            entry = self.bundle.entries[slug]
+            end = entry['offset'] + entry['length']
+            if self._map is None or end > len(self._map):
+                raise KeyError(slug)
+        return self._map[entry['offset']:end]
+
+    def get(self, slug: str) -> str:
+        """The full MDX document of a post"""
+        return self.get_bytes(slug).decode('utf-8')
+
+    def post(self, slug: str) -> Tuple[Dict[str, Any], str]:
+        """(frontmatter, body) of a post"""
+        frontmatter, body, _ = split_frontmatter(self.get(slug))
+        return frontmatter, body
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        self._refresh()
+        # Offset order keeps reads sequential
+        for slug, _ in sorted(self.bundle.entries.items(), key=lambda item: item[1]['offset']):
+            try:
+                yield slug, self.get(slug)
+            except KeyError:
+                continue  # removed by another process meanwhile
+
+
+def main():
+    from daily_content_generator import Config
+
+    parser = argparse.ArgumentParser(description="Maintain the packed content bundle")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('rebuild', help='Re-create the bundle from the archive')
+    verify_parser = sub.add_parser('verify', help='Check the bundle against the MDX files')
+    verify_parser.add_argument('--repair', action='store_true')
+    sub.add_parser('compact', help='Drop dead records')
+    get_parser = sub.add_parser('get', help='Print one post from the bundle')
+    get_parser.add_argument('slug')
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    bundle = ContentBundle(Path(config.cache_dir) / 'bundle')
+
+    if args.command == 'rebuild':
+        logger.info(f"Bundled {bundle.rebuild(Path(config.content_dir))} posts ({bundle.size} bytes)")
+        return 0
+
+    if args.command == 'compact':
+        bundle.compact()
+        return 0
+
+    if args.command == 'get':
+        with BundleReader(bundle.dir, bundle) as reader:
+            if args.slug not in reader:
+                logger.error(f"{args.slug} is not in the bundle")
+                return 1
+            sys.stdout.write(reader.get(args.slug))
+        return 0
+
+    report = bundle.verify(Path(config.content_dir), repair=args.repair)
+    problems = sum(len(slugs) for slugs in report.values())
+    for kind, slugs in report.items():
+        for slug in slugs:
+            print(f"{kind:9} {slug}")
+    logger.info(f"Verified {len(bundle.entries)} bundled posts: {problems} problems{' repaired' if args.repair else ''}")
+    return 0 if args.repair or not problems else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Long-running scheduler for the daily content generator
+
+Keeps one ContentPipeline alive so HTTP sessions, the translation cache and
+the related-posts index stay warm between runs, and executes several
+schedules (one per keyword set and language list) from a JSON config file.
+
+Example config:
+
+    {
+      "health_port": 8787,
+      "schedules": [
+        {"name": "cricket-en", "keywords": ["Cricket betting updates"],
+         "languages": ["en"], "daily_at": "03:30", "jitter_seconds": 300,
+         "budget_seconds": 600},
+        {"name": "igaming-hi-zh", "keywords": ["India iGaming news"],
+         "languages": ["en", "hi", "zh"], "translate": true,
+         "interval_minutes": 360, "jitter_seconds": 120}
+      ]
+    }
+
+Runs are executed one at a time; a schedule whose previous run is still
+queued or running skips its tick instead of piling up. Output goes through
+the publish queue (PUBLISH_QUEUE_MAX_FILES / PUBLISH_QUEUE_MAX_MINUTES), which
+is checked every tick and flushed on shutdown, so several runs share a deploy. GET /health and
+GET /status on 127.0.0.1:<health_port> report liveness and per-schedule
+state. budget_seconds caps a schedule's run time (default RUN_BUDGET_SECONDS);
+the stage timings of its last run are part of its status.
+
+Usage:
+    python scripts/content_daemon.py --config scripts/schedules.json
+"""
+
+import argparse
+import json
+import logging
+import random
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from daily_content_generator import Config, ContentPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Schedule:
+    """One recurring generation job"""
+    name: str
+    keywords: List[str]
+    languages: List[str]
+    interval_minutes: Optional[int] = None
+    daily_at: Optional[str] = None  # "HH:MM" UTC
+    jitter_seconds: int = 0
+    translate: bool = False
+    max_keywords: int = 3
+    budget_seconds: Optional[float] = None  # default RUN_BUDGET_SECONDS
+
+    # Runtime state
+    next_run: Optional[datetime] = None
+    running: bool = False
+    run_count: int = 0
+    skipped: int = 0
+    last_started: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_articles: int = 0
+    last_timings: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Schedule':
+        if not data.get('interval_minutes') and not data.get('daily_at'):
+            raise ValueError(f"Schedule {data.get('name')!r} needs interval_minutes or daily_at")
+        return cls(
+            name=data['name'],
+            keywords=data.get('keywords') or [],
+            languages=data.get('languages') or ['en'],
+            interval_minutes=data.get('interval_minutes'),
+            daily_at=data.get('daily_at'),
+            jitter_seconds=int(data.get('jitter_seconds', 0)),
+            translate=bool(data.get('translate', False)),
+            max_keywords=int(data.get('max_keywords', 3)),
+            budget_seconds=data.get('budget_seconds'),
+        )
+
+    def compute_next_run(self, now: datetime, first: bool = False) -> datetime:
+        jitter = timedelta(seconds=random.uniform(0, self.jitter_seconds)) if self.jitter_seconds else timedelta()
+        if first and not self.daily_at:
+            # Interval schedules start right away (plus jitter)
+            return now + jitter
+        if self.daily_at:
+            hour, minute = (int(part) for part in self.daily_at.split(':'))
+            candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if candidate <= now:
+                candidate += timedelta(days=1)
+            return candidate + jitter
+        return now + timedelta(minutes=self.interval_minutes) + jitter
+
+    def status(self) -> Dict[str, Any]:
+        def iso(value: Optional[datetime]) -> Optional[str]:
+            return value.isoformat(timespec='seconds') if value else None
+
+        return {
+            'name': self.name,
+            'languages': self.languages,
+            'next_run': iso(self.next_run),
+            'running': self.running,
+            'run_count': self.run_count,
+            'skipped': self.skipped,
+            'last_started': iso(self.last_started),
+            'last_duration': self.last_duration,
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+            'last_articles': self.last_articles,
+            'last_timings': self.last_timings,
+        }
+
+
+class ContentDaemon:
+    """Runs schedules against a single warm pipeline"""
+
+    TICK_SECONDS = 30
+
+    def __init__(self, config: Config, schedules: List[Schedule], health_port: int = 8787):
+        self.config = config
+        self.schedules = schedules
+        self.health_port = health_port
+        self.started = datetime.now(timezone.utc)
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        # One worker: runs never overlap and share the warm pipeline safely
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='content-run')
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._flush_pending = False
+
+        started = time.perf_counter()
+        self.pipeline = ContentPipeline(config)
+        logger.info(f"Pipeline warmed in {time.perf_counter() - started:.2f}s")
+
+    def start_health_server(self) -> None:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                if self.path == '/health':
+                    body = {'status': 'ok', 'uptime_seconds': int((datetime.now(timezone.utc) - daemon.started).total_seconds())}
+                elif self.path == '/status':
+                    body = daemon.status()
+                else:
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.health_port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='health', daemon=True).start()
+        logger.info(f"Health endpoint on http://127.0.0.1:{self.health_port}/status")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'started': self.started.isoformat(timespec='seconds'),
+                'schedules': [schedule.status() for schedule in self.schedules],
+                'publish_queue': self.pipeline.publish_queue.status(),
+            }
+
+    def _execute(self, schedule: Schedule) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            schedule.last_started = datetime.now(timezone.utc)
+        logger.info(f"Running schedule {schedule.name}")
+
+        status, error, articles, timings = 'ok', None, 0, None
+        try:
+            result = self.pipeline.run(
+                keywords=schedule.keywords or None,
+                languages=schedule.languages,
+                translate=schedule.translate,
+                max_keywords=schedule.max_keywords,
+                budget=schedule.budget_seconds,
+            )
+            articles, timings = len(result.articles), result.timings
+            if not articles:
+                status = 'empty'
+        except Exception as e:
+            logger.exception(f"Schedule {schedule.name} failed")
+            status, error = 'error', str(e)
+
+        with self._lock:
+            schedule.running = False
+            schedule.run_count += 1
+            schedule.last_duration = round(time.perf_counter() - started, 2)
+            schedule.last_status = status
+            schedule.last_error = error
+            schedule.last_articles = articles
+            schedule.last_timings = timings
+
+    def tick(self, now: datetime) -> None:
+        """Dispatch every schedule that is due"""
+        for schedule in self.schedules:
+            with self._lock:
+                if schedule.next_run is None:
+                    schedule.next_run = schedule.compute_next_run(now, first=True)
+                if now < schedule.next_run:
+                    continue
+                schedule.next_run = schedule.compute_next_run(now)
+                if schedule.running:
+                    schedule.skipped += 1
+                    logger.warning(f"Schedule {schedule.name} still running, skipping this tick")
+                    continue
+                schedule.running = True
+            self._executor.submit(self._execute, schedule)
+
+        # Flush on the run worker so a push never races a publish
+        with self._lock:
+            if self._flush_pending or not self.pipeline.publish_queue.due(now):
+                return
+            self._flush_pending = True
+        self._executor.submit(self._flush)
+
+    def _flush(self, force: bool = False) -> None:
+        try:
+            self.pipeline.flush(force=force)
+        except Exception:
+            logger.exception("Publish queue flush failed")
+        finally:
+            with self._lock:
+                self._flush_pending = False
+
+    def run_forever(self) -> None:
+        self.start_health_server()
+        while not self.stop_event.is_set():
+            now = datetime.now(timezone.utc)
+            self.tick(now)
+            upcoming = [s.next_run for s in self.schedules if s.next_run]
+            wait = min([(t - now).total_seconds() for t in upcoming] + [self.TICK_SECONDS])
+            self.stop_event.wait(max(wait, 1))
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        logger.info("Shutting down, waiting for the current run to finish")
+        self._executor.submit(self._flush, True)
+        self._executor.shutdown(wait=True)
+        if self._server:
+            self._server.shutdown()
+
+
+def load_schedules(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        'health_port': int(data.get('health_port', 8787)),
+        'schedules': [Schedule.from_dict(item) for item in data.get('schedules', [])],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run content generation schedules in a long-lived process")
+    parser.add_argument('--config', required=True, help='Schedules JSON file')
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    if not config.validate():
+        logger.error("Invalid configuration. Please check environment variables.")
+        return 1
+
+    loaded = load_schedules(args.config)
+    if not loaded['schedules']:
+        logger.error("No schedules configured")
+        return 1
+
+    daemon = ContentDaemon(config, loaded['schedules'], loaded['health_port'])
+
+    def stop(signum, frame):
+        daemon.stop_event.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    daemon.run_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
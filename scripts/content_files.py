@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Helpers for reading and writing published MDX content files
+
+Generated posts carry JSON frontmatter (see ContentPublisher.publish_article),
+hand-written posts use simple `key: "value"` YAML. Both are supported.
+"""
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+FRONTMATTER_RE = re.compile(r'^---\n([\s\S]+?)\n---\n?')
+YAML_LINE_RE = re.compile(r'^([A-Za-z_][\w-]*):\s*(.*)$')
+
+
+def split_frontmatter(text: str) -> Tuple[Dict[str, Any], str, str]:
+    """
+    Split an MDX document into frontmatter and body
+
+    Returns:
+        (frontmatter, body, format) where format is 'json', 'yaml' or 'none'
+    """
+    match = FRONTMATTER_RE.match(text)
+    if not match:
+        return {}, text, 'none'
+
+    raw = match.group(1)
+    body = text[match.end():].lstrip('\n')
+
+    if raw.lstrip().startswith('{'):
+        try:
+            return json.loads(raw), body, 'json'
+        except json.JSONDecodeError:
+            pass
+
+    return _parse_simple_yaml(raw), body, 'yaml'
+
+
+def _parse_simple_yaml(raw: str) -> Dict[str, Any]:
+    """Parse flat `key: value` lines (values may be JSON literals)"""
+    data: Dict[str, Any] = {}
+    for line in raw.splitlines():
+        match = YAML_LINE_RE.match(line)
+        if not match:
+            continue
+        key, value = match.group(1), match.group(2).strip()
+        try:
+            data[key] = json.loads(value)
+        except json.JSONDecodeError:
+            data[key] = value.strip('\'"')
+    return data
+
+
+def render_mdx(frontmatter: Dict[str, Any], body: str, fmt: str = 'json') -> str:
+    """Serialize frontmatter and body in the same layout the publishers use"""
+    if fmt == 'yaml':
+        lines = [f"{key}: {json.dumps(value, ensure_ascii=False)}" for key, value in frontmatter.items()]
+        header = '\n'.join(lines)
+    else:
+        header = json.dumps(frontmatter, indent=2, ensure_ascii=False)
+
+    return f"""---
+{header}
+---
+
+{body}"""
+
+
+def update_yaml_frontmatter(text: str, updates: Dict[str, Any]) -> str:
+    """Replace or append top-level keys in YAML frontmatter, keeping other lines verbatim"""
+    match = FRONTMATTER_RE.match(text)
+    if not match:
+        return text
+
+    lines = match.group(1).splitlines()
+    remaining = dict(updates)
+    for i, line in enumerate(lines):
+        key_match = YAML_LINE_RE.match(line)
+        if key_match and key_match.group(1) in remaining:
+            key = key_match.group(1)
+            lines[i] = f"{key}: {json.dumps(remaining.pop(key), ensure_ascii=False)}"
+    lines.extend(f"{key}: {json.dumps(value, ensure_ascii=False)}" for key, value in remaining.items())
+
+    return "---\n" + '\n'.join(lines) + "\n---\n" + text[match.end():]
+
+
+def iter_post_files(root: Path) -> Iterator[Path]:
+    """Yield every index.mdx below a content tree"""
+    if not root.exists():
+        return
+    yield from sorted(root.rglob('index.mdx'))
+
+
+def atomic_write(path: Path, content: str) -> None:
+    """Write a file so readers never observe partial content"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Flat or year/month sharded content directories, plus a slug lookup index
+
+    flat:     src/content/posts/<slug>/index.mdx
+    sharded:  src/content/posts/<YYYY>/<MM>/<slug>/index.mdx
+
+The shard comes from the slug's YYYY-MM-DD prefix (or the post date). Post
+URLs do not change: the site derives them from the directory name, which is
+the same in both layouts. Every tree keeps slug-index.json at its root,
+mapping directory slug to its relative directory, so the site and the
+tools can find a post without walking the shards. Hand-written posts added
+directly at the top level are still picked up by the site.
+
+Several processes can publish into the same trees: claim_slug() gives each
+new post a directory no other post uses (a second same-day post with the
+same title gets `-2`), and save() merges this process's changes into the
+index under its lock instead of overwriting the other processes' entries.
+
+Usage:
+    python scripts/content_layout.py migrate --to sharded [--dry-run]
+    python scripts/content_layout.py migrate --to flat
+    python scripts/content_layout.py rebuild-index
+    python scripts/content_layout.py lookup 2025-12-29-ipl-2025-team-squads
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+from content_files import atomic_write, iter_post_files, split_frontmatter
+from file_locks import file_lock
+
+logger = logging.getLogger(__name__)
+
+SLUG_INDEX_FILE = 'slug-index.json'
+LAYOUTS = ('flat', 'sharded')
+
+DATE_PREFIX_RE = re.compile(r'^(\d{4})-(\d{2})-\d{2}-')
+YEAR_RE = re.compile(r'^\d{4}$')
+MONTH_RE = re.compile(r'^\d{2}$')
+
+
+def shard_for(slug: str, date: Optional[str] = None) -> str:
+    """'YYYY/MM' for a post, from its slug prefix or its date"""
+    match = DATE_PREFIX_RE.match(slug)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}"
+    try:
+        parsed = datetime.fromisoformat(str(date).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        parsed = datetime.now()
+    return parsed.strftime('%Y/%m')
+
+
+def claim_slug(
+    trees: Sequence['ContentLayout'],
+    target: 'ContentLayout',
+    slug: str,
+    date: Optional[str] = None,
+) -> Tuple[str, Path]:
+    """
+    Reserve a directory in `target` for a new post
+
+    The first of slug, slug-2, slug-3, ... that no post in any of `trees`
+    uses is claimed by creating its directory. Claims are made under the
+    requested slug's lock in the first tree, so concurrent publishers of the
+    same title queue up whichever tree their post goes to.
+
+    Returns:
+        (slug, directory)
+    """
+    with file_lock(trees[0].root / slug):
+        for attempt in range(1, 1000):
+            candidate = slug if attempt == 1 else f"{slug}-{attempt}"
+            if any(
+                tree.lookup(candidate) is not None or (tree.root / tree.relative_dir(candidate, date)).exists()
+                for tree in trees
+            ):
+                continue
+            article_dir = target.root / target.relative_dir(candidate, date)
+            article_dir.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                article_dir.mkdir()
+            except FileExistsError:
+                continue
+            return candidate, article_dir
+    raise RuntimeError(f"No free slug left for {slug}")
+
+
+class ContentLayout:
+    """Decides where a post lives and keeps the slug -> directory index"""
+
+    def __init__(self, root: Path, sharded: bool = False):
+        self.root = Path(root)
+        self.sharded = sharded
+        self.index_path = self.root / SLUG_INDEX_FILE
+        self.entries: Dict[str, str] = {}
+        self.dirty = False
+        # Changes since the last save, merged into the index on disk (None = removed)
+        self._changes: Dict[str, Optional[str]] = {}
+        self._replace = False
+        self._mtime_ns = 0
+        self._refresh()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                return json.load(f).get('posts', {})
+        except FileNotFoundError:
+            return {}
+
+    def _refresh(self) -> None:
+        """Pick up entries other processes saved since the last read"""
+        try:
+            mtime_ns = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns != self._mtime_ns:
+            self.entries = self._read()
+            for slug, relative in self._changes.items():
+                self._apply(slug, relative)
+
+    def _apply(self, slug: str, relative: Optional[str]) -> None:
+        if relative is None:
+            self.entries.pop(slug, None)
+        else:
+            self.entries[slug] = relative
+
+    def relative_dir(self, slug: str, date: Optional[str] = None) -> str:
+        return f"{shard_for(slug, date)}/{slug}" if self.sharded else slug
+
+    def article_dir(self, slug: str, date: Optional[str] = None) -> Path:
+        """Directory for a post; a post that already exists keeps its place"""
+        existing = self.lookup(slug)
+        if existing is not None:
+            return existing
+        return self.root / self.relative_dir(slug, date)
+
+    def lookup(self, slug: str) -> Optional[Path]:
+        self._refresh()
+        relative = self.entries.get(slug)
+        if relative is not None and (self.root / relative).is_dir():
+            return self.root / relative
+        flat = self.root / slug
+        if (flat / 'index.mdx').exists():
+            return flat
+        return None
+
+    def register(self, slug: str, article_dir: Path) -> None:
+        relative = Path(article_dir).relative_to(self.root).as_posix()
+        if self.entries.get(slug) != relative:
+            self.entries[slug] = relative
+            self._changes[slug] = relative
+            self.dirty = True
+
+    def unregister(self, slug: str) -> None:
+        if self.entries.pop(slug, None) is not None:
+            self._changes[slug] = None
+            self.dirty = True
+
+    def save(self) -> Optional[str]:
+        """Write the index if it changed; returns its path"""
+        if not self.dirty:
+            return None
+        with file_lock(self.index_path):
+            if not self._replace:
+                self.entries = self._read()
+                for slug, relative in self._changes.items():
+                    self._apply(slug, relative)
+            data = {'layout': 'sharded' if self.sharded else 'flat', 'posts': self.entries}
+            atomic_write(self.index_path, json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+            self._mtime_ns = self.index_path.stat().st_mtime_ns
+        self._changes = {}
+        self._replace = False
+        self.dirty = False
+        return str(self.index_path)
+
+    def rebuild(self) -> int:
+        """Re-create the index from the directories on disk"""
+        self.entries = {
+            path.parent.name: path.parent.relative_to(self.root).as_posix()
+            for path in iter_post_files(self.root)
+        }
+        self._changes = {}
+        self._replace = True
+        self.dirty = True
+        return len(self.entries)
+
+    def migrate(self, dry_run: bool = False) -> Dict[str, str]:
+        """
+        Move every post to where the current layout wants it
+
+        Returns:
+            Mapping of old index.mdx path to new index.mdx path
+        """
+        moved: Dict[str, str] = {}
+        for path in list(iter_post_files(self.root)):
+            post_dir = path.parent
+            slug = post_dir.name
+            date = None
+            if self.sharded and not DATE_PREFIX_RE.match(slug):
+                frontmatter, _, _ = split_frontmatter(path.read_text(encoding='utf-8'))
+                date = frontmatter.get('date')
+            target = self.root / self.relative_dir(slug, date)
+            if target == post_dir:
+                continue
+            if target.exists():
+                logger.warning(f"Cannot move {post_dir}: {target} already exists")
+                continue
+
+            logger.info(f"{'Would move' if dry_run else 'Moving'} {post_dir} -> {target}")
+            moved[str(path)] = str(target / path.name)
+            if dry_run:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(post_dir), str(target))
+
+        if not dry_run:
+            self._prune_empty_shards()
+            self.rebuild()
+            self.save()
+        return moved
+
+    def _prune_empty_shards(self) -> None:
+        if not self.root.exists():
+            return
+        for year in self.root.iterdir():
+            if not (year.is_dir() and YEAR_RE.match(year.name)):
+                continue
+            for month in year.iterdir():
+                if month.is_dir() and MONTH_RE.match(month.name) and not any(month.iterdir()):
+                    month.rmdir()
+            if not any(year.iterdir()):
+                year.rmdir()
+
+
+def main():
+    from daily_content_generator import Config
+    from rescore_content import STATE_FILE
+
+    parser = argparse.ArgumentParser(description="Migrate between flat and sharded content layouts")
+    sub = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = sub.add_parser('migrate', help='Move posts in place to the target layout')
+    migrate_parser.add_argument('--to', choices=LAYOUTS, required=True)
+    migrate_parser.add_argument('--dry-run', action='store_true')
+    sub.add_parser('rebuild-index', help='Rebuild slug-index.json from disk')
+    lookup_parser = sub.add_parser('lookup', help='Print the directory of a post')
+    lookup_parser.add_argument('slug')
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    sharded = (args.to if args.command == 'migrate' else config.content_layout) == 'sharded'
+    trees = [
+        ContentLayout(Path(config.content_dir), sharded),
+        ContentLayout(Path(config.ops_dir) / 'low-quality', sharded),
+    ]
+
+    if args.command == 'lookup':
+        for layout in trees:
+            found = layout.lookup(args.slug)
+            if found is not None:
+                print(found)
+                return 0
+        return 1
+
+    if args.command == 'rebuild-index':
+        for layout in trees:
+            logger.info(f"Indexed {layout.rebuild()} posts under {layout.root}")
+            layout.save()
+        return 0
+
+    moved: Dict[str, str] = {}
+    for layout in trees:
+        moved.update(layout.migrate(dry_run=args.dry_run))
+    logger.info(f"{'Would move' if args.dry_run else 'Moved'} {len(moved)} posts to the {args.to} layout")
+
+    # Keep the re-score cache valid for moved files
+    state_path = Path(config.ops_dir) / STATE_FILE
+    if moved and not args.dry_run and state_path.exists():
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        state = {moved.get(path, path): entry for path, entry in state.items()}
+        atomic_write(state_path, json.dumps(state, indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+
+    if config.content_layout != args.to:
+        logger.info(f"Set CONTENT_LAYOUT={args.to} so new posts use the same layout")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Content Quality Scoring Engine
+
+Shared by daily_content_generator.py and daily_content_free.py to decide
+whether a generated article should be indexed or routed to ops/low-quality.
+
+All metrics (Unicode-aware word count, heading structure, links, keyword
+density, readability) are collected in a single streaming pass over the
+article HTML/Markdown. Rules are pluggable callables evaluated against the
+collected metrics.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field, asdict
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional, Any
+
+# Bump when metrics or default rules change so stored scores can be re-evaluated
+SCORER_VERSION = "2"
+
+# CJK ideographs, kana and fullwidth forms have no word separators - each
+# character counts as one word unit.
+CJK_CLASS = r'\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+# Indic scripts use spaces but vowel signs are not matched by \w
+INDIC_CLASS = r'\u0900-\u0dff'
+
+WORD_RE = re.compile(
+    rf'[{CJK_CLASS}]|(?:(?![{CJK_CLASS}])[\w{INDIC_CLASS}])+(?:[\'’-](?:(?![{CJK_CLASS}])[\w{INDIC_CLASS}])+)*'
+)
+CJK_RE = re.compile(rf'[{CJK_CLASS}]')
+# Keyword boundaries: a keyword must not run on into a longer word
+WORD_CHAR = rf'[\w{INDIC_CLASS}]'
+SENTENCE_END_RE = re.compile(r'[.!?。！？।]+')
+MD_HEADING_RE = re.compile(r'^\s{0,3}#{1,6}\s+\S', re.MULTILINE)
+MD_LINK_RE = re.compile(r'\[[^\]]+\]\((?:https?:)?//[^)]+\)')
+BARE_URL_RE = re.compile(r'https?://[^\s<>")\]]+')
+
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+SKIP_TAGS = frozenset({'script', 'style'})
+
+# Focus keywords per language used for density checks
+DEFAULT_KEYWORDS: Dict[str, List[str]] = {
+    'en': ['cricket', 'IPL', 'betting', 'iGaming', 'Dogplay'],
+    'hi': ['क्रिकेट', 'बेटिंग', 'IPL', 'iGaming', 'Dogplay'],
+    'zh': ['板球', '博彩', 'IPL', 'iGaming', 'Dogplay'],
+}
+
+
+def brand_keywords(brand: str) -> Dict[str, List[str]]:
+    """DEFAULT_KEYWORDS with the site's brand in place of Dogplay"""
+    name = brand.split()[0] if brand.strip() else 'Dogplay'
+    return {
+        language: [name if word == 'Dogplay' else word for word in words]
+        for language, words in DEFAULT_KEYWORDS.items()
+    }
+
+
+def count_words(text: str) -> int:
+    """Count words in any script (CJK characters count individually)"""
+    return sum(1 for _ in WORD_RE.finditer(text))
+
+
+@dataclass
+class QualityMetrics:
+    """Raw metrics collected from one pass over the content"""
+    word_count: int = 0
+    text_chars: int = 0
+    sentence_count: int = 0
+    heading_count: int = 0
+    link_count: int = 0
+    paragraph_count: int = 0
+    keyword_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def keyword_density(self) -> float:
+        """Share of words taken up by focus keywords"""
+        if not self.word_count:
+            return 0.0
+        return sum(self.keyword_counts.values()) / self.word_count
+
+    @property
+    def avg_sentence_length(self) -> float:
+        return self.word_count / max(self.sentence_count, 1)
+
+    @property
+    def readability(self) -> float:
+        """
+        Language-neutral readability score (0-100)
+
+        Penalises long sentences; 12-20 words per sentence scores highest.
+        """
+        avg = self.avg_sentence_length
+        if avg <= 20:
+            return round(max(0.0, 100 - max(0.0, 12 - avg) * 4), 1)
+        return round(max(0.0, 100 - (avg - 20) * 3), 1)
+
+
+@dataclass
+class QualityScore:
+    """Structured verdict returned by QualityScorer.score"""
+    should_index: bool
+    reason: str
+    score: float
+    language: str
+    metrics: QualityMetrics
+    failures: List[str] = field(default_factory=list)
+    scorer_version: str = SCORER_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable summary for frontmatter and reports"""
+        data = asdict(self.metrics)
+        data.update({
+            'score': self.score,
+            'keyword_density': round(self.metrics.keyword_density, 4),
+            'readability': self.metrics.readability,
+            'failures': self.failures,
+            'scorer_version': self.scorer_version,
+        })
+        return data
+
+
+class _MetricsParser(HTMLParser):
+    """Streaming collector - accepts HTML, Markdown or plain text"""
+
+    def __init__(self, keyword_re: Optional[re.Pattern]):
+        super().__init__(convert_charrefs=True)
+        self.metrics = QualityMetrics()
+        self.keyword_re = keyword_re
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in HEADING_TAGS:
+            self.metrics.heading_count += 1
+        elif tag == 'a' and any(name == 'href' and value for name, value in attrs):
+            self.metrics.link_count += 1
+        elif tag == 'p':
+            self.metrics.paragraph_count += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth or not data.strip():
+            return
+
+        metrics = self.metrics
+        metrics.word_count += count_words(data)
+        metrics.text_chars += len(data.strip())
+        metrics.sentence_count += len(SENTENCE_END_RE.findall(data))
+        metrics.heading_count += len(MD_HEADING_RE.findall(data))
+
+        md_links = len(MD_LINK_RE.findall(data))
+        metrics.link_count += md_links or len(BARE_URL_RE.findall(data))
+
+        if self.keyword_re is not None:
+            for match in self.keyword_re.finditer(data):
+                key = match.group(0).lower()
+                metrics.keyword_counts[key] = metrics.keyword_counts.get(key, 0) + 1
+
+
+# A rule receives (metrics, article) and returns a failure reason or None
+QualityRule = Callable[[QualityMetrics, Dict[str, Any]], Optional[str]]
+
+
+class QualityScorer:
+    """Pluggable, language-aware quality scoring engine"""
+
+    def __init__(
+        self,
+        min_word_count: int = 300,
+        min_text_chars: int = 500,
+        max_keyword_density: float = 0.1,
+        keywords: Optional[Dict[str, List[str]]] = None,
+        rules: Optional[Iterable[QualityRule]] = None,
+    ):
+        self.min_word_count = min_word_count
+        self.min_text_chars = min_text_chars
+        self.max_keyword_density = max_keyword_density
+        self.keywords = keywords or DEFAULT_KEYWORDS
+        self._keyword_res = {
+            language: self._compile_keywords(words)
+            for language, words in self.keywords.items()
+        }
+        self.rules: List[QualityRule] = list(rules) if rules is not None else [
+            self.rule_word_count,
+            self.rule_sources,
+            self.rule_brevity,
+            self.rule_keyword_stuffing,
+        ]
+
+    @staticmethod
+    def _compile_keywords(words: List[str]) -> Optional[re.Pattern]:
+        if not words:
+            return None
+        alternatives = []
+        for word in sorted(words, key=len, reverse=True):
+            if CJK_RE.search(word):
+                # No word separators in CJK text: match anywhere
+                alternatives.append(re.escape(word))
+            else:
+                alternatives.append(rf'(?<!{WORD_CHAR}){re.escape(word)}(?!{WORD_CHAR})')
+        return re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    def register(self, rule: QualityRule) -> None:
+        """Add a custom rule to the engine"""
+        self.rules.append(rule)
+
+    def fingerprint(self) -> str:
+        """Short hash of the version, thresholds, keywords and rules behind a verdict"""
+        settings = {
+            'version': SCORER_VERSION,
+            'min_word_count': self.min_word_count,
+            'min_text_chars': self.min_text_chars,
+            'max_keyword_density': self.max_keyword_density,
+            'keywords': {language: sorted(words) for language, words in self.keywords.items()},
+            'rules': [getattr(rule, '__qualname__', repr(rule)) for rule in self.rules],
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def measure(self, content: str, language: str = 'en') -> QualityMetrics:
+        """Collect all metrics in a single pass over the content"""
+        keyword_re = self._keyword_res.get(language, self._keyword_res.get('en'))
+        parser = _MetricsParser(keyword_re)
+        parser.feed(content or '')
+        parser.close()
+        return parser.metrics
+
+    def score(self, article: Dict[str, Any]) -> QualityScore:
+        """Score an article and decide whether it should be indexed"""
+        language = article.get('language', 'en')
+        metrics = self.measure(article.get('content', ''), language)
+
+        failures = [reason for reason in (rule(metrics, article) for rule in self.rules) if reason]
+
+        should_index = not failures
+        reason = failures[0] if failures else "Meets quality standards"
+
+        return QualityScore(
+            should_index=should_index,
+            reason=reason,
+            score=self._composite(metrics, article),
+            language=language,
+            metrics=metrics,
+            failures=failures,
+        )
+
+    def _composite(self, metrics: QualityMetrics, article: Dict[str, Any]) -> float:
+        """Weighted 0-100 score used for ranking and reporting"""
+        length = min(metrics.word_count / max(self.min_word_count * 2, 1), 1.0)
+        structure = min(metrics.heading_count / 3, 1.0)
+        sourcing = min(len(article.get('sources') or []) / 3, 1.0)
+        density = metrics.keyword_density
+        keywords = 1.0 if 0.005 <= density <= self.max_keyword_density else 0.5
+        readability = metrics.readability / 100
+
+        total = (
+            length * 35
+            + structure * 15
+            + sourcing * 20
+            + keywords * 10
+            + readability * 20
+        )
+        return round(total, 1)
+
+    # Default rules
+
+    def rule_word_count(self, metrics: QualityMetrics, article: Dict[str, Any]) -> Optional[str]:
+        if metrics.word_count < self.min_word_count:
+            return f"Below word count threshold: {metrics.word_count}"
+        return None
+
+    def rule_sources(self, metrics: QualityMetrics, article: Dict[str, Any]) -> Optional[str]:
+        if not article.get('sources'):
+            return "No sources provided"
+        return None
+
+    def rule_brevity(self, metrics: QualityMetrics, article: Dict[str, Any]) -> Optional[str]:
+        if metrics.text_chars < self.min_text_chars:
+            return "Content too brief"
+        return None
+
+    def rule_keyword_stuffing(self, metrics: QualityMetrics, article: Dict[str, Any]) -> Optional[str]:
+        if metrics.keyword_density > self.max_keyword_density:
+            return f"Keyword density too high: {metrics.keyword_density:.1%}"
+        return None
@@ -4,32 +4,73 @@ Daily News Content Generator - FREE VERSION
 Uses free APIs: Hugging Face + DuckDuckGo/NewsAPI
 """
 
+import argparse
 import os
 import json
 import logging
 import re
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+from urllib.parse import parse_qs, urlsplit
 from dataclasses import dataclass
 
 import requests
 
+from article_schema import ArticleValidationError, RepairStats, validate_article
+from content_quality import QualityScorer, QualityScore, count_words
+from sitemap_feeds import SitemapFeedWriter
+from content_files import atomic_write
+from content_layout import ContentLayout, claim_slug
+from content_bundle import ContentBundle
+from related_posts import RelatedPostsIndex, inject_related_links
+from prerender import render_article, write_artifacts
+from records import Article, NewsItem
+from topic_planner import TopicPlanner
+from link_checker import LinkChecker
+from enrichment import PageEnricher
+from news_store import NewsStore
+from profiling import NULL_PROFILER, add_profiling_arguments, profiler_from_args
+from deadline import MIN_REQUEST_SECONDS, NO_DEADLINE, Deadline, DeadlineExceeded
+from model_router import DEFAULT_COOLDOWN, ModelRouter
+from file_locks import file_lock
+
 # Configuration
 @dataclass
 class FreeConfig:
     """Configuration for free APIs"""
     huggingface_api_key: str = ""
-    newsapi_api_key: = ""  # Optional: get from https://newsapi.org/
+    newsapi_api_key: str = ""  # Optional: get from https://newsapi.org/
     content_dir: str = "src/content/posts"
     ops_dir: str = "src/content/ops"
+    public_dir: str = "public"
+    cache_dir: str = ".cache/dogplay"
+    content_layout: str = "flat"  # or "sharded" (posts/<YYYY>/<MM>/<slug>)
+    site_url: str = "https://dogplay.io"
+    brand_name: str = "Dogplay Agent"
     min_word_count: int = 300
+    related_posts: int = 3
+    run_budget_seconds: int = 0  # 0 = no run-level deadline
+    link_check_ttl_hours: float = 24
+    enrich_max_kb: int = 512
+    news_reuse_minutes: int = 30  # answer a repeated query from the news store
+    news_store_days: int = 30
 
     @classmethod
     def from_env(cls) -> 'FreeConfig':
         return cls(
             huggingface_api_key=os.getenv('HUGGINGFACE_API_KEY', ''),
             newsapi_api_key=os.getenv('NEWSAPI_API_KEY', ''),
+            site_url=os.getenv('NEXT_PUBLIC_SITE_URL', 'https://dogplay.io'),
+            brand_name=os.getenv('SITE_BRAND', 'Dogplay Agent'),
+            content_layout=os.getenv('CONTENT_LAYOUT', 'flat'),
+            run_budget_seconds=int(os.getenv('RUN_BUDGET_SECONDS', '0')),
+            link_check_ttl_hours=float(os.getenv('LINK_CHECK_TTL_HOURS', '24')),
+            enrich_max_kb=int(os.getenv('ENRICH_MAX_KB', '512')),
+            news_reuse_minutes=int(os.getenv('NEWS_REUSE_MINUTES', '30')),
+            news_store_days=int(os.getenv('NEWS_STORE_DAYS', '30')),
         )
 
 # Logging setup
@@ -43,7 +84,28 @@ logger = logging.getLogger(__name__)
 class DuckDuckGoSearchClient:
     """Free search using DuckDuckGo HTML scraping"""
 
-    def search_news(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+    def __init__(self):
+        self.deadline = NO_DEADLINE
+
+    @staticmethod
+    def result_url(href: str) -> Optional[str]:
+        """
+        The page a result links to
+
+        Result hrefs are scheme-less redirects (//duckduckgo.com/l/?uddg=<url>&rut=...)
+        whose rut changes on every fetch; the target is in uddg. Ads and other
+        DuckDuckGo-internal links give None.
+        """
+        if href.startswith('//'):
+            href = f'https:{href}'
+        parts = urlsplit(href)
+        host = (parts.hostname or '').lower()
+        if host == 'duckduckgo.com' or host.endswith('.duckduckgo.com'):
+            target = parse_qs(parts.query).get('uddg', [''])[0] if parts.path.startswith('/l/') else ''
+            return target if urlsplit(target).scheme in ('http', 'https') else None
+        return href if parts.scheme in ('http', 'https') else None
+
+    def search_news(self, query: str, max_results: int = 5) -> List[NewsItem]:
         """Search news using DuckDuckGo"""
         try:
             url = "https://html.duckduckgo.com/html/"
@@ -52,7 +114,7 @@ class DuckDuckGoSearchClient:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
 
-            response = requests.post(url, data=params, headers=headers, timeout=30)
+            response = requests.post(url, data=params, headers=headers, timeout=self.deadline.timeout(30))
             response.raise_for_status()
 
             import html
@@ -87,11 +149,15 @@ class DuckDuckGoSearchClient:
                         self.in_result = False
                         if self.text_parts:
                             self.current_data['title'] = ' '.join(self.text_parts)
-                            if self.current_data.get('title') and self.current_data.get('url'):
-                                self.current_data['snippet'] = self.current_data['title']
-                                self.current_data['source'] = 'DuckDuckGo'
-                                self.current_data['published_date'] = datetime.now().isoformat()
-                                self.results.append(self.current_data)
+                            url = DuckDuckGoSearchClient.result_url(self.current_data.get('url', ''))
+                            if self.current_data.get('title') and url:
+                                self.results.append(NewsItem(
+                                    title=self.current_data['title'],
+                                    url=url,
+                                    snippet=self.current_data['title'],
+                                    source='DuckDuckGo',
+                                    published_date=datetime.now().isoformat(),
+                                ))
                         self.current_data = {}
                         self.text_parts = []
 
@@ -113,8 +179,9 @@ class NewsAPIClient:
 
     def __init__(self, api_key: str = ""):
         self.api_key = api_key
+        self.deadline = NO_DEADLINE
 
-    def search_news(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+    def search_news(self, query: str, max_results: int = 5) -> List[NewsItem]:
         """Search news using NewsAPI"""
         if not self.api_key:
             logger.warning("NewsAPI key not provided, skipping")
@@ -130,20 +197,20 @@ class NewsAPIClient:
                 'apiKey': self.api_key
             }
 
-            response = requests.get(url, params=params, timeout=30)
+            response = requests.get(url, params=params, timeout=self.deadline.timeout(30))
             response.raise_for_status()
 
             data = response.json()
             articles = []
 
             for item in data.get('articles', []):
-                articles.append({
-                    'title': item.get('title', ''),
-                    'url': item.get('url', ''),
-                    'snippet': item.get('description', ''),
-                    'published_date': item.get('publishedAt'),
-                    'source': item.get('source', {}).get('name', 'Unknown'),
-                })
+                articles.append(NewsItem(
+                    title=item.get('title', ''),
+                    url=item.get('url', ''),
+                    snippet=item.get('description') or '',
+                    published_date=item.get('publishedAt'),
+                    source=(item.get('source') or {}).get('name') or 'Unknown',
+                ))
 
             logger.info(f"NewsAPI found {len(articles)} articles for: {query}")
             return articles
@@ -154,7 +221,14 @@ class NewsAPIClient:
 
 
 class HuggingFaceLLMClient:
-    """Free LLM using Hugging Face Inference API"""
+    """Free LLM using Hugging Face Inference API
+
+    A ModelRouter picks the model with the best expected latency for the
+    token budget; a model that is loading (503) or rate limited (429) is
+    cooled down and the next one is tried.
+    """
+
+    API_URL = "https://api-inference.huggingface.co/models/{model}"
 
     # Free models that work well without API key
     MODELS = {
@@ -162,52 +236,170 @@ class HuggingFaceLLMClient:
         'medium': 'Qwen/Qwen2.5-72B-Instruct',
         'fast': 'microsoft/Phi-3-mini-4k-instruct',
     }
+    # Starting guesses until a model has real stats (fast first, as before)
+    PRIORS = {
+        'microsoft/Phi-3-mini-4k-instruct': {'seconds_per_token': 0.03},
+        'mistralai/Mistral-7B-Instruct-v0.2': {'seconds_per_token': 0.05},
+        'Qwen/Qwen2.5-72B-Instruct': {'seconds_per_token': 0.12},
+    }
+    MAX_NEW_TOKENS = 1500
+    # Warm-up waits for the model to load, which can take a while
+    WARMUP_TIMEOUT = 120
 
-    def __init__(self, api_key: str = ""):
+    def __init__(self, api_key: str = "", state_dir: Optional[Path] = None):
         self.api_key = api_key
-        self.model = self.MODELS['fast']  # Use fast model by default
+        self.router = ModelRouter(list(self.MODELS.values()), state_dir, self.PRIORS)
+        self.model = self.router.rank(self.MAX_NEW_TOKENS)[0]
+        self.profiler = NULL_PROFILER
+        self.deadline = NO_DEADLINE
+        self.repairs = RepairStats()
         self.session = requests.Session()
 
+    def _post(self, model: str, payload: Dict[str, Any], timeout: float) -> requests.Response:
+        api_url = self.API_URL.format(model=model)
+        headers = {}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+
+        response = self.session.post(api_url, headers=headers, json=payload, timeout=self.deadline.timeout(timeout))
+
+        if response.status_code == 401 and headers:
+            # Try without auth (free tier)
+            del headers['Authorization']
+            response = self.session.post(api_url, headers=headers, json=payload, timeout=self.deadline.timeout(timeout))
+        return response
+
+    @staticmethod
+    def _cooldown(response: requests.Response) -> Optional[float]:
+        """How long a loading (503) or rate-limited (429) model should be left alone"""
+        if response.status_code == 429:
+            try:
+                return float(response.headers.get('Retry-After', DEFAULT_COOLDOWN))
+            except ValueError:
+                return DEFAULT_COOLDOWN
+        if response.status_code == 503:
+            try:
+                return float(response.json().get('estimated_time', DEFAULT_COOLDOWN))
+            except (ValueError, AttributeError):
+                return DEFAULT_COOLDOWN
+        return None
+
+    def warm_up(self) -> Optional[str]:
+        """
+        Load the preferred model before the first real request
+
+        Meant to run in the background while the search stage is running.
+
+        Returns:
+            The model that answered, or None
+        """
+        payload = {
+            'inputs': 'Hello',
+            'parameters': {'max_new_tokens': 1, 'return_full_text': False},
+            'options': {'wait_for_model': True},
+        }
+        for model in self.router.rank(self.MAX_NEW_TOKENS):
+            self.router.start_warming(model)
+            try:
+                if self._warm_up(model, payload):
+                    return model
+            except DeadlineExceeded:
+                return None
+            finally:
+                # Only after the outcome is recorded, so waiters see the cool-down
+                self.router.finish_warming(model)
+        return None
+
+    def _warm_up(self, model: str, payload: Dict[str, Any]) -> bool:
+        try:
+            response = self._post(model, payload, self.WARMUP_TIMEOUT)
+        except DeadlineExceeded:
+            raise
+        except requests.RequestException as e:
+            logger.warning(f"Warm-up of {model} failed: {e}")
+            self.router.record_failure(model)
+            return False
+        if response.ok:
+            self.router.mark_ready(model)
+            logger.info(f"Warmed up {model}")
+            return True
+        logger.warning(f"Warm-up of {model} failed: HTTP {response.status_code}")
+        self.router.record_failure(model, self._cooldown(response))
+        return False
+
     def generate_article(
         self,
-        news_items: List[Dict[str, Any]],
+        news_items: List[NewsItem],
         language: str = 'en'
-    ) -> Dict[str, Any]:
+    ) -> Article:
         """Generate article using Hugging Face"""
         prompts = self._get_prompts(language)
 
         # Build context
         news_context = "\n\n".join([
-            f"- {item['title']}: {item.get('snippet', item['title'])}\n  Source: {item['source']}\n  URL: {item['url']}"
+            f"- {item.title}: {item.snippet or item.title}\n  Source: {item.source}\n  URL: {item.url}"
+            + (f"\n  Excerpt: {item.passage}" if item.passage else '')
             for item in news_items[:3]
         ])
 
         try:
             user_prompt = f"{prompts['user']}\n\nNews Sources:\n{news_context}\n\nPlease write the article now."
 
-            # Use Hugging Face Inference API
-            api_url = f"https://api-inference.huggingface.co/models/{self.model}"
-
-            headers = {}
-            if self.api_key:
-                headers['Authorization'] = f"Bearer {self.api_key}"
-
             payload = {
                 "inputs": f"<|system|>\n{prompts['system']}\n<|user|>\n{user_prompt}\n<|assistant|>\n\nArticle in JSON format:\n{{\n  \"title\": \"...\",\n  \"excerpt\": \"...\",\n  \"content\": \"...\",\n  \"seo_title\": \"...\",\n  \"seo_description\": \"...\",\n  \"category\": \"Cricket\",\n  \"sources\": []\n}}",
                 "parameters": {
-                    "max_new_tokens": 1500,
+                    "max_new_tokens": self.MAX_NEW_TOKENS,
                     "temperature": 0.7,
                     "return_full_text": False,
                 }
             }
 
-            response = self.session.post(api_url, headers=headers, json=payload, timeout=60)
+            content = self._generate(payload)
 
-            if response.status_code == 401:
-                # Try without auth (free tier)
-                del headers['Authorization']
-                response = self.session.post(api_url, headers=headers, json=payload, timeout=60)
+            # Extract JSON from response
+            with self.profiler.stage('parse'):
+                article = self._parse_article_response(content, news_items, language)
+            return article
 
+        except Exception as e:
+            logger.error(f"HuggingFace API error: {e}")
+            raise
+
+    def _generate(self, payload: Dict[str, Any], record: bool = True) -> str:
+        """
+        Run the payload on the best available model, failing over on 503/429/5xx
+
+        Args:
+            record: Update the router's latency and success stats; False for
+                short requests, whose fixed latency would make the model
+                look slow for full articles
+        """
+        last_error: Optional[Exception] = None
+        for model in self.router.rank(self.MAX_NEW_TOKENS):
+            warming = self.router.warming(model)
+            if warming is not None:
+                # Ranked this far only when the ready models failed; a second request would get a 503
+                logger.info(f"Waiting for the warm-up of {model}")
+                if not warming.wait(max(min(self.WARMUP_TIMEOUT, self.deadline.remaining() - MIN_REQUEST_SECONDS), 0)):
+                    continue
+                if self.router.cooling_down(model):
+                    continue
+            started = time.perf_counter()
+            try:
+                response = self._post(model, payload, 60)
+            except DeadlineExceeded:
+                raise
+            except requests.RequestException as e:
+                logger.warning(f"{model} failed, trying the next model: {e}")
+                self.router.record_failure(model, stats=record)
+                last_error = e
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                logger.warning(f"{model} returned HTTP {response.status_code}, trying the next model")
+                self.router.record_failure(model, self._cooldown(response), stats=record)
+                last_error = requests.HTTPError(f"{response.status_code} from {model}", response=response)
+                continue
             response.raise_for_status()
             result = response.json()
 
@@ -217,13 +409,15 @@ class HuggingFaceLLMClient:
             else:
                 content = result.get('generated_text', '')
 
-            # Extract JSON from response
-            article = self._parse_article_response(content, news_items, language)
-            return article
+            # The API does not report token counts; ~4 characters per token
+            if record:
+                self.router.record_success(model, time.perf_counter() - started, len(content) // 4)
+            else:
+                self.router.mark_ready(model)
+            self.model = model
+            return content
 
-        except Exception as e:
-            logger.error(f"HuggingFace API error: {e}")
-            raise
+        raise last_error or RuntimeError("no Hugging Face model available")
 
     def _get_prompts(self, language: str) -> Dict[str, str]:
         if language == 'en':
@@ -270,53 +464,40 @@ JSON आउटपुट फॉर्मेट में लिखें।''',
     def _parse_article_response(
         self,
         content: str,
-        news_items: List[Dict[str, Any]],
+        news_items: List[NewsItem],
         language: str
-    ) -> Dict[str, Any]:
-        """Parse LLM response"""
+    ) -> Article:
+        """Parse LLM response, re-prompting for missing or invalid fields only"""
         try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*?\}', content)
-            if json_match:
-                article_data = json.loads(json_match.group())
-            else:
-                # Fallback: create from text
-                article_data = {
-                    'title': f"Cricket & iGaming Updates - {datetime.now().strftime('%B %d, %Y')}",
-                    'excerpt': content[:150] + '...',
-                    'content': content,
-                    'seo_title': f"Cricket & iGaming Updates - {datetime.now().strftime('%B %d')}",
-                    'seo_description': content[:160],
-                    'category': 'iGaming',
-                    'sources': [item['url'] for item in news_items],
-                }
-
-            # Add metadata
-            slug = self._generate_slug(article_data.get('title', 'article'), language)
-            article_data.update({
-                'slug': slug,
-                'language': language,
-                'date': datetime.now().isoformat(),
-                'sources': list(set(article_data.get('sources', []) + [item['url'] for item in news_items])),
-                'word_count': len(article_data.get('content', '').split()),
-            })
-
-            return article_data
-
-        except Exception as e:
+            article_data = validate_article(content, news_items, language, self._complete_repair, self.repairs)
+        except ArticleValidationError as e:
             logger.error(f"Failed to parse article: {e}")
-            # Return minimal article
-            return {
-                'title': f"Daily Update - {datetime.now().strftime('%Y-%m-%d')}",
-                'excerpt': 'Latest cricket and iGaming news from India.',
-                'content': f'<p>Latest updates from the world of cricket and iGaming in India.</p>',
-                'slug': f"daily-update-{datetime.now().strftime('%Y-%m-%d')}",
-                'language': language,
-                'date': datetime.now().isoformat(),
-                'category': 'iGaming',
-                'sources': [item['url'] for item in news_items],
-                'word_count': 20,
+            raise
+
+        # Add metadata
+        slug = self._generate_slug(article_data['title'], language)
+        article_data.update({
+            'slug': slug,
+            'language': language,
+            'date': datetime.now().isoformat(),
+            'word_count': count_words(article_data['content']),
+        })
+
+        return Article.from_dict(article_data)
+
+    def _complete_repair(self, prompt: str, max_tokens: int) -> Tuple[str, int, int]:
+        """Short follow-up request for missing article fields"""
+        payload = {
+            "inputs": f"<|user|>\n{prompt}\n<|assistant|>\n",
+            "parameters": {
+                "max_new_tokens": max_tokens,
+                "temperature": 0.3,
+                "return_full_text": False,
             }
+        }
+        text = self._generate(payload, record=False)
+        # The API does not report token counts; ~4 characters per token
+        return text, len(prompt) // 4, len(text) // 4
 
     def _generate_slug(self, title: str, language: str) -> str:
         """Generate URL-safe slug"""
@@ -335,44 +516,77 @@ class ContentPublisher:
         self.config = config
         self.content_dir = Path(config.content_dir)
         self.ops_dir = Path(config.ops_dir)
+        self.scorer = QualityScorer(min_word_count=config.min_word_count)
+        self.feeds = SitemapFeedWriter(config.public_dir, self.ops_dir / 'index', config.site_url, config.brand_name)
+        self.related_index = RelatedPostsIndex(self.ops_dir / 'index')
+        sharded = config.content_layout == 'sharded'
+        self.layout = ContentLayout(self.content_dir, sharded)
+        self.low_quality_layout = ContentLayout(self.ops_dir / 'low-quality', sharded)
+        self.bundle = ContentBundle(Path(config.cache_dir) / 'bundle')
+        # Pre-rendered index.html/meta.json files written this run
+        self.artifact_files: List[str] = []
 
         # Ensure directories exist
         self.content_dir.mkdir(parents=True, exist_ok=True)
         self.ops_dir.mkdir(parents=True, exist_ok=True)
 
-    def assess_quality(self, article: Dict[str, Any]) -> tuple[bool, str]:
+    def assess_quality(self, article: Article) -> QualityScore:
         """Check if content meets quality threshold"""
-        if article['word_count'] < self.config.min_word_count:
-            return False, f"Below word count threshold: {article['word_count']}"
-        if not article.get('sources'):
-            return False, "No sources provided"
-        return True, "Meets quality standards"
+        return self.scorer.score(article)
 
-    def publish_article(self, article: Dict[str, Any]) -> str:
+    def publish_article(self, article: Article) -> str:
         """Publish article as Markdown file"""
-        should_index, _ = self.assess_quality(article)
+        quality = self.assess_quality(article)
+        should_index = quality.should_index
+        article.should_index = should_index
+        article.word_count = quality.metrics.word_count
 
-        if should_index:
-            article_dir = self.content_dir / article['slug']
-        else:
-            article_dir = self.ops_dir / 'low-quality' / article['slug']
+        layout = self.layout if should_index else self.low_quality_layout
+        slug, article_dir = claim_slug((self.layout, self.low_quality_layout), layout, article.slug, article.date)
+        if slug != article.slug:
+            logger.info(f"Slug {article.slug} is taken, publishing as {slug}")
+            article.slug = slug
+
+        with file_lock(self.layout.root / slug):
+            return self._write_post(article, article_dir, layout, quality)
+
+    def _write_post(self, article: Article, article_dir: Path, layout: ContentLayout, quality: QualityScore) -> str:
+        should_index = article.should_index
+
+        # Link to existing posts before the new one joins the index
+        related = self.related_index.related(article, k=self.config.related_posts)
+        article.content = inject_related_links(article.content, related, article.language)
+
+        body = f"""{article.content}
+
+---
+
+## Sources
+"""
+        for source in article.sources:
+            body += f"- [{source}]({source})\n"
 
-        article_dir.mkdir(parents=True, exist_ok=True)
+        # Render once at publish time so the site serves precomputed HTML
+        rendered = render_article(body, excerpt=article.excerpt)
+        article.reading_time = rendered.reading_time
 
         # Create frontmatter
         frontmatter = {
-            'title': article['title'],
-            'slug': article['slug'],
-            'excerpt': article.get('excerpt', ''),
-            'date': article['date'],
-            'language': article['language'],
-            'category': article.get('category', 'iGaming'),
+            'title': article.title,
+            'slug': article.slug,
+            'excerpt': article.excerpt or rendered.excerpt,
+            'date': article.date,
+            'language': article.language,
+            'category': article.category,
             'seo': {
-                'title': article.get('seo_title', article['title']),
-                'description': article.get('seo_description', article.get('excerpt', '')),
+                'title': article.seo_title or article.title,
+                'description': article.seo_description or article.excerpt,
             },
-            'sources': article.get('sources', []),
+            'sources': list(article.sources),
             'should_index': should_index,
+            'quality_note': quality.reason,
+            'quality': quality.to_dict(),
+            'reading_time': rendered.reading_time,
         }
 
         # Create Markdown
@@ -380,71 +594,152 @@ class ContentPublisher:
 {json.dumps(frontmatter, indent=2, ensure_ascii=False)}
 ---
 
-{article.get('content', '')}
+{body}"""
 
----
+        file_path = article_dir / 'index.mdx'
+        atomic_write(file_path, md_content)
+        self.artifact_files.extend(write_artifacts(article_dir, rendered))
+        layout.register(article.slug, article_dir)
+        index_file = layout.save()
+        if index_file:
+            self.artifact_files.append(index_file)
 
-## Sources
-"""
-        for source in article.get('sources', []):
-            md_content += f"- [{source}]({source})\n"
+        if should_index:
+            self.bundle.put(article.slug, file_path)
+        else:
+            self.bundle.remove(article.slug)
 
-        file_path = article_dir / 'index.mdx'
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        if should_index:
+            self.feeds.record(article)
+            self.related_index.add(article)
+        else:
+            self.feeds.remove(article.slug, article.language, article.date)
+            self.related_index.remove(article.slug)
 
         logger.info(f"Published: {file_path}")
         return str(file_path)
 
 
+# Rough wall time of a search call and of one generated article, in seconds
+SEARCH_ESTIMATE = 15
+ARTICLE_ESTIMATE = 60
+ENRICH_ESTIMATE = 20
+# How far back stored news may stand in for a search that was skipped or empty
+STORED_NEWS_HOURS = 24
+# Extra wait for the background warm-up once the search is done
+WARMUP_GRACE = 20
+
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Free daily content generator")
+    parser.add_argument(
+        '--budget', type=float, default=None,
+        help='Run time budget in seconds (default RUN_BUDGET_SECONDS; 0 for none)'
+    )
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    profiler = profiler_from_args(args)
+
     logger.info("Starting free content generation...")
 
     # Load config
     config = FreeConfig.from_env()
+    deadline = Deadline((config.run_budget_seconds if args.budget is None else args.budget) or None)
 
     # Initialize clients
     ddg_client = DuckDuckGoSearchClient()
     newsapi_client = NewsAPIClient(config.newsapi_api_key)
-    llm_client = HuggingFaceLLMClient(config.huggingface_api_key)
+    llm_client = HuggingFaceLLMClient(config.huggingface_api_key, Path(config.ops_dir) / 'index')
+    llm_client.profiler = profiler
+    link_checker = LinkChecker(Path(config.cache_dir), config.link_check_ttl_hours, site_url=config.site_url)
+    # Shorter passages: the small models have a 4k-token context
+    enricher = PageEnricher(Path(config.cache_dir), max_bytes=config.enrich_max_kb * 1024, passage_chars=700)
+    for client in (ddg_client, newsapi_client, llm_client, link_checker, enricher):
+        client.deadline = deadline
+    news_store = NewsStore(Path(config.cache_dir))
     publisher = ContentPublisher(config)
+    planner = TopicPlanner(Path(config.ops_dir) / 'index', max_results=3)
 
-    # Search for news
+    # Search for news, starting with the keywords that yield the most
     keywords = ['cricket India', 'IPL 2025', 'India sports betting']
 
+    # Load the model while searching so the first request does not hit a cold start.
+    # A daemon thread: a model still loading must not keep the process alive at exit
+    warming = threading.Thread(target=llm_client.warm_up, name='warm-up', daemon=True)
+    warming.start()
+
     all_news = []
-    for keyword in keywords[:2]:
-        # Try NewsAPI first, fallback to DuckDuckGo
-        news = newsapi_client.search_news(keyword, max_results=3)
-        if not news:
-            news = ddg_client.search_news(keyword, max_results=3)
-        all_news.extend(news)
-
-    if not all_news:
-        logger.warning("No news found. Creating fallback article.")
-        all_news = [{
-            'title': 'Cricket and iGaming in India',
-            'url': 'https://dogplay.io',
-            'snippet': 'Cricket and iGaming continue to grow in popularity across India.',
-            'source': 'Dogplay',
-            'published_date': datetime.now().isoformat(),
-        }]
-
-    logger.info(f"Total news items: {len(all_news)}")
+    with profiler.stage('search'), deadline.stage('search'):
+        for keyword in planner.choose(keywords, 2):
+            # A second keyword is optional once there is something to write about
+            needed = SEARCH_ESTIMATE + ARTICLE_ESTIMATE if all_news else MIN_REQUEST_SECONDS
+            fetch = deadline.allows(needed)
+            if not fetch:
+                deadline.skip(f"search for {keyword!r}")
+            started = time.perf_counter()
+            news = []
+            fetched = None
+            # A query answered in the last few minutes is not sent again
+            if config.news_reuse_minutes > 0:
+                for provider in ('newsapi', 'duckduckgo'):
+                    news = news or news_store.recent(provider, keyword, config.news_reuse_minutes * 60, 3)
+            if not news and fetch:
+                # Try NewsAPI first, fallback to DuckDuckGo
+                fetched = newsapi_client.search_news(keyword, max_results=3)
+                news_store.add(fetched, 'newsapi', keyword)
+                if not fetched:
+                    fetched = ddg_client.search_news(keyword, max_results=3)
+                    news_store.add(fetched, 'duckduckgo', keyword)
+                news = fetched
+            if not news:
+                news = news_store.search(keyword, max_age_hours=STORED_NEWS_HOURS, limit=3)
+            # The planner learns from API calls only; stored items are just de-duplicated
+            if fetched is not None:
+                all_news.extend(planner.record_search(keyword, fetched, time.perf_counter() - started))
+            if news is not fetched:
+                all_news.extend(planner.unseen(news))
+
+    # DuckDuckGo results have no snippet; give the model the pages' text
+    if all_news and deadline.allows(ENRICH_ESTIMATE + ARTICLE_ESTIMATE):
+        with profiler.stage('enrich'), deadline.stage('enrich'):
+            all_news[:3] = enricher.enrich(all_news[:3])
+    elif all_news:
+        deadline.skip("page enrichment")
+
+    if all_news:
+        logger.info(f"Total news items: {len(all_news)}")
+        with deadline.stage('warm-up'):
+            # Give a loading model a little longer; generation uses the ready models otherwise
+            warming.join(timeout=max(min(WARMUP_GRACE, deadline.remaining() - ARTICLE_ESTIMATE), 0))
+    else:
+        # An article needs real sources; links to our own site are not sources
+        logger.warning("No news found, skipping generation")
 
     # Generate articles
     generated_articles = []
-    for language in ['en']:
+    for language in (['en'] if all_news else []):
         try:
-            article = llm_client.generate_article(all_news[:3], language)
-            file_path = publisher.publish_article(article)
+            with profiler.stage('generate'), deadline.stage('generate'):
+                article = llm_client.generate_article(all_news[:3], language)
+            with deadline.stage('links'):
+                article = link_checker.validate(article)
+            with profiler.stage('publish'), deadline.stage('publish'):
+                file_path = publisher.publish_article(article)
             generated_articles.append(article)
-            logger.info(f"Generated {language} article: {article['title']}")
+            planner.record_article(all_news[:3], bool(article.should_index))
+            logger.info(f"Generated {language} article: {article.title}")
         except Exception as e:
             logger.error(f"Failed to generate article: {e}")
             continue
 
+    planner.save()
+    llm_client.router.save()
+    link_checker.save()
+    news_store.prune(config.news_store_days)
+    profiler.write_reports()
+    deadline.log_report()
+    llm_client.repairs.log_report()
     logger.info(f"Content generation complete! {len(generated_articles)} articles created.")
 
 
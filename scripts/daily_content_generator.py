@@ -12,19 +12,51 @@ This script:
 PRD Reference: Section 3.2 - Automation Engine
 """
 
+import argparse
 import os
 import sys
 import json
+import time
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import requests
 import markdown
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import hashlib
 import re
 
+from article_schema import ArticleValidationError, RepairStats, validate_article
+from content_quality import QualityScorer, QualityScore, brand_keywords, count_words
+from sitemap_feeds import SitemapFeedWriter
+from content_files import atomic_write
+from content_layout import ContentLayout, claim_slug
+from content_bundle import ContentBundle
+from related_posts import RelatedPostsIndex, inject_related_links
+from prerender import render_article, write_artifacts
+from records import Article, NewsItem
+from topic_planner import TopicPlanner
+from link_checker import LinkChecker
+from enrichment import PageEnricher
+from news_store import NewsStore
+from publish_queue import PublishQueue, QUEUE_FILE
+from profiling import NULL_PROFILER, StageProfiler, add_profiling_arguments, profiler_from_args
+from deadline import MIN_REQUEST_SECONDS, NO_DEADLINE, Deadline
+from file_locks import file_lock
+
+DEFAULT_BRAND = "Dogplay Agent"
+
+
+def apply_brand(text: str, brand: str) -> str:
+    """Swap the default brand name in prompt text for a site's own"""
+    if brand == DEFAULT_BRAND:
+        return text
+    return text.replace('Dogplay एजेंट', brand).replace(DEFAULT_BRAND, brand)
+
+
 # Configuration
 @dataclass
 class Config:
@@ -36,7 +68,26 @@ class Config:
     github_repo: str
     content_dir: str = "src/content/posts"
     ops_dir: str = "src/content/ops"
+    public_dir: str = "public"
+    content_layout: str = "flat"  # or "sharded" (posts/<YYYY>/<MM>/<slug>)
+    cache_dir: str = ".cache/dogplay"
+    site_url: str = "https://dogplay.io"
+    brand_name: str = DEFAULT_BRAND
+    chutes_llm_base_url: str = ""
+    llm_batch_api: bool = False
+    translation_model: str = "Qwen/Qwen2.5-7B-Instruct"
+    translation_workers: int = 6
+    repair_model: str = "Qwen/Qwen2.5-7B-Instruct"
     min_word_count: int = 300
+    related_posts: int = 3
+    publish_queue_max_files: int = 0
+    publish_queue_max_minutes: int = 0
+    run_budget_seconds: int = 0  # 0 = no run-level deadline
+    link_check_ttl_hours: float = 24
+    enrich_workers: int = 4
+    enrich_max_kb: int = 512
+    news_reuse_minutes: int = 30  # answer a repeated query from the news store
+    news_store_days: int = 30
     similarity_threshold: float = 0.7
 
     @classmethod
@@ -48,6 +99,21 @@ class Config:
             chutes_image_api_key=os.getenv('CHUTES_IMAGE_API_KEY', ''),
             github_token=os.getenv('GITHUB_TOKEN', ''),
             github_repo=os.getenv('GITHUB_REPOSITORY', ''),
+            site_url=os.getenv('NEXT_PUBLIC_SITE_URL', 'https://dogplay.io'),
+            brand_name=os.getenv('SITE_BRAND', DEFAULT_BRAND),
+            content_layout=os.getenv('CONTENT_LAYOUT', 'flat'),
+            translation_model=os.getenv('CHUTES_TRANSLATION_MODEL', 'Qwen/Qwen2.5-7B-Instruct'),
+            repair_model=os.getenv('CHUTES_REPAIR_MODEL', 'Qwen/Qwen2.5-7B-Instruct'),
+            chutes_llm_base_url=os.getenv('CHUTES_LLM_BASE_URL', ''),
+            llm_batch_api=os.getenv('CHUTES_LLM_BATCH_API', '').lower() in ('1', 'true', 'yes'),
+            publish_queue_max_files=int(os.getenv('PUBLISH_QUEUE_MAX_FILES', '0')),
+            publish_queue_max_minutes=int(os.getenv('PUBLISH_QUEUE_MAX_MINUTES', '0')),
+            run_budget_seconds=int(os.getenv('RUN_BUDGET_SECONDS', '0')),
+            link_check_ttl_hours=float(os.getenv('LINK_CHECK_TTL_HOURS', '24')),
+            enrich_workers=int(os.getenv('ENRICH_WORKERS', '4')),
+            enrich_max_kb=int(os.getenv('ENRICH_MAX_KB', '512')),
+            news_reuse_minutes=int(os.getenv('NEWS_REUSE_MINUTES', '30')),
+            news_store_days=int(os.getenv('NEWS_STORE_DAYS', '30')),
         )
 
     def validate(self) -> bool:
@@ -74,6 +140,7 @@ class BraveSearchClient:
 
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self.deadline = NO_DEADLINE
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/json',
@@ -86,7 +153,7 @@ class BraveSearchClient:
         query: str,
         max_results: int = 10,
         freshness: str = '1d'
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NewsItem]:
         """
         Search for news articles
 
@@ -106,7 +173,7 @@ class BraveSearchClient:
                 'text_decorations': False,
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=30)
+            response = self.session.get(self.BASE_URL, params=params, timeout=self.deadline.timeout(30))
             response.raise_for_status()
 
             data = response.json()
@@ -126,13 +193,13 @@ class BraveSearchClient:
                 if published_date and published_date < datetime.now() - timedelta(days=1):
                     continue
 
-                results.append({
-                    'title': item.get('title', ''),
-                    'url': item.get('url', ''),
-                    'snippet': item.get('description', ''),
-                    'published_date': published_date.isoformat() if published_date else None,
-                    'source': item.get('source', {}).get('name', 'Unknown'),
-                })
+                results.append(NewsItem(
+                    title=item.get('title', ''),
+                    url=item.get('url', ''),
+                    snippet=item.get('description', ''),
+                    published_date=published_date.isoformat() if published_date else None,
+                    source=(item.get('source') or {}).get('name') or 'Unknown',
+                ))
 
             logger.info(f"Found {len(results)} relevant articles for query: {query}")
             return results
@@ -161,13 +228,48 @@ class BraveSearchClient:
         return now
 
 
+@dataclass
+class GenerationJob:
+    """One article to generate in a batch"""
+    news_items: List[NewsItem]
+    language: str = 'en'
+    brand: str = DEFAULT_BRAND
+
+
 class ChutesLLMClient:
-    """Client for Chutes.ai LLM API - Content Generation"""
+    """Client for Chutes.ai LLM API - Content Generation
+
+    Works against any OpenAI-compatible `/chat/completions` backend; the base
+    URL can be overridden (e.g. to point at a local stand-in).
+    """
 
     BASE_URL = "https://llm.chutes.ai/v1"
+    MODEL = 'deepseek-ai/DeepSeek-R1-Distill-Llama-70B'
 
-    def __init__(self, api_key: str):
+    # Upper bound for a packed multi-article request
+    MAX_PACKED_ARTICLES = 3
+    BATCH_POLL_INTERVAL = 10
+    # Small model for short follow-ups that fill in missing article fields
+    REPAIR_MODEL = 'Qwen/Qwen2.5-7B-Instruct'
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        supports_n: bool = True,
+        supports_batch_api: bool = False,
+        max_workers: int = 4,
+        repair_model: Optional[str] = None,
+    ):
         self.api_key = api_key
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.repair_model = repair_model or self.REPAIR_MODEL
+        self.repairs = RepairStats()
+        self.supports_n = supports_n
+        self.supports_batch_api = supports_batch_api
+        self.max_workers = max_workers
+        self.profiler = NULL_PROFILER
+        self.deadline = NO_DEADLINE
         self.session = requests.Session()
         self.session.headers.update({
             'Authorization': f'Bearer {api_key}',
@@ -176,62 +278,314 @@ class ChutesLLMClient:
 
     def generate_article(
         self,
-        news_items: List[Dict[str, Any]],
-        language: str = 'en'
-    ) -> Dict[str, Any]:
+        news_items: List[NewsItem],
+        language: str = 'en',
+        brand: str = DEFAULT_BRAND
+    ) -> Article:
         """
         Generate blog article from news items
 
         Args:
             news_items: List of news articles
             language: Target language (en, hi, zh)
+            brand: Brand name the article promotes
 
         Returns:
             Generated article with metadata
         """
-        prompts = self._get_prompts(language)
+        try:
+            content = self._chat(self._build_messages(news_items, language, brand), max_tokens=2000)
+
+            # Parse structured response
+            article = self._parse_article_response(content, news_items, language)
 
-        # Build context from news items
-        news_context = "\n\n".join([
-            f"- {item['title']}: {item['snippet']}\n  Source: {item['source']}\n  URL: {item['url']}"
+            return article
+
+        except ArticleValidationError:
+            raise  # already logged by _parse_article_response
+        except (requests.RequestException, KeyError, json.JSONDecodeError) as e:
+            logger.error(f"Chutes LLM API error: {e}")
+            raise
+
+    def _build_news_context(self, news_items: List[NewsItem]) -> str:
+        """Build context from news items"""
+        return "\n\n".join([
+            f"- {item.title}: {item.snippet}\n  Source: {item.source}\n  URL: {item.url}"
+            + (f"\n  Excerpt: {item.passage}" if item.passage else '')
             for item in news_items[:5]
         ])
 
+    def _build_messages(
+        self, news_items: List[NewsItem], language: str, brand: str = DEFAULT_BRAND
+    ) -> List[Dict[str, str]]:
+        prompts = self._get_prompts(language, brand)
+        return [
+            {
+                'role': 'system',
+                'content': prompts['system']
+            },
+            {
+                'role': 'user',
+                'content': f"{prompts['user']}\n\nNews Sources:\n{self._build_news_context(news_items)}"
+            }
+        ]
+
+    def _completion(self, payload: Dict[str, Any], timeout: float = 60) -> Dict[str, Any]:
+        """POST a chat completion payload and return the decoded response"""
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            timeout=self.deadline.timeout(timeout)
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        timeout: float = 60,
+    ) -> str:
+        """Send one chat completion request and return the message content"""
+        result = self._completion(
+            {
+                'model': model or self.MODEL,
+                'messages': messages,
+                'temperature': temperature,
+                'max_tokens': max_tokens,
+            },
+            timeout=timeout
+        )
+        return result['choices'][0]['message']['content']
+
+    # Batch generation
+
+    def generate_articles_batch(self, jobs: List[GenerationJob]) -> List[Optional[Article]]:
+        """
+        Generate many articles with as few requests as the backend allows
+
+        Strategy, in order:
+        1. Provider batch endpoint (`/batches`) when `supports_batch_api` is set
+        2. Identical prompts share one request using the `n` parameter
+        3. Jobs with the same language share one packed request, so the
+           system prompt is sent once per pack
+        4. Anything left (or any failed pack) runs as concurrent single
+           requests over the pooled session
+
+        Returns:
+            Articles in job order; None where generation failed
+        """
+        results: List[Optional[Article]] = [None] * len(jobs)
+        if not jobs:
+            return results
+
+        pending = list(range(len(jobs)))
+
+        if self.supports_batch_api:
+            try:
+                self._run_batch_api(jobs, pending, results)
+                pending = [i for i in pending if results[i] is None]
+            except (requests.RequestException, KeyError, ValueError) as e:
+                logger.warning(f"Batch endpoint unavailable, falling back: {e}")
+
+        # Identical prompts -> n completions in one request
+        groups: Dict[str, List[int]] = {}
+        for i in pending:
+            key = json.dumps(self._build_messages(jobs[i].news_items, jobs[i].language, jobs[i].brand), sort_keys=True)
+            groups.setdefault(key, []).append(i)
+
+        singles = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {}
+            for indices in groups.values():
+                if len(indices) > 1 and self.supports_n:
+                    futures[pool.submit(self._run_n, jobs, indices, results)] = indices
+                else:
+                    singles.extend(indices)
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception(f"n-choice request for jobs {futures[future]} failed")
+                # Only the choices that failed are generated again
+                singles.extend(i for i in futures[future] if results[i] is None)
+
+            # Same language (and brand) -> packed requests sharing the system prompt
+            by_language: Dict[Tuple[str, str], List[int]] = {}
+            for i in singles:
+                by_language.setdefault((jobs[i].language, jobs[i].brand), []).append(i)
+
+            futures = {}
+            leftovers = []
+            for indices in by_language.values():
+                for start in range(0, len(indices), self.MAX_PACKED_ARTICLES):
+                    chunk = indices[start:start + self.MAX_PACKED_ARTICLES]
+                    if len(chunk) > 1:
+                        futures[pool.submit(self._run_packed, jobs, chunk, results)] = chunk
+                    else:
+                        leftovers.extend(chunk)
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception(f"Packed request for jobs {futures[future]} failed")
+                leftovers.extend(i for i in futures[future] if results[i] is None)
+
+            # Concurrent single requests for whatever is left
+            futures = {
+                pool.submit(self.generate_article, jobs[i].news_items, jobs[i].language, jobs[i].brand): i
+                for i in leftovers
+            }
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except (requests.RequestException, KeyError, ValueError):
+                    pass  # already logged by generate_article
+                except Exception:
+                    logger.exception(f"Generation for job {futures[future]} failed")
+
+        logger.info(f"Batch generated {sum(r is not None for r in results)}/{len(jobs)} articles")
+        return results
+
+    def _run_n(self, jobs: List[GenerationJob], indices: List[int], results: List[Optional[Article]]) -> None:
+        """One request with n choices for jobs sharing an identical prompt; bad choices are left as None"""
+        job = jobs[indices[0]]
         try:
-            response = self.session.post(
-                f"{self.BASE_URL}/chat/completions",
-                json={
-                    'model': 'deepseek-ai/DeepSeek-R1-Distill-Llama-70B',
-                    'messages': [
-                        {
-                            'role': 'system',
-                            'content': prompts['system']
-                        },
-                        {
-                            'role': 'user',
-                            'content': f"{prompts['user']}\n\nNews Sources:\n{news_context}"
-                        }
-                    ],
+            result = self._completion({
+                'model': self.MODEL,
+                'messages': self._build_messages(job.news_items, job.language, job.brand),
+                'temperature': 0.7,
+                'max_tokens': 2000,
+                'n': len(indices),
+            })
+            choices = result['choices']
+            if len(choices) < len(indices):
+                logger.warning(f"n-completion returned {len(choices)} of {len(indices)} choices")
+            for i, choice in zip(indices, choices):
+                try:
+                    results[i] = self._parse_article_response(
+                        choice['message']['content'], jobs[i].news_items, jobs[i].language
+                    )
+                except (KeyError, TypeError, ValueError):
+                    pass  # retried on its own; validation failures are already logged
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code in (400, 422):
+                logger.info("Backend rejected the n parameter, disabling it")
+                self.supports_n = False
+            logger.warning(f"n-completion request failed: {e}")
+        except (requests.RequestException, KeyError, ValueError) as e:
+            logger.warning(f"n-completion request failed: {e}")
+
+    def _run_packed(self, jobs: List[GenerationJob], indices: List[int], results: List[Optional[Article]]) -> None:
+        """Several same-language articles in one request (system prompt sent once)"""
+        language = jobs[indices[0]].language
+        prompts = self._get_prompts(language, jobs[indices[0]].brand)
+        tasks = "\n\n".join(
+            f"ARTICLE {n}\nNews Sources:\n{self._build_news_context(jobs[i].news_items)}"
+            for n, i in enumerate(indices, 1)
+        )
+        user = (
+            f"{prompts['user']}\n\nWrite {len(indices)} separate articles, one per ARTICLE block below. "
+            f"Return a JSON array with {len(indices)} objects in the same order, each in the output format above."
+            f"\n\n{tasks}"
+        )
+        try:
+            content = self._chat(
+                [{'role': 'system', 'content': prompts['system']}, {'role': 'user', 'content': user}],
+                max_tokens=min(2000 * len(indices), 8000),
+                timeout=60 * len(indices),
+            )
+            array_match = re.search(r'\[[\s\S]*\]', content)
+            items = json.loads(array_match.group()) if array_match else []
+            for i, item in zip(indices, items):
+                if isinstance(item, dict) and item.get('content'):
+                    try:
+                        results[i] = self._parse_article_response(
+                            json.dumps(item, ensure_ascii=False), jobs[i].news_items, language
+                        )
+                    except ArticleValidationError:
+                        pass  # retried as a single request
+        except (requests.RequestException, KeyError, json.JSONDecodeError) as e:
+            logger.warning(f"Packed request failed, falling back to single requests: {e}")
+
+    def _run_batch_api(self, jobs: List[GenerationJob], indices: List[int], results: List[Optional[Article]]) -> None:
+        """Submit jobs through an OpenAI-style `/files` + `/batches` endpoint and wait for the output"""
+        lines = [
+            json.dumps({
+                'custom_id': str(i),
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': {
+                    'model': self.MODEL,
+                    'messages': self._build_messages(jobs[i].news_items, jobs[i].language, jobs[i].brand),
                     'temperature': 0.7,
                     'max_tokens': 2000,
                 },
-                timeout=60
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            content = result['choices'][0]['message']['content']
+            }, ensure_ascii=False)
+            for i in indices
+        ]
+        headers = {'Authorization': f'Bearer {self.api_key}'}
+
+        response = requests.post(
+            f"{self.base_url}/files",
+            headers=headers,
+            data={'purpose': 'batch'},
+            files={'file': ('batch.jsonl', '\n'.join(lines).encode('utf-8'))},
+            timeout=self.deadline.timeout(60),
+        )
+        response.raise_for_status()
+        file_id = response.json()['id']
 
-            # Parse structured response
-            article = self._parse_article_response(content, news_items, language)
+        response = self.session.post(
+            f"{self.base_url}/batches",
+            json={'input_file_id': file_id, 'endpoint': '/v1/chat/completions', 'completion_window': '24h'},
+            timeout=self.deadline.timeout(30),
+        )
+        response.raise_for_status()
+        batch = response.json()
+
+        wait_until = time.monotonic() + 60 * len(indices)
+        while batch.get('status') not in ('completed', 'failed', 'expired', 'cancelled'):
+            # Leave enough of the run budget to fetch the output after this poll
+            if time.monotonic() > wait_until or not self.deadline.allows(self.BATCH_POLL_INTERVAL + 60):
+                # The jobs are regenerated by the fallback paths; do not pay for them twice
+                self._cancel_batch(batch['id'])
+                raise ValueError(f"batch {batch['id']} still {batch.get('status')} when the wait ran out, cancelled")
+            time.sleep(self.BATCH_POLL_INTERVAL)
+            response = self.session.get(f"{self.base_url}/batches/{batch['id']}", timeout=self.deadline.timeout(30))
+            response.raise_for_status()
+            batch = response.json()
 
-            return article
+        if batch['status'] != 'completed':
+            raise ValueError(f"batch {batch['id']} {batch['status']}")
 
-        except (requests.RequestException, KeyError, json.JSONDecodeError) as e:
-            logger.error(f"Chutes LLM API error: {e}")
-            raise
+        response = self.session.get(
+            f"{self.base_url}/files/{batch['output_file_id']}/content", timeout=self.deadline.timeout(60)
+        )
+        response.raise_for_status()
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            i = int(record['custom_id'])
+            body = (record.get('response') or {}).get('body') or {}
+            try:
+                content = body['choices'][0]['message']['content']
+                results[i] = self._parse_article_response(content, jobs[i].news_items, jobs[i].language)
+            except (KeyError, IndexError, ValueError) as e:
+                logger.warning(f"Batch item {i} failed: {e}")
+
+    def _cancel_batch(self, batch_id: str) -> None:
+        try:
+            # Not capped by the run deadline: a short overrun is cheaper than a billed batch
+            response = self.session.post(f"{self.base_url}/batches/{batch_id}/cancel", timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Could not cancel batch {batch_id}, it may still be billed: {e}")
 
-    def _get_prompts(self, language: str) -> Dict[str, str]:
+    def _get_prompts(self, language: str, brand: str = DEFAULT_BRAND) -> Dict[str, str]:
         """Get generation prompts for different languages"""
         prompts = {
             'en': {
@@ -294,47 +648,57 @@ OUTPUT FORMAT (JSON):
                 'user': '创建一篇关于印度最新 iGaming/板球博彩新闻的综合文章。'
             }
         }
-        return prompts.get(language, prompts['en'])
+        selected = prompts.get(language, prompts['en'])
+        return {key: apply_brand(text, brand) for key, text in selected.items()}
 
     def _parse_article_response(
         self,
         content: str,
-        news_items: List[Dict[str, Any]],
+        news_items: List[NewsItem],
         language: str
-    ) -> Dict[str, Any]:
-        """Parse LLM response into structured article"""
-        try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{[\s\S]*\}', content)
-            if json_match:
-                article_data = json.loads(json_match.group())
-            else:
-                # Fallback: create structure from plain text
-                article_data = {
-                    'title': content.split('\n')[0].strip('#').strip(),
-                    'excerpt': content[:150] + '...',
-                    'content': content,
-                    'seo_title': content.split('\n')[0].strip('#').strip()[:60],
-                    'seo_description': content[:160],
-                    'category': 'iGaming',
-                    'sources': [item['url'] for item in news_items]
-                }
-
-            # Add metadata
-            slug = self._generate_slug(article_data['title'], language)
-            article_data.update({
-                'slug': slug,
-                'language': language,
-                'date': datetime.now().isoformat(),
-                'sources': list(set(article_data.get('sources', []) + [item['url'] for item in news_items])),
-                'word_count': len(article_data.get('content', '').split()),
-            })
+    ) -> Article:
+        """Parse LLM response into a validated article, re-prompting for bad fields only"""
+        with self.profiler.stage('parse'):
+            try:
+                return self._parse_article_content(content, news_items, language)
+            except ArticleValidationError as e:
+                logger.error(f"Failed to parse article response: {e}")
+                raise
+
+    def _parse_article_content(
+        self,
+        content: str,
+        news_items: List[NewsItem],
+        language: str
+    ) -> Article:
+        article_data = validate_article(content, news_items, language, self._complete_repair, self.repairs)
+
+        # Add metadata
+        slug = self._generate_slug(article_data['title'], language)
+        article_data.update({
+            'slug': slug,
+            'language': language,
+            'date': datetime.now().isoformat(),
+            'word_count': count_words(article_data['content']),
+        })
 
-            return article_data
+        return Article.from_dict(article_data)
 
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Failed to parse article response: {e}")
-            raise
+    def _complete_repair(self, prompt: str, max_tokens: int) -> Tuple[str, int, int]:
+        """Short follow-up request on the cheap model for missing article fields"""
+        result = self._completion(
+            {
+                'model': self.repair_model,
+                'messages': [{'role': 'user', 'content': prompt}],
+                'temperature': 0.3,
+                'max_tokens': max_tokens,
+            },
+            timeout=30
+        )
+        text = result['choices'][0]['message']['content']
+        usage = result.get('usage') or {}
+        # ~4 characters per token when the backend does not report usage
+        return text, usage.get('prompt_tokens', len(prompt) // 4), usage.get('completion_tokens', len(text) // 4)
 
     def _generate_slug(self, title: str, language: str) -> str:
         """Generate URL-safe slug from title"""
@@ -349,6 +713,190 @@ OUTPUT FORMAT (JSON):
         return f"{date_prefix}-{slug}"
 
 
+class TranslationCache:
+    """Persistent cache of translated segments keyed by content hash"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        self.dirty = False
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(model: str, language: str, segment: str) -> str:
+        return hashlib.sha256(f"{model}\0{language}\0{segment}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.entries[key] = value
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        # Keep segments other runs cached since this one loaded the file
+        with file_lock(self.path):
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = {**json.load(f), **self.entries}
+            atomic_write(self.path, json.dumps(self.entries, ensure_ascii=False))
+        self.dirty = False
+
+
+class ArticleTranslator:
+    """Translates a generated English article into other languages
+
+    The article body is split into section-sized segments (at <h2> and
+    Markdown heading boundaries, then at paragraph ends up to SEGMENT_CHARS)
+    which are translated in parallel with a cheaper model. Segments are cached
+    by hash, so re-runs and edits only re-translate what changed. A segment
+    whose translation hits the token limit counts as failed, so a truncated
+    article is never published.
+    """
+
+    LANGUAGE_NAMES = {'hi': 'Hindi', 'zh': 'Simplified Chinese'}
+    META_FIELDS = ('title', 'excerpt', 'seo_title', 'seo_description')
+    SECTION_RE = re.compile(r'(?=<h2[\s>])|(?=^#{1,3} )', re.IGNORECASE | re.MULTILINE)
+    PARAGRAPH_RE = re.compile(r'(?<=</p>)|(?<=\n\n)', re.IGNORECASE)
+    # Longest segment sent in one request, unless a single paragraph is longer
+    SEGMENT_CHARS = 3000
+    # Output tokens allowed per input character; Devanagari and CJK text
+    # tokenise to several times as many tokens as the English source
+    TOKENS_PER_CHAR = 0.75
+    MIN_TOKENS = 256
+    MAX_TOKENS = 4096
+
+    def __init__(self, llm_client: ChutesLLMClient, config: Config):
+        self.llm_client = llm_client
+        self.model = config.translation_model
+        self.max_workers = config.translation_workers
+        self.cache = TranslationCache(Path(config.cache_dir) / 'translations.json')
+
+    def split_sections(self, content: str) -> List[str]:
+        """Split article HTML or Markdown into segments of at most SEGMENT_CHARS where possible"""
+        segments = []
+        for section in self.SECTION_RE.split(content):
+            if len(section) <= self.SEGMENT_CHARS:
+                segments.append(section)
+                continue
+            chunk = ''
+            for paragraph in self.PARAGRAPH_RE.split(section):
+                if chunk and len(chunk) + len(paragraph) > self.SEGMENT_CHARS:
+                    segments.append(chunk)
+                    chunk = ''
+                chunk += paragraph
+            segments.append(chunk)
+        return [segment for segment in segments if segment.strip()]
+
+    def translate_article(
+        self,
+        article: Article,
+        languages: List[str],
+        brand: str = DEFAULT_BRAND
+    ) -> Dict[str, Article]:
+        """
+        Translate an English article into each target language
+
+        Returns:
+            Mapping of language to translated article
+        """
+        sections = self.split_sections(article.content)
+        meta = json.dumps({field: getattr(article, field) for field in self.META_FIELDS}, ensure_ascii=False)
+
+        # Every (language, segment) pair that is not cached yet
+        jobs = {}
+        for language in languages:
+            for segment in [meta] + sections:
+                key = TranslationCache.key(self.model, language, segment)
+                if self.cache.get(key) is None:
+                    jobs[key] = (language, segment, segment is meta)
+
+        if jobs:
+            logger.info(f"Translating {len(jobs)} segments ({len(languages)} languages) with {self.model}")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    pool.submit(self._translate_segment, segment, language, is_meta, brand): key
+                    for key, (language, segment, is_meta) in jobs.items()
+                }
+                for future in as_completed(futures):
+                    try:
+                        self.cache.set(futures[future], future.result())
+                    except (requests.RequestException, KeyError, ValueError) as e:
+                        logger.error(f"Translation failed for segment: {e}")
+
+        self.cache.save()
+
+        translated = {}
+        for language in languages:
+            parts = [self.cache.get(TranslationCache.key(self.model, language, segment)) for segment in sections]
+            meta_text = self.cache.get(TranslationCache.key(self.model, language, meta))
+            if any(part is None for part in parts) or meta_text is None:
+                logger.warning(f"Incomplete {language} translation, skipping")
+                continue
+
+            fields = self._parse_meta(meta_text, article)
+            # Translations come back stripped; keep the blank lines between Markdown blocks
+            content = ''.join(
+                segment[:len(segment) - len(segment.lstrip())] + part + segment[len(segment.rstrip()):]
+                for segment, part in zip(sections, parts)
+            )
+            translated[language] = article.replace(
+                **fields,
+                content=content,
+                language=language,
+                slug=f"{article.slug}-{language}",
+                word_count=count_words(content),
+                translated_from=article.slug,
+            )
+
+        return translated
+
+    def _translate_segment(self, segment: str, language: str, is_meta: bool, brand: str = DEFAULT_BRAND) -> str:
+        target = self.LANGUAGE_NAMES.get(language, language)
+        if is_meta:
+            instruction = (
+                f"Translate the values of this JSON object from English to {target}. "
+                "Keep the keys unchanged and return only the JSON object."
+            )
+        else:
+            instruction = (
+                f"Translate this HTML fragment from English to {target}. "
+                "Preserve all HTML tags, attributes and URLs, keep the brand name "
+                f"\"{brand}\" in English, and return only the translated HTML."
+            )
+
+        max_tokens = min(max(int(len(segment) * self.TOKENS_PER_CHAR), self.MIN_TOKENS), self.MAX_TOKENS)
+        result = self.llm_client._completion({
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': instruction},
+                {'role': 'user', 'content': segment},
+            ],
+            'temperature': 0.2,
+            'max_tokens': max_tokens,
+        })
+        choice = result['choices'][0]
+        if choice.get('finish_reason') == 'length':
+            raise ValueError(f"{target} translation of a {len(segment)}-char segment hit the {max_tokens}-token limit")
+        return choice['message']['content'].strip()
+
+    def _parse_meta(self, text: str, article: Article) -> Dict[str, str]:
+        """Parse translated meta fields, falling back to the English values"""
+        fields = {field: getattr(article, field) for field in self.META_FIELDS}
+        json_match = re.search(r'\{[\s\S]*\}', text)
+        if json_match:
+            try:
+                data = json.loads(json_match.group())
+                fields.update({k: v for k, v in data.items() if k in fields and isinstance(v, str) and v})
+            except json.JSONDecodeError:
+                pass
+        return fields
+
+
 class ChutesImageClient:
     """Client for Chutes.ai Image Generation API
 
@@ -416,16 +964,29 @@ class ContentPublisher:
         self.config = config
         self.content_dir = Path(config.content_dir)
         self.ops_dir = Path(config.ops_dir)
+        self.scorer = self.quality_scorer(config)
+        self.feeds = SitemapFeedWriter(config.public_dir, self.ops_dir / 'index', config.site_url, config.brand_name)
+        self.related_index = RelatedPostsIndex(self.ops_dir / 'index')
+        sharded = config.content_layout == 'sharded'
+        self.layout = ContentLayout(self.content_dir, sharded)
+        self.low_quality_layout = ContentLayout(self.ops_dir / 'low-quality', sharded)
+        self.bundle = ContentBundle(Path(config.cache_dir) / 'bundle')
+        # Pre-rendered index.html/meta.json files written this run
+        self.artifact_files: List[str] = []
 
         # Ensure directories exist
         self.content_dir.mkdir(parents=True, exist_ok=True)
         self.ops_dir.mkdir(parents=True, exist_ok=True)
 
-    def check_duplicate(self, article: Dict[str, Any]) -> bool:
+    @staticmethod
+    def quality_scorer(config: Config) -> QualityScorer:
+        return QualityScorer(min_word_count=config.min_word_count, keywords=brand_keywords(config.brand_name))
+
+    def check_duplicate(self, article: Article) -> bool:
         """Check if article is too similar to existing content"""
         # Calculate hash of article content
         content_hash = hashlib.md5(
-            article['content'].encode()
+            article.content.encode()
         ).hexdigest()
 
         # Check against existing articles
@@ -435,35 +996,23 @@ class ContentPublisher:
                 existing_hash = hashlib.md5(existing_content.encode()).hexdigest()
 
                 if content_hash == existing_hash:
-                    logger.info(f"Duplicate content detected, skipping: {article['title']}")
+                    logger.info(f"Duplicate content detected, skipping: {article.title}")
                     return True
 
         return False
 
-    def assess_quality(self, article: Dict[str, Any]) -> tuple[bool, str]:
+    def assess_quality(self, article: Article) -> QualityScore:
         """
         Assess if content meets quality threshold for indexing
 
         Returns:
-            (should_index, reason)
+            QualityScore with should_index verdict, reason and metrics
         """
-        # Word count check
-        if article['word_count'] < self.config.min_word_count:
-            return False, f"Below word count threshold: {article['word_count']}"
-
-        # Source availability check
-        if not article.get('sources') or len(article['sources']) < 1:
-            return False, "No sources provided"
-
-        # Content uniqueness (basic check)
-        if len(article['content']) < 500:
-            return False, "Content too brief"
-
-        return True, "Meets quality standards"
+        return self.scorer.score(article)
 
     def publish_article(
         self,
-        article: Dict[str, Any],
+        article: Article,
         image_url: Optional[str] = None
     ) -> str:
         """
@@ -472,32 +1021,60 @@ class ContentPublisher:
         Returns:
             File path
         """
-        should_index, quality_reason = self.assess_quality(article)
+        quality = self.assess_quality(article)
+        should_index = quality.should_index
+        article.should_index = should_index
+        article.word_count = quality.metrics.word_count
+
+        # Determine directory based on indexability; a slug another post
+        # (or a concurrent run) already has gets a -2, -3 ... suffix
+        layout = self.layout if should_index else self.low_quality_layout
+        slug, article_dir = claim_slug((self.layout, self.low_quality_layout), layout, article.slug, article.date)
+        if slug != article.slug:
+            logger.info(f"Slug {article.slug} is taken, publishing as {slug}")
+            article.slug = slug
+
+        with file_lock(self.layout.root / slug):
+            return self._write_post(article, article_dir, layout, quality, image_url)
+
+    def _write_post(
+        self,
+        article: Article,
+        article_dir: Path,
+        layout: ContentLayout,
+        quality: QualityScore,
+        image_url: Optional[str],
+    ) -> str:
+        should_index = article.should_index
 
-        # Determine directory based on indexability
-        if should_index:
-            article_dir = self.content_dir / article['slug']
-        else:
-            article_dir = self.ops_dir / 'low-quality' / article['slug']
+        # Link to existing posts before the new one joins the index
+        related = self.related_index.related(article, k=self.config.related_posts)
+        article.content = inject_related_links(article.content, related, article.language)
+
+        body = article.content
 
-        article_dir.mkdir(parents=True, exist_ok=True)
+        # Render once at publish time so the site serves precomputed HTML
+        rendered = render_article(body, excerpt=article.excerpt)
+        article.reading_time = rendered.reading_time
 
         # Create frontmatter
         frontmatter = {
-            'title': article['title'],
-            'slug': article['slug'],
-            'excerpt': article['excerpt'],
-            'date': article['date'],
-            'language': article['language'],
-            'category': article.get('category', 'iGaming'),
+            'title': article.title,
+            'slug': article.slug,
+            'excerpt': article.excerpt or rendered.excerpt,
+            'date': article.date,
+            'language': article.language,
+            'category': article.category,
             'seo': {
-                'title': article.get('seo_title', article['title']),
-                'description': article.get('seo_description', article['excerpt']),
+                'title': article.seo_title or article.title,
+                'description': article.seo_description or article.excerpt,
             },
-            'sources': article.get('sources', []),
+            'sources': list(article.sources),
             'cover_image': image_url,
             'should_index': should_index,
-            'quality_note': quality_reason,
+            'quality_note': quality.reason,
+            'quality': quality.to_dict(),
+            'reading_time': rendered.reading_time,
         }
 
         # Create Markdown file
@@ -505,17 +1082,44 @@ class ContentPublisher:
 {json.dumps(frontmatter, indent=2, ensure_ascii=False)}
 ---
 
-{article['content']}
+{body}
 """
 
         file_path = article_dir / 'index.mdx'
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        atomic_write(file_path, md_content)
+        self.artifact_files.extend(write_artifacts(article_dir, rendered))
+        layout.register(article.slug, article_dir)
+        index_file = layout.save()
+        if index_file:
+            self.artifact_files.append(index_file)
+
+        if should_index:
+            self.bundle.put(article.slug, file_path)
+        else:
+            self.bundle.remove(article.slug)
+
+        # Only the affected sitemap shard and language feed are rewritten
+        if should_index:
+            self.feeds.record(article)
+            self.related_index.add(article)
+        else:
+            self.feeds.remove(article.slug, article.language, article.date)
+            self.related_index.remove(article.slug)
 
         logger.info(f"Published article: {file_path}")
         return str(file_path)
 
-    def publish_ops_brief(self, articles: List[Dict[str, Any]]) -> str:
+    def take_changed_files(self) -> List[str]:
+        """Index, feed and artifact files written since the last call"""
+        files = list(dict.fromkeys(self.artifact_files))
+        files.extend(sorted(self.feeds.changed_files))
+        if self.related_index.path.exists():
+            files.append(str(self.related_index.path))
+        self.artifact_files = []
+        self.feeds.changed_files.clear()
+        return files
+
+    def publish_ops_brief(self, articles: List[Article], timings: Optional[Dict[str, Any]] = None) -> str:
         """Publish operations brief in Traditional Chinese"""
         brief_content = f"""# Daily Content Brief - {datetime.now().strftime('%Y-%m-%d')}
 
@@ -524,22 +1128,44 @@ class ContentPublisher:
 """
         for article in articles:
             brief_content += f"""
-### {article['title']}
+### {article.title}
 
-- **Language**: {article['language']}
-- **Category**: {article.get('category', 'N/A')}
-- **Word Count**: {article['word_count']}
-- **Slug**: `{article['slug']}`
-- **Status**: {'Indexed' if article.get('should_index') else 'No Index'}
+- **Language**: {article.language}
+- **Category**: {article.category or 'N/A'}
+- **Word Count**: {article.word_count}
+- **Slug**: `{article.slug}`
+- **Status**: {'Indexed' if article.should_index else 'No Index'}
 
-**Excerpt**: {article['excerpt'][:200]}...
+**Excerpt**: {article.excerpt[:200]}...
 """
 
+        if timings:
+            budget = timings['budget_seconds']
+            brief_content += f"""
+## Run Timing
+
+- **Elapsed**: {timings['elapsed_seconds']:.0f}s{f" of {budget:.0f}s budget" if budget else ''}
+"""
+            for stage, seconds in timings['stages'].items():
+                brief_content += f"- **{stage}**: {seconds:.1f}s\n"
+            if timings['skipped']:
+                brief_content += f"- **Skipped for time**: {', '.join(timings['skipped'])}\n"
+            repairs = timings.get('repairs')
+            if repairs and (repairs['requests'] or repairs['salvaged'] or repairs['rejected']):
+                brief_content += (
+                    f"- **Article repairs**: {repairs['salvaged']} salvaged, {repairs['repaired']} repaired, "
+                    f"{repairs['rejected']} rejected ({repairs['requests']} requests, {repairs['seconds']:.1f}s, "
+                    f"{repairs['prompt_tokens'] + repairs['completion_tokens']} tokens)\n"
+                )
+
         file_path = self.ops_dir / 'daily' / f"{datetime.now().strftime('%Y-%m-%d')}.md"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(brief_content)
+        # Later runs of the day add their sections below the earlier ones
+        with file_lock(file_path):
+            if file_path.exists():
+                runs = brief_content.split('\n', 1)[1]
+                brief_content = file_path.read_text(encoding='utf-8').rstrip('\n') + f"\n\n---\n{runs}"
+            atomic_write(file_path, brief_content)
 
         return str(file_path)
 
@@ -547,14 +1173,44 @@ class ContentPublisher:
 class GitHubPublisher:
     """Handles Git operations for publishing content"""
 
+    MAX_PUSH_ATTEMPTS = 5
+    RETRY_BACKOFF = 2.0
+    TIMEOUT = 30
+
     def __init__(self, config: Config):
         self.config = config
+        self.deadline = NO_DEADLINE
         self.session = requests.Session()
         self.session.headers.update({
             'Authorization': f'token {config.github_token}',
             'Accept': 'application/vnd.github.v3+json',
         })
 
+    def _tree_items(self, api_base: str, files: List[str]) -> List[Dict[str, Any]]:
+        """Upload blobs once; files that no longer exist become deletions"""
+        tree_items = []
+        root = Path.cwd()
+        for file_path in files:
+            relative_path = Path(file_path).resolve().relative_to(root).as_posix()
+            item = {'path': relative_path, 'mode': '100644', 'type': 'blob'}
+
+            if not os.path.exists(file_path):
+                # Moved or removed since it was queued
+                tree_items.append(dict(item, sha=None))
+                continue
+
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            response = self.session.post(
+                f"{api_base}/git/blobs",
+                json={'content': content, 'encoding': 'utf-8'},
+                timeout=self.deadline.timeout(self.TIMEOUT)
+            )
+            response.raise_for_status()
+            tree_items.append(dict(item, sha=response.json()['sha']))
+        return tree_items
+
     def commit_and_push(
         self,
         files: List[str],
@@ -563,6 +1219,11 @@ class GitHubPublisher:
         """
         Commit and push changes to GitHub
 
+        The ref update is optimistic: the commit is built on the branch head
+        that was just read and the ref is only moved if it is still a fast
+        forward. If someone else pushed in between, the same blobs are
+        re-applied on top of the new head and the update is retried.
+
         Args:
             files: List of file paths that were created/modified
             commit_message: Git commit message
@@ -575,159 +1236,438 @@ class GitHubPublisher:
             api_base = f"https://api.github.com/repos/{self.config.github_repo}"
 
             # Get default branch
-            response = self.session.get(f"{api_base}")
+            response = self.session.get(f"{api_base}", timeout=self.deadline.timeout(self.TIMEOUT))
             response.raise_for_status()
             default_branch = response.json()['default_branch']
 
-            # Get latest commit SHA
-            response = self.session.get(f"{api_base}/git/refs/heads/{default_branch}")
-            response.raise_for_status()
-            latest_sha = response.json()['object']['sha']
+            # Blobs do not depend on the parent commit, so upload them once
+            tree_items = self._tree_items(api_base, files)
 
-            # Create tree with new files
-            tree_items = []
-            for file_path in files:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+            for attempt in range(1, self.MAX_PUSH_ATTEMPTS + 1):
+                # Get latest commit SHA
+                response = self.session.get(
+                    f"{api_base}/git/refs/heads/{default_branch}", timeout=self.deadline.timeout(self.TIMEOUT)
+                )
+                response.raise_for_status()
+                latest_sha = response.json()['object']['sha']
 
-                # Create blob
+                # Create tree on top of the current head
                 response = self.session.post(
-                    f"{api_base}/git/blobs",
-                    json={'content': content, 'encoding': 'utf-8'}
+                    f"{api_base}/git/trees",
+                    json={'tree': tree_items, 'base_tree': latest_sha},
+                    timeout=self.deadline.timeout(self.TIMEOUT)
                 )
                 response.raise_for_status()
-                blob_sha = response.json()['sha']
+                tree_sha = response.json()['sha']
 
-                # Get relative path for tree
-                relative_path = str(Path(file_path).relative_to(Path.cwd()))
+                # Create commit
+                response = self.session.post(
+                    f"{api_base}/git/commits",
+                    json={
+                        'message': commit_message,
+                        'tree': tree_sha,
+                        'parents': [latest_sha]
+                    },
+                    timeout=self.deadline.timeout(self.TIMEOUT)
+                )
+                response.raise_for_status()
+                commit_sha = response.json()['sha']
 
-                tree_items.append({
-                    'path': relative_path,
-                    'mode': '100644',
-                    'type': 'blob',
-                    'sha': blob_sha
-                })
+                # Update reference (fails with 422 if the head moved)
+                response = self.session.patch(
+                    f"{api_base}/git/refs/heads/{default_branch}",
+                    json={'sha': commit_sha, 'force': False},
+                    timeout=self.deadline.timeout(self.TIMEOUT)
+                )
+                retry_fits = self.deadline.allows(self.RETRY_BACKOFF * attempt + self.TIMEOUT)
+                if response.status_code == 422 and attempt < self.MAX_PUSH_ATTEMPTS and retry_fits:
+                    logger.warning(
+                        f"{default_branch} moved during push (attempt {attempt}), rebasing and retrying"
+                    )
+                    time.sleep(self.RETRY_BACKOFF * attempt)
+                    continue
+                response.raise_for_status()
 
-            # Create tree
-            response = self.session.post(
-                f"{api_base}/git/trees",
-                json={'tree': tree_items, 'base_tree': latest_sha}
-            )
-            response.raise_for_status()
-            tree_sha = response.json()['sha']
+                logger.info(f"Successfully pushed commit: {commit_sha}")
+                return True
 
-            # Create commit
-            response = self.session.post(
-                f"{api_base}/git/commits",
-                json={
-                    'message': commit_message,
-                    'tree': tree_sha,
-                    'parents': [latest_sha]
-                }
-            )
-            response.raise_for_status()
-            commit_sha = response.json()['sha']
+        except (requests.RequestException, OSError, ValueError) as e:
+            logger.error(f"GitHub API error: {e}")
+        return False
 
-            # Update reference
-            response = self.session.patch(
-                f"{api_base}/git/refs/heads/{default_branch}",
-                json={'sha': commit_sha}
-            )
-            response.raise_for_status()
 
-            logger.info(f"Successfully pushed commit: {commit_sha}")
-            return True
+# Search keywords from PRD
+SEARCH_KEYWORDS = [
+    'India iGaming news',
+    'Cricket betting updates',
+    'Online casino regulation India',
+    'IPL betting news',
+    'Indian sports betting',
+]
 
-        except requests.RequestException as e:
-            logger.error(f"GitHub API error: {e}")
-            return False
+DEFAULT_LANGUAGES = ['en', 'hi', 'zh']
 
 
-def main():
-    """Main execution function"""
-    logger.info("Starting daily content generation...")
+@dataclass
+class RunResult:
+    """Outcome of one ContentPipeline.run"""
+    articles: List[Article]
+    files: List[str]
+    pushed: bool = False
+    queued: int = 0
+    timings: Dict[str, Any] = field(default_factory=dict)
 
-    # Load configuration
-    config = Config.from_env()
 
-    if not config.validate():
-        logger.error("Invalid configuration. Please check environment variables.")
-        sys.exit(1)
+class ContentPipeline:
+    """Search -> generate -> publish -> push, with clients built once
 
-    # Initialize clients
-    brave_client = BraveSearchClient(config.brave_search_api_key)
-    llm_client = ChutesLLMClient(config.chutes_llm_api_key)
-    image_client = ChutesImageClient(config.chutes_image_api_key)
-    publisher = ContentPublisher(config)
-    github_pub = GitHubPublisher(config)
-
-    # Search keywords from PRD
-    search_keywords = [
-        'India iGaming news',
-        'Cricket betting updates',
-        'Online casino regulation India',
-        'IPL betting news',
-        'Indian sports betting',
-    ]
-
-    # Collect all news
-    all_news = []
-    for keyword in search_keywords[:3]:  # Use top 3 keywords
-        news = brave_client.search_news(keyword, max_results=5)
-        all_news.extend(news)
-
-    if not all_news:
-        logger.warning("No news articles found. Exiting.")
-        sys.exit(0)
+    Holding on to a pipeline keeps HTTP sessions, the translation cache and
+    the related-posts index warm between runs (see content_daemon.py).
+    """
+
+    SEARCH_RESULTS = 5
+
+    # Seconds of run budget kept back so the push still fits
+    PUSH_RESERVE = 45
+    # Rough wall time of optional work, used to skip it when the budget is tight
+    SEARCH_ESTIMATE = 15
+    ARTICLE_ESTIMATE = 60
+    TRANSLATION_ESTIMATE = 30
+    ENRICH_ESTIMATE = 20
+    IMAGE_ESTIMATE = 30
+    # How far back stored news may stand in for a search that was skipped or empty
+    STORED_NEWS_HOURS = 24
+
+    def __init__(
+        self,
+        config: Config,
+        profiler: StageProfiler = NULL_PROFILER,
+        shared: Optional['ContentPipeline'] = None,
+    ):
+        """
+        Args:
+            shared: Another site's pipeline whose search, LLM, image,
+                translation and link-check clients (and their HTTP pools
+                and caches) and news store this one reuses; see multi_site.py
+        """
+        self.config = config
+        self.profiler = profiler
+        self.deadline = NO_DEADLINE
+        if shared is None:
+            self.brave_client = BraveSearchClient(config.brave_search_api_key)
+            self.llm_client = ChutesLLMClient(
+                config.chutes_llm_api_key,
+                base_url=config.chutes_llm_base_url or None,
+                supports_batch_api=config.llm_batch_api,
+                repair_model=config.repair_model,
+            )
+            self.image_client = ChutesImageClient(config.chutes_image_api_key)
+            self.translator = ArticleTranslator(self.llm_client, config)
+            self.link_checker = LinkChecker(Path(config.cache_dir), config.link_check_ttl_hours, site_url=config.site_url)
+            self.enricher = PageEnricher(
+                Path(config.cache_dir), max_workers=config.enrich_workers, max_bytes=config.enrich_max_kb * 1024
+            )
+            self.news_store = NewsStore(Path(config.cache_dir))
+        else:
+            self.brave_client = shared.brave_client
+            self.llm_client = shared.llm_client
+            self.image_client = shared.image_client
+            self.translator = shared.translator
+            self.link_checker = shared.link_checker
+            self.link_checker.add_site(config.site_url)
+            self.enricher = shared.enricher
+            self.news_store = shared.news_store
+        self.publisher = ContentPublisher(config)
+        self.github_pub = GitHubPublisher(config)
+        if shared is not None and shared.config.github_token == config.github_token:
+            self.github_pub.session = shared.github_pub.session
+        self.publish_queue = PublishQueue(
+            Path(config.cache_dir) / QUEUE_FILE,
+            config.publish_queue_max_files,
+            config.publish_queue_max_minutes,
+        )
+        self.planner = TopicPlanner(Path(config.ops_dir) / 'index', max_results=self.SEARCH_RESULTS)
+        self.llm_client.profiler = profiler
 
-    logger.info(f"Total news articles collected: {len(all_news)}")
+    def _set_deadline(self, deadline: Deadline) -> None:
+        self.deadline = deadline
+        for client in (self.brave_client, self.llm_client, self.github_pub, self.link_checker, self.enricher):
+            client.deadline = deadline
 
-    # Select top relevant articles
-    selected_news = all_news[:5]
+    @contextmanager
+    def _stage(self, name: str):
+        with self.profiler.stage(name), self.deadline.stage(name):
+            yield
 
-    # Generate articles in multiple languages
-    generated_articles = []
-    published_files = []
+    def _search(self, keyword: str, fetch: bool = True) -> Tuple[List[NewsItem], Optional[List[NewsItem]]]:
+        """
+        News for a keyword: a recent identical query from the news store,
+        else a Brave search (stored), else stored items matching the keyword
 
-    for language in ['en', 'hi', 'zh']:
+        Args:
+            fetch: Whether an API call is allowed (False when out of time)
+
+        Returns:
+            (news, what the API call returned, or None when none was made)
+        """
+        store = self.news_store
+        reuse = self.config.news_reuse_minutes
+        if reuse > 0:
+            news = store.recent('brave', keyword, reuse * 60, self.SEARCH_RESULTS)
+            if news:
+                logger.info(f"Reusing {len(news)} stored results for query: {keyword}")
+                return news, None
+        fetched = None
+        if fetch:
+            fetched = self.brave_client.search_news(keyword, max_results=self.SEARCH_RESULTS)
+            store.add(fetched, 'brave', keyword)
+            if fetched:
+                return fetched, fetched
+        news = store.search(keyword, max_age_hours=self.STORED_NEWS_HOURS, limit=self.SEARCH_RESULTS)
+        if news:
+            logger.info(f"Using {len(news)} stored items matching: {keyword}")
+        return news, fetched
+
+    def _report(self) -> Dict[str, Any]:
+        """Run timing, plus the time and tokens spent repairing article fields"""
+        return dict(self.deadline.report(), repairs=self.llm_client.repairs.report())
+
+    def _fit_languages(self, languages: List[str], estimate: float, keep: int) -> List[str]:
+        """The first `keep` languages always; the rest only while the budget covers them"""
+        deadline = self.deadline
+        if not deadline.limited:
+            return languages
+        affordable = int((deadline.remaining() - self.PUSH_RESERVE) // estimate)
+        fitted = languages[:max(affordable, keep)]
+        for language in languages[len(fitted):]:
+            deadline.skip(f"{language} article")
+        return fitted
+
+    def run(
+        self,
+        keywords: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        translate: bool = False,
+        max_keywords: int = 3,
+        push: bool = True,
+        budget: Optional[float] = None,
+    ) -> RunResult:
+        """
+        Run one full content generation pass
+
+        Args:
+            budget: Run-level time limit in seconds (default RUN_BUDGET_SECONDS,
+                0 for none). Every request's timeout is capped at what is
+                left of it, and optional stages are skipped when it runs low.
+        """
+        budget = self.config.run_budget_seconds if budget is None else budget
+        self._set_deadline(Deadline(budget or None))
+        self.llm_client.repairs = RepairStats()
         try:
-            article = llm_client.generate_article(selected_news, language)
+            result = self._run(keywords, languages, translate, max_keywords, push)
+            result.timings = self._report()
+            self.deadline.log_report()
+            self.llm_client.repairs.log_report()
+            return result
+        finally:
+            self._set_deadline(NO_DEADLINE)
+
+    def _run(
+        self,
+        keywords: Optional[List[str]],
+        languages: Optional[List[str]],
+        translate: bool,
+        max_keywords: int,
+        push: bool,
+    ) -> RunResult:
+        keywords = keywords or SEARCH_KEYWORDS
+        languages = languages or DEFAULT_LANGUAGES
+        publisher = self.publisher
+        deadline = self.deadline
+
+        # Collect all news from the keywords with the best recent yield
+        all_news = []
+        with self._stage('search'):
+            for keyword in self.planner.choose(keywords, max_keywords):
+                # Beyond the first productive keyword, searching is optional
+                needed = self.SEARCH_ESTIMATE + self.ARTICLE_ESTIMATE + self.PUSH_RESERVE if all_news else MIN_REQUEST_SECONDS
+                fetch = deadline.allows(needed)
+                if not fetch:
+                    deadline.skip(f"search for {keyword!r}")
+                started = time.perf_counter()
+                news, fetched = self._search(keyword, fetch)
+                # The planner learns from API calls only; stored items are just de-duplicated
+                if fetched is not None:
+                    all_news.extend(self.planner.record_search(keyword, fetched, time.perf_counter() - started))
+                if news is not fetched:
+                    all_news.extend(self.planner.unseen(news))
+
+        if not all_news:
+            logger.warning("No new news articles found.")
+            self.planner.save()
+            return RunResult([], [])
+
+        logger.info(f"Total news articles collected: {len(all_news)}")
+
+        # Select top relevant articles
+        with self._stage('rank'):
+            selected_news = all_news[:5]
+
+        # Give the LLM the articles' text, not just one-line snippets
+        if deadline.allows(self.ENRICH_ESTIMATE + self.ARTICLE_ESTIMATE + self.PUSH_RESERVE):
+            with self._stage('enrich'):
+                selected_news = self.enricher.enrich(selected_news)
+        else:
+            deadline.skip("page enrichment")
+
+        # Generate articles in multiple languages
+        generated_articles = []
+        published_files = []
+
+        def publish(article: Article, language: str) -> Optional[Article]:
+            # Drop dead or made-up source links
+            with self._stage('links'):
+                article = self.link_checker.validate(article)
 
             # Check for duplicates
             if publisher.check_duplicate(article):
-                continue
+                return None
 
             # Generate cover image
             image_url = None
             if language in ['en', 'hi']:  # Only generate for main languages
-                image_url = image_client.generate_cover_image(
-                    article['title'],
-                    article['excerpt']
-                )
+                if deadline.allows(self.IMAGE_ESTIMATE + self.PUSH_RESERVE):
+                    with self._stage('image'):
+                        image_url = self.image_client.generate_cover_image(
+                            article.title,
+                            article.excerpt
+                        )
+                else:
+                    deadline.skip(f"{language} cover image")
 
             # Publish article
-            file_path = publisher.publish_article(article, image_url)
+            with self._stage('publish'):
+                file_path = publisher.publish_article(article, image_url)
             published_files.append(file_path)
             generated_articles.append(article)
+            self.planner.record_article(selected_news, bool(article.should_index))
+
+            logger.info(f"Generated {language} article: {article.title}")
+            return article
+
+        if translate:
+            # Generate once in English, translate section by section
+            try:
+                with self._stage('generate'):
+                    article = self.llm_client.generate_article(selected_news, 'en', self.config.brand_name)
+                with self._stage('translate'):
+                    targets = self._fit_languages(
+                        [language for language in languages if language != 'en'], self.TRANSLATION_ESTIMATE, keep=0
+                    )
+                    translations = (
+                        self.translator.translate_article(article, targets, self.config.brand_name) if targets else {}
+                    )
+                published = publish(article, 'en') if 'en' in languages else None
+                for language, translated in translations.items():
+                    # Follow the English post if it had to take a different slug
+                    if published is not None and published.slug != article.slug:
+                        translated = translated.replace(
+                            slug=f"{published.slug}-{language}", translated_from=published.slug
+                        )
+                    publish(translated, language)
+            except Exception as e:
+                logger.error(f"Failed to generate translated articles: {e}")
+        else:
+            languages = self._fit_languages(languages, self.ARTICLE_ESTIMATE, keep=1)
+            with self._stage('generate'):
+                articles = self.llm_client.generate_articles_batch(
+                    [GenerationJob(selected_news, language, self.config.brand_name) for language in languages]
+                )
+            for language, article in zip(languages, articles):
+                if article is None:
+                    logger.error(f"Failed to generate {language} article")
+                    continue
+                try:
+                    publish(article, language)
+                except Exception as e:
+                    logger.error(f"Failed to publish {language} article: {e}")
+
+        planner_file = self.planner.save()
+        self.link_checker.save()
+        self.news_store.prune(self.config.news_store_days)
+
+        if not generated_articles:
+            logger.warning("No articles generated.")
+            publisher.take_changed_files()
+            return RunResult([], [])
+
+        # Publish ops brief
+        with self._stage('publish'):
+            brief_path = publisher.publish_ops_brief(generated_articles, self._report())
+        published_files.append(brief_path)
+        published_files.extend(publisher.take_changed_files())
+        published_files.append(planner_file)
+
+        # Queue for GitHub; pushed once a size/time threshold is reached
+        pushed = False
+        if push and self.can_push:
+            commit_message = f"chore: daily content update {datetime.now().strftime('%Y-%m-%d')}"
+            self.publish_queue.enqueue(published_files, commit_message)
+            pushed = self.flush()
+
+        return RunResult(generated_articles, published_files, pushed, self.publish_queue.pending)
+
+    @property
+    def can_push(self) -> bool:
+        return bool(self.config.github_token and self.config.github_repo)
+
+    def flush(self, force: bool = False) -> bool:
+        """Push the publish queue if it is due (or unconditionally with force)"""
+        if not self.can_push:
+            return False
+        with self._stage('push'):
+            return self.publish_queue.flush(self.github_pub, force=force)
 
-            logger.info(f"Generated {language} article: {article['title']}")
 
-        except Exception as e:
-            logger.error(f"Failed to generate {language} article: {e}")
-            continue
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Daily content generator")
+    parser.add_argument(
+        '--translate', action='store_true',
+        help='Generate the English article once and translate it to hi/zh'
+    )
+    parser.add_argument(
+        '--flush', action='store_true',
+        help='Push everything in the publish queue, ignoring its thresholds'
+    )
+    parser.add_argument(
+        '--budget', type=float, default=None,
+        help='Run time budget in seconds (default RUN_BUDGET_SECONDS; 0 for none)'
+    )
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
 
-    if not generated_articles:
-        logger.warning("No articles generated. Exiting.")
-        sys.exit(0)
+    logger.info("Starting daily content generation...")
 
-    # Publish ops brief
-    brief_path = publisher.publish_ops_brief(generated_articles)
-    published_files.append(brief_path)
+    # Load configuration
+    config = Config.from_env()
+
+    if not config.validate():
+        logger.error("Invalid configuration. Please check environment variables.")
+        sys.exit(1)
 
-    # Commit to GitHub
-    if config.github_token and config.github_repo:
-        commit_message = f"chore: daily content update {datetime.now().strftime('%Y-%m-%d')}"
-        github_pub.commit_and_push(published_files, commit_message)
+    profiler = profiler_from_args(args)
+    pipeline = ContentPipeline(config, profiler)
+    try:
+        result = pipeline.run(translate=args.translate, budget=args.budget)
+        if args.flush:
+            pipeline.flush(force=True)
+    finally:
+        profiler.write_reports()
+
+    if not result.articles:
+        logger.warning("Nothing published. Exiting.")
+        sys.exit(0)
 
     logger.info("Daily content generation completed successfully!")
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Run-level time budget shared by every client call
+
+    deadline = Deadline(900)
+    client.deadline = deadline
+    ...
+    session.get(url, timeout=self.deadline.timeout(30))
+
+timeout() caps a request's own timeout at whatever is left of the run
+budget and raises DeadlineExceeded once the budget is spent. It subclasses
+requests.Timeout, so the clients' existing error handling treats an
+exhausted budget like any other timed-out request and the run winds down
+instead of overrunning the job. allows() lets the pipeline skip optional
+stages (cover images, extra languages, translations) when there is not
+enough time left, and stage() records where the time went for the report.
+"""
+
+import logging
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Requests are not started with less than this much budget left
+MIN_REQUEST_SECONDS = 1.0
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The run budget is used up"""
+
+
+class Deadline:
+    """Absolute deadline for one run; unlimited when seconds is None"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires = self.started + seconds if seconds else math.inf
+        self.stages: Dict[str, float] = {}
+        self.skipped: List[str] = []
+
+    @property
+    def limited(self) -> bool:
+        return self.expires != math.inf
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def timeout(self, default: float) -> float:
+        """Per-request timeout: the request's own limit, capped at the budget"""
+        remaining = self.remaining()
+        if remaining < MIN_REQUEST_SECONDS:
+            raise DeadlineExceeded(f"run budget of {self.budget:g}s exhausted")
+        return min(default, remaining)
+
+    def allows(self, seconds: float) -> bool:
+        """Whether a stage expected to take `seconds` still fits"""
+        return self.remaining() >= seconds
+
+    def skip(self, what: str) -> None:
+        self.skipped.append(what)
+        logger.warning(f"Skipping {what}: {max(self.remaining(), 0):.0f}s of run budget left")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.monotonic() - started
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'budget_seconds': self.budget,
+            'elapsed_seconds': round(self.elapsed(), 2),
+            'remaining_seconds': round(self.remaining(), 2) if self.limited else None,
+            'stages': {name: round(seconds, 2) for name, seconds in self.stages.items()},
+            'skipped': list(self.skipped),
+        }
+
+    def log_report(self) -> None:
+        stages = ', '.join(f"{name} {seconds:.1f}s" for name, seconds in self.stages.items())
+        budget = f" of {self.budget:.0f}s budget" if self.limited else ''
+        logger.info(f"Run took {self.elapsed():.1f}s{budget} ({stages})")
+        if self.skipped:
+            logger.info(f"Skipped for time: {', '.join(self.skipped)}")
+
+
+# Shared unlimited deadline for clients used outside a budgeted run
+NO_DEADLINE = Deadline()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Full-text enrichment of search hits
+
+Search snippets are a line or two (DuckDuckGo results carry only the
+title), which leaves the LLM writing from almost nothing. PageEnricher
+downloads the selected hits' pages concurrently and attaches a trimmed
+passage of their main text to each NewsItem, which the prompts include.
+
+Downloads are streamed and stop at a byte cap; the HTML is fed to the
+extractor chunk by chunk and only paragraph text is kept (up to a character
+cap), so neither the raw page nor a DOM is ever held in memory. Extracted
+text is cached under <cache_dir>/pages/ by canonical URL (tracking
+parameters, fragments and default ports removed; the page's own
+rel=canonical is recorded as an alias).
+
+Usage:
+    python scripts/enrichment.py https://example.com/news/story
+"""
+
+import codecs
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+
+from content_files import atomic_write
+from deadline import NO_DEADLINE
+from records import NewsItem
+
+logger = logging.getLogger(__name__)
+
+PAGES_DIR = 'pages'
+CHUNK_SIZE = 16 * 1024
+# Extracted text kept per page, before trimming to a passage
+MAX_TEXT_CHARS = 20000
+# Paragraphs shorter than this are usually bylines, captions or buttons
+MIN_PARAGRAPH_CHARS = 60
+CACHE_DAYS = 7
+
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid)$', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+SENTENCE_END_RE = re.compile(r'[.!?。！？।]["\')\]]?\s')
+
+SKIP_TAGS = frozenset({'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'figure', 'svg'})
+TEXT_TAGS = frozenset({'p', 'h2', 'h3', 'li', 'blockquote'})
+USER_AGENT = 'Mozilla/5.0 (compatible; DogplayBot/1.0; +https://dogplay.io)'
+
+
+def canonical_url(url: str) -> str:
+    """Normalise a URL for cache keys: no fragment, tracking params or default port"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class _TextExtractor(HTMLParser):
+    """Incremental main-text extraction: paragraph-level text outside page chrome"""
+
+    def __init__(self, max_chars: int = MAX_TEXT_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.paragraphs: List[str] = []
+        self.chars = 0
+        self.canonical: Optional[str] = None
+        self._skip_depth = 0
+        self._text_depth = 0
+        self._buffer: List[str] = []
+
+    @property
+    def full(self) -> bool:
+        return self.chars >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'link' and self.canonical is None:
+            attributes = dict(attrs)
+            if (attributes.get('rel') or '').lower() == 'canonical' and attributes.get('href'):
+                self.canonical = attributes['href']
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in TEXT_TAGS and not self._skip_depth:
+            if self._text_depth == 0:
+                self._buffer = []
+            self._text_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in TEXT_TAGS and self._text_depth:
+            self._text_depth -= 1
+            if self._text_depth == 0:
+                self._flush()
+
+    def handle_data(self, data):
+        if self._text_depth and not self._skip_depth and not self.full:
+            self._buffer.append(data)
+
+    def _flush(self) -> None:
+        text = WHITESPACE_RE.sub(' ', ''.join(self._buffer)).strip()
+        self._buffer = []
+        if len(text) >= MIN_PARAGRAPH_CHARS and not self.full:
+            self.paragraphs.append(text)
+            self.chars += len(text)
+
+
+def trim_passage(paragraphs: List[str], max_chars: int) -> str:
+    """Leading paragraphs up to max_chars, cut at a sentence end"""
+    passage = ''
+    for paragraph in paragraphs:
+        candidate = f"{passage} {paragraph}".strip()
+        if len(candidate) <= max_chars:
+            passage = candidate
+            continue
+        if not passage:
+            # First paragraph alone is too long: keep whole sentences of it
+            cut = [m.end() for m in SENTENCE_END_RE.finditer(paragraph[:max_chars])]
+            passage = paragraph[:cut[-1]].strip() if cut else paragraph[:max_chars].rsplit(' ', 1)[0] + '…'
+        break
+    return passage
+
+
+class PageEnricher:
+    """Concurrent, byte-capped page fetches feeding passages into NewsItems"""
+
+    TIMEOUT = 15
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_workers: int = 4,
+        max_bytes: int = 512 * 1024,
+        passage_chars: int = 1200,
+    ):
+        self.dir = Path(cache_dir) / PAGES_DIR
+        self.max_workers = max_workers
+        self.max_bytes = max_bytes
+        self.passage_chars = passage_chars
+        self.deadline = NO_DEADLINE
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'})
+
+    def _cache_path(self, url: str) -> Path:
+        digest = hashlib.sha1(canonical_url(url).encode('utf-8')).hexdigest()
+        return self.dir / digest[:2] / f"{digest}.json"
+
+    def _cached(self, url: str) -> Optional[List[str]]:
+        path = self._cache_path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('fetched', 0) > CACHE_DAYS * 86400:
+            return None
+        return entry['paragraphs']
+
+    def _store(self, urls: List[str], paragraphs: List[str]) -> None:
+        entry = {'url': canonical_url(urls[0]), 'paragraphs': paragraphs, 'fetched': time.time()}
+        text = json.dumps(entry, ensure_ascii=False) + '\n'
+        for url in dict.fromkeys(canonical_url(url) for url in urls):
+            atomic_write(self._cache_path(url), text)
+
+    def fetch(self, url: str) -> List[str]:
+        """Main-text paragraphs of a page (cached); empty when unavailable"""
+        cached = self._cached(url)
+        if cached is not None:
+            return cached
+
+        extractor = _TextExtractor()
+        received = 0
+        try:
+            with self.session.get(url, stream=True, timeout=self.deadline.timeout(self.TIMEOUT)) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', 'text/html').lower()
+                if 'html' not in content_type:
+                    return []
+                # requests assumes ISO-8859-1 when no charset is sent; pages are mostly UTF-8
+                encoding = response.encoding if 'charset' in content_type else 'utf-8'
+                decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    received += len(chunk)
+                    extractor.feed(decoder.decode(chunk))
+                    if received >= self.max_bytes or extractor.full:
+                        break
+                extractor.feed(decoder.decode(b'', final=True))
+            extractor.close()
+        except (requests.RequestException, LookupError) as e:
+            logger.info(f"Could not enrich {url}: {e}")
+            return []
+
+        urls = [url, response.url]
+        if extractor.canonical:
+            urls.append(urljoin(response.url, extractor.canonical))
+        self._store(urls, extractor.paragraphs)
+        logger.info(f"Enriched {url}: {len(extractor.paragraphs)} paragraphs from {received} bytes")
+        return extractor.paragraphs
+
+    def enrich(self, items: List[NewsItem]) -> List[NewsItem]:
+        """The items with a passage of their page text attached, in the same order"""
+        if not items:
+            return items
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            pages = list(pool.map(lambda item: self.fetch(item.url) if item.url else [], items))
+
+        enriched = []
+        for item, paragraphs in zip(items, pages):
+            passage = trim_passage(paragraphs, self.passage_chars)
+            # Keep the snippet when the page had nothing better
+            if len(passage) > len(item.snippet):
+                item = replace(item, passage=passage)
+            enriched.append(item)
+        return enriched
+
+
+def main():
+    from daily_content_generator import Config
+
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+
+    config = Config.from_env()
+    enricher = PageEnricher(Path(config.cache_dir), max_bytes=config.enrich_max_kb * 1024)
+    for url in sys.argv[1:]:
+        print(f"{url}\n  {trim_passage(enricher.fetch(url), enricher.passage_chars)}\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
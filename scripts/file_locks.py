@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Advisory cross-process locks for content and index writers
+
+Backfills, manual runs and the scheduled job can publish into the same
+trees at the same time. Writers take a lock before they read-modify-write a
+shared file, or before they claim a slug:
+
+    with file_lock(index_path):
+        reload, merge, atomic_write(index_path, ...)
+
+The lock for a file is a `.<name>.lock` file next to it, held with
+flock(2), so every process that writes the file uses the same lock whatever
+its own cache or config. Lock files are removed on release (after checking
+that the locked inode is still the one on disk), so they do not pile up in
+the content tree. Readers never lock: every locked file is replaced with
+atomic_write, so a reader sees either the old or the new version.
+
+flock is advisory and POSIX-only; where fcntl is unavailable the locks are
+no-ops and concurrent runs are not protected.
+
+Usage:
+    python scripts/file_locks.py status
+"""
+
+import errno
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a lock before giving up
+DEFAULT_TIMEOUT = 60.0
+POLL_INTERVAL = 0.05
+
+
+class LockTimeout(TimeoutError):
+    """Another process held the lock for too long"""
+
+
+def lock_path(target: Path) -> Path:
+    """Lock file guarding `target` (a file, or a post directory for slugs)"""
+    target = Path(target)
+    return target.parent / f".{target.name}.lock"
+
+
+def _acquire(path: Path, timeout: float) -> int:
+    started = time.monotonic()
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError as e:
+                    if e.errno not in (errno.EAGAIN, errno.EACCES):
+                        raise
+                    if time.monotonic() - started > timeout:
+                        raise LockTimeout(f"Timed out after {timeout:.0f}s waiting for {path}")
+                    time.sleep(POLL_INTERVAL)
+            # The previous holder may have removed the file after we opened it
+            try:
+                if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+        except BaseException:
+            os.close(fd)
+            raise
+        os.close(fd)
+
+
+@contextmanager
+def file_lock(target: Path, timeout: float = DEFAULT_TIMEOUT) -> Iterator[None]:
+    """
+    Hold the exclusive lock for `target` across processes
+
+    Not re-entrant: taking the same lock twice in one process deadlocks
+    until the timeout.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    path = lock_path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    waited = time.monotonic()
+    fd = _acquire(path, timeout)
+    waited = time.monotonic() - waited
+    if waited > 1:
+        logger.info(f"Waited {waited:.1f}s for {path.name}")
+    try:
+        yield
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+def merge_stats(
+    on_disk: Dict[str, Dict[str, float]],
+    loaded: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+) -> Dict[str, Dict[str, float]]:
+    """
+    Apply this process's changes to numeric stats another process may have updated
+
+    Each field becomes its value on disk plus how far this process moved it
+    since `loaded` (its copy when it last read or wrote the file), so
+    concurrent runs add up instead of the last writer winning. Entries only
+    this process has are taken as they are.
+    """
+    merged = {key: dict(entry) for key, entry in on_disk.items()}
+    for key, entry in current.items():
+        theirs = on_disk.get(key)
+        base = loaded.get(key)
+        if theirs is None or base is None:
+            merged[key] = dict(entry)
+            continue
+        merged[key] = {
+            field: theirs.get(field, value) + value - base.get(field, value)
+            for field, value in entry.items()
+        }
+    return merged
+
+
+def held_locks(root: Path) -> List[Path]:
+    """Lock files under `root` that some process currently holds"""
+    held = []
+    if fcntl is None:
+        return held
+    for path in sorted(Path(root).rglob('.*.lock')):
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            continue
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            held.append(path)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+    return held
+
+
+def main():
+    from daily_content_generator import Config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'status':
+        print(__doc__)
+        return 1
+
+    config = Config.from_env()
+    roots = [Path(config.content_dir), Path(config.ops_dir), Path(config.cache_dir)]
+    held = [path for root in roots if root.exists() for path in held_locks(root)]
+    for path in held:
+        print(path)
+    if not held:
+        print("No locks held")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
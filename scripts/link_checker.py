@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Source link validation before publishing
+
+Every URL in an article's sources is checked concurrently - HEAD first,
+GET (streamed, body not read) when the server does not answer HEAD - with
+a cap on total workers and on requests per host. Results are cached in
+<cache_dir>/link-cache.json for LINK_CHECK_TTL_HOURS, so a URL that was
+checked recently costs nothing.
+
+A link is dropped when it is not an http(s) URL, points at the site itself,
+or is dead (404/410, DNS/connection failure). Protocol-relative URLs
+(//host/path) are checked over https. Timeouts and every other answer
+(401/403 from publishers that block non-browser clients, 429, 5xx) are
+inconclusive: the link is kept and not cached. Anchors to dropped links are
+unwrapped in the article body.
+
+Usage:
+    python scripts/link_checker.py https://example.com/a https://example.com/b
+"""
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+import requests
+
+from content_files import atomic_write
+from deadline import NO_DEADLINE, DeadlineExceeded
+from file_locks import file_lock
+from records import Article
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = 'link-cache.json'
+
+# Servers that reject HEAD but may answer GET
+HEAD_UNSUPPORTED = {400, 403, 405, 501}
+# The only answers that mean the page is gone
+DEAD_STATUSES = {404, 410}
+USER_AGENT = 'Mozilla/5.0 (compatible; DogplayLinkChecker/1.0; +https://dogplay.io)'
+
+
+class LinkChecker:
+    """Concurrent, cached liveness checks for source URLs"""
+
+    TIMEOUT = 10
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_hours: float = 24,
+        max_workers: int = 8,
+        per_host: int = 2,
+        site_url: str = '',
+    ):
+        self.path = Path(cache_dir) / CACHE_FILE
+        self.ttl = ttl_hours * 3600
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.own_hosts: Set[str] = set()
+        self.add_site(site_url)
+        self.deadline = NO_DEADLINE
+        self.cache: Dict[str, Dict[str, float]] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+
+    def add_site(self, site_url: str) -> None:
+        """Treat links to this site as self-references, not sources"""
+        host = urlsplit(site_url).hostname
+        if host:
+            self.own_hosts.add(host.lower())
+
+    def save(self) -> None:
+        now = time.time()
+        # Concurrent runs check links into the same file; keep the newest result per URL
+        with self._lock, file_lock(self.path):
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    on_disk = json.load(f)
+                for url, entry in self.cache.items():
+                    if url not in on_disk or entry['checked'] > on_disk[url]['checked']:
+                        on_disk[url] = entry
+                self.cache = on_disk
+            self.cache = {url: entry for url, entry in self.cache.items() if now - entry['checked'] < self.ttl}
+            atomic_write(self.path, json.dumps(self.cache, sort_keys=True) + '\n')
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _probe(self, url: str) -> Optional[bool]:
+        """True alive, False dead, None inconclusive"""
+        if url.startswith('//'):
+            url = f'https:{url}'
+        with self._slot(urlsplit(url).hostname or ''):
+            try:
+                response = self.session.head(url, allow_redirects=True, timeout=self.deadline.timeout(self.TIMEOUT))
+                if response.status_code in HEAD_UNSUPPORTED:
+                    with self.session.get(
+                        url, allow_redirects=True, stream=True, timeout=self.deadline.timeout(self.TIMEOUT)
+                    ) as response:
+                        pass
+            except (requests.Timeout, DeadlineExceeded):
+                return None
+            except requests.RequestException as e:
+                logger.info(f"Dead link {url}: {e.__class__.__name__}")
+                return False
+
+        status = response.status_code
+        if status in DEAD_STATUSES:
+            logger.info(f"Dead link {url}: HTTP {status}")
+            return False
+        if status >= 400:
+            return None
+        return True
+
+    def is_candidate(self, url: str) -> bool:
+        """Whether a source entry is worth checking at all"""
+        parts = urlsplit(url)
+        # Protocol-relative links (//host/path) are fetched over https
+        if parts.scheme not in ('http', 'https', '') or not parts.hostname:
+            return False
+        host = parts.hostname.lower()
+        return not any(host == own or host.endswith('.' + own) for own in self.own_hosts)
+
+    def check(self, urls: Iterable[str]) -> Dict[str, bool]:
+        """
+        Check URLs concurrently
+
+        Returns:
+            url -> whether to keep it (inconclusive checks count as alive)
+        """
+        results: Dict[str, bool] = {}
+        pending: List[str] = []
+        now = time.time()
+        for url in dict.fromkeys(urls):
+            if not self.is_candidate(url):
+                results[url] = False
+                continue
+            entry = self.cache.get(url)
+            if entry is not None and now - entry['checked'] < self.ttl:
+                results[url] = bool(entry['ok'])
+            else:
+                pending.append(url)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                for url, alive in zip(pending, pool.map(self._probe, pending)):
+                    results[url] = alive is not False
+                    if alive is not None:
+                        with self._lock:
+                            self.cache[url] = {'ok': alive, 'checked': now}
+            logger.info(f"Checked {len(pending)} links, {len(results) - len(pending)} from cache")
+        return results
+
+    def validate(self, article: Article) -> Article:
+        """The article without dead or invalid sources, and with their anchors unwrapped"""
+        results = self.check(article.sources)
+        dropped = [url for url, keep in results.items() if not keep]
+        if not dropped:
+            return article
+
+        content = article.content
+        for url in dropped:
+            anchor = re.compile(rf'<a\s[^>]*href=["\']{re.escape(url)}["\'][^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+            content = anchor.sub(r'\1', content)
+        logger.info(f"Dropped {len(dropped)} of {len(results)} sources from {article.slug}")
+        return article.replace(
+            sources=tuple(url for url in article.sources if results.get(url)),
+            content=content,
+        )
+
+
+def main():
+    from daily_content_generator import Config
+
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+
+    config = Config.from_env()
+    checker = LinkChecker(Path(config.cache_dir), config.link_check_ttl_hours, site_url=config.site_url)
+    results = checker.check(sys.argv[1:])
+    checker.save()
+    for url, keep in results.items():
+        print(f"{'ok  ' if keep else 'dead'} {url}")
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
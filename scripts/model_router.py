@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Latency-aware model selection for the Hugging Face Inference API
+
+Keeps rolling (exponentially weighted) stats per model - seconds per
+generated token and success rate - and ranks the models by expected wall
+time for a request of a given token budget:
+
+    seconds_per_token * max_new_tokens / success_rate
+
+Models that answered 503 (still loading) or 429 (rate limited) are cooled
+down for the time the API asked for and tried last. A model with a warm-up
+call in flight ranks after the ready models, and callers wait for that
+warm-up (warming()) instead of sending a second request that would only
+get another 503. Untried models start
+from a prior based on their size. Stats are kept in
+ops/index/model-stats.json so they carry over between runs.
+
+Usage:
+    python scripts/model_router.py status
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from content_files import atomic_write
+from file_locks import file_lock, merge_stats
+
+logger = logging.getLogger(__name__)
+
+STATS_FILE = 'model-stats.json'
+
+# Weight of the newest observation in the rolling stats
+ALPHA = 0.3
+# Cool-down when a 503/429 does not say how long to wait
+DEFAULT_COOLDOWN = 60.0
+# Starting point for a model that was never called
+DEFAULT_PRIOR = {'seconds_per_token': 0.05, 'success': 0.8}
+
+
+class ModelRouter:
+    """Ranks models by expected latency and tracks their rolling stats"""
+
+    def __init__(
+        self,
+        models: List[str],
+        state_dir: Optional[Path] = None,
+        priors: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        self.models = list(models)
+        self.path = Path(state_dir) / STATS_FILE if state_dir else None
+        self.priors = priors or {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        # Stats as last read from / written to disk, for merging in save()
+        self._saved: Dict[str, Dict[str, float]] = {}
+        self._cooldown_until: Dict[str, float] = {}
+        self._warming: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.stats = json.load(f).get('models', {})
+        self._saved = {model: dict(entry) for model, entry in self.stats.items()}
+
+    def save(self) -> Optional[str]:
+        if self.path is None:
+            return None
+        # Concurrent runs update the same file; add this run's changes to theirs
+        with self._lock, file_lock(self.path):
+            on_disk = {}
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    on_disk = json.load(f).get('models', {})
+            merged = merge_stats(on_disk, self._saved, self.stats)
+            for entry in merged.values():
+                entry['success'] = min(max(entry['success'], 0.0), 1.0)
+                entry['seconds_per_token'] = max(entry['seconds_per_token'], 0.0)
+            self.stats = merged
+            self._saved = {model: dict(entry) for model, entry in merged.items()}
+            atomic_write(self.path, json.dumps({'models': self.stats}, indent=2, sort_keys=True) + '\n')
+        return str(self.path)
+
+    def _entry(self, model: str) -> Dict[str, float]:
+        if model not in self.stats:
+            prior = {**DEFAULT_PRIOR, **self.priors.get(model, {})}
+            self.stats[model] = dict(prior, calls=0.0)
+            self._saved.setdefault(model, dict(self.stats[model]))
+        return self.stats[model]
+
+    # Policy
+
+    def expected_seconds(self, model: str, max_new_tokens: int) -> float:
+        entry = self.stats.get(model) or {**DEFAULT_PRIOR, **self.priors.get(model, {})}
+        return entry['seconds_per_token'] * max_new_tokens / max(entry['success'], 0.05)
+
+    def cooling_down(self, model: str) -> float:
+        """Seconds until a loading / rate-limited model is worth trying again"""
+        return max(self._cooldown_until.get(model, 0.0) - time.monotonic(), 0.0)
+
+    def warming(self, model: str) -> Optional[threading.Event]:
+        """Set when the model's warm-up call returns; None if none is in flight"""
+        return self._warming.get(model)
+
+    def rank(self, max_new_tokens: int) -> List[str]:
+        """Models best first; warming models after ready ones, cooling-down models last, soonest-ready first"""
+        with self._lock:
+            return sorted(
+                self.models,
+                key=lambda model: (
+                    self.cooling_down(model),
+                    model in self._warming,
+                    self.expected_seconds(model, max_new_tokens),
+                ),
+            )
+
+    # Feedback
+
+    def record_success(self, model: str, seconds: float, tokens: int) -> None:
+        with self._lock:
+            entry = self._entry(model)
+            per_token = seconds / max(tokens, 1)
+            entry['seconds_per_token'] += ALPHA * (per_token - entry['seconds_per_token'])
+            entry['success'] += ALPHA * (1.0 - entry['success'])
+            entry['calls'] += 1
+            self._cooldown_until.pop(model, None)
+
+    def start_warming(self, model: str) -> None:
+        with self._lock:
+            self._warming.setdefault(model, threading.Event())
+
+    def finish_warming(self, model: str) -> None:
+        """The warm-up call returned, whatever its outcome"""
+        with self._lock:
+            event = self._warming.pop(model, None)
+        if event is not None:
+            event.set()
+
+    def mark_ready(self, model: str) -> None:
+        """The model answered (e.g. a warm-up call) and can be used right away"""
+        with self._lock:
+            self._cooldown_until.pop(model, None)
+
+    def record_failure(self, model: str, cooldown: Optional[float] = None, stats: bool = True) -> None:
+        """
+        A failed call; `cooldown` marks the model as loading or rate limited
+
+        Args:
+            stats: False for calls unlike a full generation (short follow-ups),
+                which only report the cool-down
+        """
+        with self._lock:
+            if stats:
+                entry = self._entry(model)
+                entry['success'] += ALPHA * (0.0 - entry['success'])
+                entry['calls'] += 1
+            if cooldown is not None:
+                self._cooldown_until[model] = time.monotonic() + cooldown
+        if cooldown is not None:
+            logger.info(f"Model {model} unavailable, retrying it in {cooldown:.0f}s at the earliest")
+
+    def status(self, max_new_tokens: int = 1500) -> List[Dict[str, Any]]:
+        return [
+            {
+                'model': model,
+                'expected_seconds': round(self.expected_seconds(model, max_new_tokens), 1),
+                **{key: round(value, 4) for key, value in (self.stats.get(model) or {}).items()},
+            }
+            for model in self.rank(max_new_tokens)
+        ]
+
+
+def main():
+    from daily_content_free import FreeConfig, HuggingFaceLLMClient
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'status':
+        print(__doc__)
+        return 1
+
+    config = FreeConfig.from_env()
+    router = ModelRouter(
+        list(HuggingFaceLLMClient.MODELS.values()),
+        Path(config.ops_dir) / 'index',
+        HuggingFaceLLMClient.PRIORS,
+    )
+    print(json.dumps(router.status(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Generate content for several sites in one process
+
+Each site has its own content/ops/public directories, keywords, languages
+and brand name, layered over the environment Config. Sites with the same
+API settings (CLIENT_FIELDS: keys, LLM backend, models) share one search
+client, LLM client (with its HTTP pool) and translator, and a search for a
+keyword that several of them use is only sent once per round. All sites
+share the link checker, page enricher, news store and translation cache.
+
+Example config:
+
+    {
+      "sites": [
+        {"name": "dogplay", "languages": ["en", "hi", "zh"]},
+        {"name": "cricket-hub", "site_url": "https://cricket-hub.example",
+         "brand_name": "Cricket Hub", "content_dir": "sites/cricket-hub/posts",
+         "ops_dir": "sites/cricket-hub/ops", "public_dir": "sites/cricket-hub/public",
+         "github_repo": "example/cricket-hub",
+         "keywords": ["IPL betting news", "Cricket betting updates"],
+         "languages": ["en"], "weight": 2}
+      ]
+    }
+
+Any Config field except those of the process-wide clients (PROCESS_FIELDS)
+can be overridden per site. Sites without their own cache_dir get
+<cache_dir>/sites/<name> for their publish queue and bundle.
+
+Sites run one at a time (the shared clients carry one run deadline) in
+stride order: each site's time used, divided by its weight, decides who goes
+next, so a slow site cannot keep pushing the others back. The pass values
+are kept in <cache_dir>/multi-site.json, so the order carries over from one
+scheduled run to the next; a site seen for the first time starts level with
+the least-served one. With --budget the round's budget is split by weight,
+and what a site leaves unused goes to the sites after it.
+
+Usage:
+    python scripts/multi_site.py --config scripts/sites.json [--budget 1800]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from content_files import atomic_write
+from daily_content_generator import (
+    ArticleTranslator,
+    BraveSearchClient,
+    Config,
+    ContentPipeline,
+    RunResult,
+)
+from enrichment import PageEnricher
+from file_locks import file_lock
+from link_checker import LinkChecker
+from news_store import NewsStore
+from records import NewsItem
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FIELDS = frozenset(f.name for f in fields(Config))
+# Settings of the per-backend clients; sites that differ in any of them get their own
+CLIENT_FIELDS = (
+    'brave_search_api_key',
+    'chutes_llm_api_key',
+    'chutes_image_api_key',
+    'chutes_llm_base_url',
+    'llm_batch_api',
+    'repair_model',
+    'translation_model',
+    'translation_workers',
+)
+# Settings of clients every site shares; only the environment sets them
+PROCESS_FIELDS = frozenset({'link_check_ttl_hours', 'enrich_workers', 'enrich_max_kb'})
+STATE_FILE = 'multi-site.json'
+
+
+class SharedSearchClient(BraveSearchClient):
+    """Brave client that answers repeated queries from memory until clear()"""
+
+    def __init__(self, api_key: str):
+        super().__init__(api_key)
+        self._results: Dict[Tuple[str, int, str], List[NewsItem]] = {}
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def search_news(self, query: str, max_results: int = 10, freshness: str = '1d') -> List[NewsItem]:
+        key = (query, max_results, freshness)
+        if key not in self._results:
+            self._results[key] = super().search_news(query, max_results, freshness)
+        else:
+            logger.info(f"Reusing search results for query: {query}")
+        return list(self._results[key])
+
+
+@dataclass
+class Site:
+    """One site's settings and its pipeline"""
+    name: str
+    config: Config
+    keywords: Optional[List[str]] = None
+    languages: Optional[List[str]] = None
+    translate: bool = False
+    max_keywords: int = 3
+    weight: float = 1.0
+    pipeline: Optional[ContentPipeline] = None
+
+    # Stride-scheduling pass: seconds used so far divided by weight
+    pass_value: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: Config) -> 'Site':
+        name = data['name']
+        overrides = {key: value for key, value in data.items() if key in CONFIG_FIELDS}
+        overrides.setdefault('cache_dir', str(Path(base.cache_dir) / 'sites' / name))
+        unknown = set(data) - CONFIG_FIELDS - {'name', 'keywords', 'languages', 'translate', 'max_keywords', 'weight'}
+        if unknown:
+            raise ValueError(f"Site {name!r} has unknown keys: {', '.join(sorted(unknown))}")
+        process_wide = PROCESS_FIELDS & set(data)
+        if process_wide:
+            raise ValueError(
+                f"Site {name!r} sets {', '.join(sorted(process_wide))}, which applies to all sites; "
+                f"set it in the environment instead"
+            )
+        return cls(
+            name=name,
+            config=replace(base, **overrides),
+            keywords=data.get('keywords'),
+            languages=data.get('languages'),
+            translate=bool(data.get('translate', False)),
+            max_keywords=int(data.get('max_keywords', 3)),
+            weight=float(data.get('weight', 1.0)),
+        )
+
+
+class MultiSiteRunner:
+    """Runs every site once per round over shared clients"""
+
+    def __init__(self, base: Config, sites: List[Site]):
+        if not sites:
+            raise ValueError("No sites configured")
+        self.sites = sites
+        self.state_path = Path(base.cache_dir) / STATE_FILE
+        # Caches every site shares live in the top-level cache dir
+        link_checker = LinkChecker(Path(base.cache_dir), base.link_check_ttl_hours)
+        enricher = PageEnricher(
+            Path(base.cache_dir), max_workers=base.enrich_workers, max_bytes=base.enrich_max_kb * 1024
+        )
+        news_store = NewsStore(Path(base.cache_dir))
+
+        self.searches: List[SharedSearchClient] = []
+        hubs: Dict[Tuple[Any, ...], ContentPipeline] = {}
+        for site in sites:
+            key = tuple(getattr(site.config, name) for name in CLIENT_FIELDS)
+            if key in hubs:
+                site.pipeline = ContentPipeline(site.config, shared=hubs[key])
+                continue
+            hub = site.pipeline = hubs[key] = ContentPipeline(site.config)
+            hub.brave_client = SharedSearchClient(site.config.brave_search_api_key)
+            self.searches.append(hub.brave_client)
+            hub.translator = ArticleTranslator(hub.llm_client, replace(site.config, cache_dir=base.cache_dir))
+            hub.link_checker = link_checker
+            link_checker.add_site(site.config.site_url)
+            hub.enricher = enricher
+            hub.news_store.close()
+            hub.news_store = news_store
+        if len(hubs) > 1:
+            logger.info(f"{len(hubs)} sets of API clients for {len(sites)} sites")
+        self._load_passes()
+
+    def _read_state(self) -> Dict[str, float]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('passes', {})
+        except FileNotFoundError:
+            return {}
+
+    def _load_passes(self) -> None:
+        passes = self._read_state()
+        known = [passes[site.name] for site in self.sites if site.name in passes]
+        # A new site joins level with the least-served one instead of catching up from zero
+        start = min(known, default=0.0)
+        for site in self.sites:
+            site.pass_value = passes.get(site.name, start)
+
+    def save_passes(self) -> None:
+        with file_lock(self.state_path):
+            passes = self._read_state()
+            passes.update({site.name: site.pass_value for site in self.sites})
+            atomic_write(self.state_path, json.dumps({'passes': passes}, indent=2, sort_keys=True) + '\n')
+
+    def order(self) -> List[Site]:
+        """Least-served site (relative to its weight) first"""
+        return sorted(self.sites, key=lambda site: (site.pass_value, self.sites.index(site)))
+
+    def run_round(self, budget: Optional[float] = None, push: bool = True) -> Dict[str, RunResult]:
+        """
+        Run every site once
+
+        Args:
+            budget: Seconds for the whole round, split by weight; None uses
+                each site's own RUN_BUDGET_SECONDS
+        """
+        for search in self.searches:
+            search.clear()
+        results: Dict[str, RunResult] = {}
+        started = time.monotonic()
+        queue = self.order()
+
+        for position, site in enumerate(queue):
+            site_budget = None
+            if budget:
+                left = budget - (time.monotonic() - started)
+                remaining_weight = sum(other.weight for other in queue[position:])
+                site_budget = max(left * site.weight / remaining_weight, 0.0)
+                if site_budget < 1:
+                    logger.warning(f"Skipping site {site.name}: round budget used up")
+                    continue
+
+            logger.info(f"Running site {site.name}" + (f" with {site_budget:.0f}s" if site_budget else ''))
+            site_started = time.monotonic()
+            try:
+                results[site.name] = site.pipeline.run(
+                    keywords=site.keywords,
+                    languages=site.languages,
+                    translate=site.translate,
+                    max_keywords=site.max_keywords,
+                    push=push,
+                    budget=site_budget,
+                )
+            except Exception:
+                logger.exception(f"Site {site.name} failed")
+            finally:
+                site.pass_value += (time.monotonic() - site_started) / site.weight
+
+        self.save_passes()
+        return results
+
+
+def load_sites(path: Path, base: Config) -> List[Site]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    sites = [Site.from_dict(item, base) for item in data.get('sites', [])]
+    names = [site.name for site in sites]
+    if len(set(names)) != len(names):
+        raise ValueError("Site names must be unique")
+    return sites
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the content generator for several sites")
+    parser.add_argument('--config', required=True, help='Path to the sites JSON file')
+    parser.add_argument('--budget', type=float, default=None, help='Seconds for all sites together')
+    parser.add_argument('--no-push', action='store_true', help='Write files but do not push')
+    args = parser.parse_args()
+
+    base = Config.from_env()
+    if not base.validate():
+        logger.error("Invalid configuration. Please check environment variables.")
+        return 1
+
+    runner = MultiSiteRunner(base, load_sites(Path(args.config), base))
+    results = runner.run_round(budget=args.budget, push=not args.no_push)
+    for site in runner.sites:
+        result = results.get(site.name)
+        articles = len(result.articles) if result else 0
+        logger.info(f"{site.name}: {articles} articles")
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
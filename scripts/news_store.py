@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Local SQLite store of every fetched search result
+
+BraveSearchClient, NewsAPIClient and DuckDuckGoSearchClient results used to
+be thrown away after each run. NewsStore keeps them in
+<cache_dir>/news.sqlite3:
+
+    items      one row per canonical URL (see enrichment.canonical_url):
+               title, snippet, source, published date, and the provider,
+               query and time of the latest fetch
+    hits       (item, provider, query) -> fetch time, for "what did this
+               query return recently"
+    items_fts  FTS5 index over title and snippet, kept in sync by triggers
+
+Runs answer a query that was fetched a few minutes ago from the store
+instead of calling the API again, and fall back to a full-text search of
+recent items when a search is skipped for time or comes back empty.
+Backfills and planning can query it from the command line. Inserts are
+batched, one transaction per batch. The database is in WAL mode so
+concurrent runs can read while one writes.
+
+SQLite builds without FTS5 fall back to LIKE matching.
+
+Usage:
+    python scripts/news_store.py search "IPL auction" [--hours 48] [-n 10]
+    python scripts/news_store.py recent brave "IPL 2025" [--minutes 60]
+    python scripts/news_store.py stats
+    python scripts/news_store.py prune [--days 30]
+"""
+
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from enrichment import canonical_url
+from records import NewsItem
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE = 'news.sqlite3'
+# Rows per insert transaction
+BATCH_SIZE = 500
+# Seconds a writer waits for another process's transaction
+BUSY_TIMEOUT = 30.0
+
+TERM_RE = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    snippet TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT 'Unknown',
+    published_date TEXT,
+    provider TEXT NOT NULL,
+    query TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_fetched ON items (fetched_at);
+
+CREATE TABLE IF NOT EXISTS hits (
+    item_id INTEGER NOT NULL REFERENCES items (id) ON DELETE CASCADE,
+    provider TEXT NOT NULL,
+    query TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (provider, query, item_id)
+);
+CREATE INDEX IF NOT EXISTS hits_recent ON hits (provider, query, fetched_at);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5 (
+    title, snippet, content='items', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF title, snippet ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+    INSERT INTO items_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+"""
+
+UPSERT_ITEM = """
+INSERT INTO items (url, link, title, snippet, source, published_date, provider, query, fetched_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    link = excluded.link,
+    title = excluded.title,
+    snippet = CASE WHEN length(excluded.snippet) >= length(items.snippet) THEN excluded.snippet ELSE items.snippet END,
+    source = excluded.source,
+    published_date = COALESCE(excluded.published_date, items.published_date),
+    provider = excluded.provider,
+    query = excluded.query,
+    fetched_at = excluded.fetched_at
+"""
+
+UPSERT_HIT = """
+INSERT INTO hits (item_id, provider, query, fetched_at)
+SELECT id, ?, ?, ? FROM items WHERE url = ?
+ON CONFLICT (provider, query, item_id) DO UPDATE SET fetched_at = excluded.fetched_at
+"""
+
+ITEM_COLUMNS = 'items.link, items.title, items.snippet, items.source, items.published_date'
+
+
+def _item(row: sqlite3.Row) -> NewsItem:
+    return NewsItem(
+        title=row['title'],
+        url=row['link'],
+        snippet=row['snippet'],
+        source=row['source'],
+        published_date=row['published_date'],
+    )
+
+
+class NewsStore:
+    """Search results keyed by canonical URL, with a full-text index"""
+
+    def __init__(self, cache_dir: Path):
+        self.path = Path(cache_dir) / STORE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('PRAGMA foreign_keys=ON')
+        with self.db:
+            self.db.executescript(SCHEMA)
+        try:
+            with self.db:
+                self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite has no FTS5 ({e}), news search falls back to LIKE")
+            self.fts = False
+
+    def close(self) -> None:
+        self.db.close()
+
+    # Writes
+
+    def add(self, items: Iterable[NewsItem], provider: str, query: str) -> int:
+        """Store one search call's results; returns how many rows were written"""
+        now = time.time()
+        rows = []
+        for item in items:
+            if not item.url or not item.title:
+                continue
+            rows.append((
+                canonical_url(item.url), item.url, item.title, item.snippet or '', item.source or 'Unknown',
+                item.published_date, provider, query, now,
+            ))
+        with self._lock:
+            for start in range(0, len(rows), BATCH_SIZE):
+                batch = rows[start:start + BATCH_SIZE]
+                with self.db:
+                    self.db.executemany(UPSERT_ITEM, batch)
+                    self.db.executemany(UPSERT_HIT, [(provider, query, now, row[0]) for row in batch])
+        return len(rows)
+
+    def prune(self, days: float) -> int:
+        """Drop items not fetched in the last `days` days"""
+        cutoff = time.time() - days * 86400
+        with self._lock, self.db:
+            deleted = self.db.execute('DELETE FROM items WHERE fetched_at < ?', (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} stored news items older than {days:g} days")
+        return deleted
+
+    # Reads
+
+    def recent(self, provider: str, query: str, max_age_seconds: float, limit: int = 10) -> List[NewsItem]:
+        """What this provider returned for this exact query within max_age_seconds"""
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            rows = self.db.execute(
+                f"""
+                SELECT {ITEM_COLUMNS} FROM hits JOIN items ON items.id = hits.item_id
+                WHERE hits.provider = ? AND hits.query = ? AND hits.fetched_at >= ?
+                ORDER BY hits.fetched_at DESC, items.published_date DESC
+                LIMIT ?
+                """,
+                (provider, query, cutoff, limit),
+            ).fetchall()
+        return [_item(row) for row in rows]
+
+    def search(self, text: str, max_age_hours: float = 24, limit: int = 10) -> List[NewsItem]:
+        """Best full-text matches for `text` among items fetched in the last max_age_hours"""
+        terms = list(dict.fromkeys(term.lower() for term in TERM_RE.findall(text)))
+        if not terms:
+            return []
+        cutoff = time.time() - max_age_hours * 3600
+        if self.fts:
+            sql = f"""
+                SELECT {ITEM_COLUMNS} FROM items_fts JOIN items ON items.id = items_fts.rowid
+                WHERE items_fts MATCH ? AND items.fetched_at >= ?
+                ORDER BY bm25(items_fts, 3.0, 1.0)
+                LIMIT ?
+            """
+            params: List[Any] = [' OR '.join(f'"{term}"' for term in terms), cutoff, limit]
+        else:
+            clauses = ' OR '.join('(items.title LIKE ? OR items.snippet LIKE ?)' for _ in terms)
+            sql = f"""
+                SELECT {ITEM_COLUMNS} FROM items
+                WHERE ({clauses}) AND items.fetched_at >= ?
+                ORDER BY items.fetched_at DESC
+                LIMIT ?
+            """
+            params = [pattern for term in terms for pattern in (f'%{term}%', f'%{term}%')] + [cutoff, limit]
+        with self._lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [_item(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total, oldest, newest = self.db.execute(
+                'SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM items'
+            ).fetchone()
+            providers = dict(self.db.execute('SELECT provider, COUNT(*) FROM items GROUP BY provider').fetchall())
+        return {
+            'items': total,
+            'providers': providers,
+            'oldest_hours': round((time.time() - oldest) / 3600, 1) if oldest else None,
+            'newest_hours': round((time.time() - newest) / 3600, 1) if newest else None,
+            'fts5': self.fts,
+        }
+
+
+def main():
+    from daily_content_generator import Config
+
+    parser = argparse.ArgumentParser(description="Query the local store of fetched search results")
+    sub = parser.add_subparsers(dest='command', required=True)
+    search_parser = sub.add_parser('search', help='Full-text search over recent items')
+    search_parser.add_argument('text')
+    search_parser.add_argument('--hours', type=float, default=48)
+    search_parser.add_argument('-n', type=int, default=10)
+    recent_parser = sub.add_parser('recent', help="A query's recent results from one provider")
+    recent_parser.add_argument('provider')
+    recent_parser.add_argument('query')
+    recent_parser.add_argument('--minutes', type=float, default=60)
+    sub.add_parser('stats', help='Item counts and age')
+    prune_parser = sub.add_parser('prune', help='Drop old items')
+    prune_parser.add_argument('--days', type=float, default=None)
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    store = NewsStore(Path(config.cache_dir))
+
+    if args.command == 'stats':
+        print(json.dumps(store.stats(), indent=2))
+        return 0
+
+    if args.command == 'prune':
+        store.prune(config.news_store_days if args.days is None else args.days)
+        return 0
+
+    if args.command == 'search':
+        items = store.search(args.text, args.hours, args.n)
+    else:
+        items = store.recent(args.provider, args.query, args.minutes * 60)
+    for item in items:
+        print(f"{item.published_date or '-':25}  {item.source:20}  {item.title}\n{'':47}{item.url}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
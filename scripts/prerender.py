@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Publish-time pre-rendering of article bodies
+
+ContentPublisher renders each article once when it is published and stores
+the artifacts next to index.mdx, so the site serves precomputed HTML instead
+of parsing Markdown per request:
+
+    <post>/index.html   sanitized article HTML with heading anchors
+    <post>/meta.json    excerpt, reading time, word count and table of contents
+"""
+
+import html
+import json
+import re
+from dataclasses import dataclass, field, asdict
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import markdown
+
+from content_files import atomic_write
+from content_quality import count_words, CJK_CLASS
+
+# Reading speed in words per minute; CJK is counted per character
+WORDS_PER_MINUTE = 200
+CJK_CHARS_PER_MINUTE = 400
+EXCERPT_LENGTH = 160
+
+CJK_RE = re.compile(f'[{CJK_CLASS}]')
+WHITESPACE_RE = re.compile(r'\s+')
+ANCHOR_STRIP_RE = re.compile(r'[^\w\s-]')
+ANCHOR_DASH_RE = re.compile(r'[-\s]+')
+
+ALLOWED_TAGS = frozenset({
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'em', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 'strong', 'sub', 'sup',
+    'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+})
+VOID_TAGS = frozenset({'br', 'hr', 'img'})
+DROP_CONTENT_TAGS = frozenset({'script', 'style', 'iframe', 'object', 'embed', 'form'})
+ALLOWED_ATTRS = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+SAFE_URL_RE = re.compile(r'^(https?:|mailto:|/|#)', re.IGNORECASE)
+TOC_LEVELS = frozenset({'h2', 'h3'})
+
+MARKDOWN_EXTENSIONS = ['extra', 'sane_lists']
+
+
+@dataclass
+class RenderedArticle:
+    """Precomputed artifacts for one article"""
+    html: str
+    excerpt: str
+    word_count: int
+    reading_time: int
+    toc: List[Dict[str, Any]] = field(default_factory=list)
+
+    def meta(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data['html']
+        return data
+
+
+def heading_anchor(text: str, used: Dict[str, int]) -> str:
+    """Unique, URL-safe id for a heading"""
+    anchor = ANCHOR_DASH_RE.sub('-', ANCHOR_STRIP_RE.sub('', text.lower())).strip('-') or 'section'
+    count = used.get(anchor, 0)
+    used[anchor] = count + 1
+    return anchor if count == 0 else f"{anchor}-{count}"
+
+
+class _Sanitizer(HTMLParser):
+    """Allowlist sanitizer that also collects headings and text in one pass"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.toc: List[Dict[str, Any]] = []
+        self.text_parts: List[str] = []
+        self.first_paragraph: Optional[str] = None
+        self._drop_depth = 0
+        self._heading: Optional[Dict[str, Any]] = None
+        self._paragraph: Optional[List[str]] = None
+        self._anchors: Dict[str, int] = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth += 1
+            return
+        if self._drop_depth or tag not in ALLOWED_TAGS:
+            return
+
+        allowed = ALLOWED_ATTRS.get(tag, set())
+        clean = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in ('href', 'src') and not SAFE_URL_RE.match(value.strip()):
+                continue
+            clean.append((name, value))
+
+        if tag == 'a' and any(name == 'href' and value.startswith('http') for name, value in clean):
+            clean.append(('rel', 'nofollow noreferrer'))
+            clean.append(('target', '_blank'))
+
+        if tag in TOC_LEVELS:
+            # id is filled in when the heading closes
+            self._heading = {'level': int(tag[1]), 'parts': [], 'index': len(self.out)}
+        elif tag == 'p' and self.first_paragraph is None:
+            self._paragraph = []
+
+        rendered = ''.join(f' {name}="{html.escape(value, quote=True)}"' for name, value in clean)
+        self.out.append(f'<{tag}{rendered}>')
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            if self._drop_depth:
+                self._drop_depth -= 1
+            return
+        if self._drop_depth or tag not in ALLOWED_TAGS or tag in VOID_TAGS:
+            return
+
+        if tag in TOC_LEVELS and self._heading is not None:
+            text = WHITESPACE_RE.sub(' ', ''.join(self._heading['parts'])).strip()
+            anchor = heading_anchor(text, self._anchors)
+            index = self._heading['index']
+            self.out[index] = self.out[index][:-1] + f' id="{anchor}">'
+            self.toc.append({'level': self._heading['level'], 'text': text, 'id': anchor})
+            self._heading = None
+        elif tag == 'p' and self._paragraph is not None:
+            text = WHITESPACE_RE.sub(' ', ''.join(self._paragraph)).strip()
+            if text:
+                self.first_paragraph = text
+            self._paragraph = None
+
+        self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self._drop_depth:
+            return
+        self.out.append(html.escape(data, quote=False))
+        self.text_parts.append(data)
+        if self._heading is not None:
+            self._heading['parts'].append(data)
+        if self._paragraph is not None:
+            self._paragraph.append(data)
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    text = WHITESPACE_RE.sub(' ', text).strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(' ', 1)[0] if ' ' in text[:length] else text[:length]
+    return cut.rstrip('.,;:') + '…'
+
+
+def reading_time(text: str) -> int:
+    """Estimated reading time in whole minutes (at least 1)"""
+    cjk_chars = len(CJK_RE.findall(text))
+    other_words = max(count_words(text) - cjk_chars, 0)
+    minutes = other_words / WORDS_PER_MINUTE + cjk_chars / CJK_CHARS_PER_MINUTE
+    return max(1, round(minutes))
+
+
+def render_article(body: str, excerpt: Optional[str] = None) -> RenderedArticle:
+    """Render an MDX/Markdown/HTML body to sanitized HTML plus metadata"""
+    raw_html = markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS, output_format='html')
+
+    sanitizer = _Sanitizer()
+    sanitizer.feed(raw_html)
+    sanitizer.close()
+
+    text = ' '.join(sanitizer.text_parts)
+    return RenderedArticle(
+        html=''.join(sanitizer.out),
+        excerpt=excerpt or make_excerpt(sanitizer.first_paragraph or text),
+        word_count=count_words(text),
+        reading_time=reading_time(text),
+        toc=sanitizer.toc,
+    )
+
+
+def write_artifacts(article_dir: Path, rendered: RenderedArticle) -> List[str]:
+    """Store index.html and meta.json next to index.mdx"""
+    html_path = Path(article_dir) / 'index.html'
+    meta_path = Path(article_dir) / 'meta.json'
+    atomic_write(html_path, rendered.html + '\n')
+    atomic_write(meta_path, json.dumps(rendered.meta(), indent=2, ensure_ascii=False) + '\n')
+    return [str(html_path), str(meta_path)]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Per-stage profiling hooks for the content generators
+
+    with profiler.stage('generate'):
+        ...
+
+With --profile each stage runs under its own cProfile profiler and is
+written out as a collapsed-stack file (`<stage>.folded`) that flamegraph.pl,
+inferno or speedscope can turn into a flamegraph. With --trace-memory each
+stage is bracketed by tracemalloc snapshots and a top-N allocation report
+(`<stage>.memory.txt`) is written. When neither mode is on, stage() returns
+a shared no-op context manager, so the hooks cost nothing.
+
+Nested stages are attributed exclusively: the outer stage's profiler is
+paused while an inner stage runs. cProfile only sees the calling thread, so
+work done inside thread pools shows up as time waiting on futures.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NULL_CONTEXT = nullcontext()
+
+# Collapsed stacks deeper than this are truncated
+MAX_STACK_DEPTH = 64
+MIN_SAMPLE_MICROS = 1
+
+
+def _frame_label(func: Tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def collapse_stats(stats: pstats.Stats, root: str) -> Dict[str, int]:
+    """
+    Convert cProfile call-graph stats into collapsed stacks
+
+    cProfile records caller->callee edges, not full stacks, so each
+    function's time is split across its call paths in proportion to the
+    cumulative time of each edge.
+
+    Returns:
+        Mapping of 'root;frame;frame' to self time in microseconds
+    """
+    raw = stats.stats  # {func: (cc, nc, tt, ct, callers)}
+    children: Dict[tuple, Dict[tuple, float]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, {})[func] = edge[3]
+
+    folded: Dict[str, int] = {}
+
+    def walk(func: tuple, path: List[str], on_path: set, factor: float) -> None:
+        _, _, tt, ct, _ = raw[func]
+        label = ';'.join(path)
+        micros = int(tt * factor * 1_000_000)
+        if micros >= MIN_SAMPLE_MICROS:
+            folded[label] = folded.get(label, 0) + micros
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for child, edge_ct in children.get(func, {}).items():
+            if child in on_path or child not in raw:
+                continue
+            child_ct = raw[child][3]
+            if not child_ct:
+                continue
+            child_factor = factor * min(edge_ct / child_ct, 1.0)
+            if child_ct * child_factor * 1_000_000 < MIN_SAMPLE_MICROS:
+                continue
+            on_path.add(child)
+            walk(child, path + [_frame_label(child)], on_path, child_factor)
+            on_path.discard(child)
+
+    roots = [func for func, value in raw.items() if not value[4]]
+    for func in roots:
+        walk(func, [root, _frame_label(func)], {func}, 1.0)
+
+    return folded
+
+
+class StageProfiler:
+    """Wraps pipeline stages with cProfile and/or tracemalloc"""
+
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        cpu: bool = False,
+        memory: bool = False,
+        top_n: int = 20,
+    ):
+        self.cpu = cpu
+        self.memory = memory
+        self.top_n = top_n
+        self.output_dir = Path(output_dir or f".cache/dogplay/profiles/{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        # One profiler per (stage, thread) - merged when reports are written
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._timings: Dict[str, float] = {}
+        self._memory: Dict[str, Dict[str, object]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    @property
+    def enabled(self) -> bool:
+        return self.cpu or self.memory
+
+    def stage(self, name: str):
+        """Context manager for one pipeline stage (no-op when disabled)"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        stack: List[cProfile.Profile] = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        profile = None
+        if self.cpu:
+            with self._lock:
+                profile = self._profiles.setdefault((name, threading.get_ident()), cProfile.Profile())
+            if stack:
+                stack[-1].disable()
+            try:
+                profile.enable()
+                stack.append(profile)
+            except ValueError:
+                # Another profiler is active process-wide (Python 3.12+); keep timings only
+                profile = None
+                if stack:
+                    stack[-1].enable()
+
+        before = tracemalloc.take_snapshot() if self.memory else None
+        if self.memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                stack.pop()
+                if stack:
+                    stack[-1].enable()
+
+            with self._lock:
+                self._timings[name] = self._timings.get(name, 0.0) + elapsed
+
+            if before is not None:
+                after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                diff = after.compare_to(before, 'lineno')
+                with self._lock:
+                    entry = self._memory.setdefault(name, {'peak_bytes': 0, 'lines': []})
+                    entry['peak_bytes'] = max(entry['peak_bytes'], peak)
+                    entry['lines'].extend(str(stat) for stat in diff[:self.top_n])
+
+    def write_reports(self) -> Optional[Path]:
+        """Write collapsed stacks, allocation reports and a summary"""
+        if not self.enabled:
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary: Dict[str, Dict[str, object]] = {}
+
+        for name, seconds in self._timings.items():
+            summary[name] = {'seconds': round(seconds, 3)}
+
+        merged: Dict[str, pstats.Stats] = {}
+        for (name, _), profile in self._profiles.items():
+            if name in merged:
+                merged[name].add(profile)
+            else:
+                merged[name] = pstats.Stats(profile)
+
+        for name, stats in merged.items():
+            folded = collapse_stats(stats, name)
+            with open(self.output_dir / f"{name}.folded", 'w', encoding='utf-8') as f:
+                for stack, micros in sorted(folded.items()):
+                    f.write(f"{stack} {micros}\n")
+            stats.dump_stats(str(self.output_dir / f"{name}.prof"))
+
+        for name, entry in self._memory.items():
+            with open(self.output_dir / f"{name}.memory.txt", 'w', encoding='utf-8') as f:
+                f.write(f"# Stage: {name}\n# Peak traced memory: {entry['peak_bytes'] / 1024:.1f} KiB\n")
+                f.write(f"# Top {self.top_n} allocation deltas by line\n\n")
+                f.write('\n'.join(entry['lines']) + '\n')
+            summary.setdefault(name, {})['peak_kib'] = round(entry['peak_bytes'] / 1024, 1)
+
+        with open(self.output_dir / 'summary.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Profiling reports written to {self.output_dir}")
+        return self.output_dir
+
+
+# Shared disabled profiler for callers that were not given one
+NULL_PROFILER = StageProfiler()
+
+
+def add_profiling_arguments(parser) -> None:
+    """Register --profile/--trace-memory/--profile-dir on an argparse parser"""
+    parser.add_argument('--profile', action='store_true', help='Profile each stage with cProfile')
+    parser.add_argument('--trace-memory', action='store_true', help='Snapshot allocations per stage with tracemalloc')
+    parser.add_argument('--profile-dir', default=None, help='Where to write profiling reports')
+
+
+def profiler_from_args(args) -> StageProfiler:
+    if not (args.profile or args.trace_memory):
+        return NULL_PROFILER
+    return StageProfiler(args.profile_dir, cpu=args.profile, memory=args.trace_memory)
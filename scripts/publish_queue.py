@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Local publish queue that coalesces several runs into one commit
+
+Every push to main triggers a full deploy, so instead of pushing after each
+run the pipeline queues the files it wrote and flushes them as a single
+commit once enough files are pending (max_files) or the oldest entry is old
+enough (max_age_minutes), or when a flush is requested explicitly. With both
+thresholds at 0 every run is flushed immediately, as before.
+
+The queue lives in a small JSON file under the cache dir and survives
+restarts; files are read at flush time, so a file rewritten by a later run
+is committed once with its latest content. Runs in other processes share the
+queue: enqueue and flush re-read it under its lock, and a flush keeps the
+lock until the push is done so two processes never push the same files.
+
+Usage:
+    python scripts/publish_queue.py status
+    python scripts/publish_queue.py flush
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from content_files import atomic_write
+from file_locks import file_lock
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = 'publish-queue.json'
+# A flush holds the queue's lock through the push, which can take minutes
+LOCK_TIMEOUT = 600.0
+
+
+class PublishQueue:
+    """Pending files and commit messages waiting for one combined push"""
+
+    def __init__(self, path: Path, max_files: int = 0, max_age_minutes: int = 0):
+        self.path = Path(path)
+        self.max_files = max_files
+        self.max_age_minutes = max_age_minutes
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'files': [], 'messages': [], 'first_queued': None}
+
+    def _save(self) -> None:
+        atomic_write(self.path, json.dumps(self._state, indent=2, ensure_ascii=False) + '\n')
+
+    @property
+    def pending(self) -> int:
+        return len(self._state['files'])
+
+    def enqueue(self, files: List[str], message: str) -> None:
+        """Add one run's output to the queue"""
+        with self._lock, file_lock(self.path, LOCK_TIMEOUT):
+            self._state = self._load()
+            queued = self._state['files']
+            seen = set(queued)
+            queued.extend(path for path in dict.fromkeys(files) if path not in seen)
+            self._state['messages'].append(message)
+            if not self._state['first_queued']:
+                self._state['first_queued'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            self._save()
+        logger.info(f"Queued {len(files)} files for publishing ({self.pending} pending)")
+
+    def age_minutes(self, now: Optional[datetime] = None) -> float:
+        first = self._state['first_queued']
+        if not first:
+            return 0.0
+        now = now or datetime.now(timezone.utc)
+        return (now - datetime.fromisoformat(first)).total_seconds() / 60
+
+    def due(self, now: Optional[datetime] = None) -> bool:
+        """Whether a size or time threshold has been reached"""
+        if not self.pending:
+            return False
+        if self.max_files <= 0 and self.max_age_minutes <= 0:
+            return True
+        if self.max_files > 0 and self.pending >= self.max_files:
+            return True
+        return self.max_age_minutes > 0 and self.age_minutes(now) >= self.max_age_minutes
+
+    def commit_message(self) -> str:
+        messages = list(dict.fromkeys(self._state['messages']))
+        if len(messages) == 1:
+            return messages[0]
+        summary = f"chore: content update {datetime.now().strftime('%Y-%m-%d')} ({len(self._state['messages'])} runs)"
+        return summary + '\n\n' + '\n'.join(f"- {message}" for message in messages)
+
+    def flush(self, github_pub, force: bool = False) -> bool:
+        """
+        Push everything queued as one commit
+
+        Args:
+            github_pub: GitHubPublisher used for the push
+            force: Flush even if no threshold has been reached
+
+        Returns:
+            True if a commit was pushed
+        """
+        with self._lock, file_lock(self.path, LOCK_TIMEOUT):
+            self._state = self._load()
+            if not self.pending or not (force or self.due()):
+                return False
+
+            files = list(self._state['files'])
+            message = self.commit_message()
+            logger.info(f"Flushing publish queue: {len(files)} files, {len(self._state['messages'])} runs")
+            if not github_pub.commit_and_push(files, message):
+                # Keep everything queued for the next flush
+                return False
+
+            self._state = {'files': [], 'messages': [], 'first_queued': None}
+            self._save()
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'pending_files': self.pending,
+            'pending_runs': len(self._state['messages']),
+            'first_queued': self._state['first_queued'],
+            'max_files': self.max_files,
+            'max_age_minutes': self.max_age_minutes,
+        }
+
+
+def main():
+    from daily_content_generator import Config, GitHubPublisher
+
+    parser = argparse.ArgumentParser(description="Inspect or flush the local publish queue")
+    parser.add_argument('command', choices=['status', 'flush'])
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    queue = PublishQueue(
+        Path(config.cache_dir) / QUEUE_FILE,
+        config.publish_queue_max_files,
+        config.publish_queue_max_minutes,
+    )
+
+    if args.command == 'status':
+        print(json.dumps(queue.status(), indent=2))
+        return 0
+
+    if not (config.github_token and config.github_repo):
+        logger.error("GITHUB_TOKEN and GITHUB_REPOSITORY are required to flush")
+        return 1
+    if not queue.pending:
+        logger.info("Publish queue is empty")
+        return 0
+    return 0 if queue.flush(GitHubPublisher(config), force=True) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Compact record types passed through the content pipeline
+
+News items and articles used to be free-form dicts. A backfill holds
+thousands of them, and a dict carries its own key table plus its own copy
+of every repeated string (source names, languages, categories). These
+records use __slots__ (no per-instance __dict__), intern the strings that
+repeat across records, and keep dates as the ISO string they arrived as,
+parsing to datetime only when something asks for it.
+
+Articles also answer get()/[] with their field names, so helpers that take
+either a fresh Article or a frontmatter dict from the archive (quality
+scorer, sitemap writer, related-posts index) work unchanged.
+
+Usage:
+    python scripts/records.py bench [count]   # memory: dicts vs records
+"""
+
+import sys
+import tracemalloc
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+_MISSING = object()
+
+
+def parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp; None when missing or malformed"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+@dataclass(slots=True)
+class NewsItem:
+    """One search result used as source material"""
+    title: str
+    url: str
+    snippet: str = ''
+    source: str = 'Unknown'
+    published_date: Optional[str] = None
+    # Main-text excerpt of the page (see enrichment.py)
+    passage: str = ''
+    _published: Any = field(default=_MISSING, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.source = _intern(self.source)
+
+    @property
+    def published_at(self) -> Optional[datetime]:
+        """published_date as a datetime, parsed on first access"""
+        if self._published is _MISSING:
+            self._published = parse_iso(self.published_date)
+        return self._published
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'title': self.title,
+            'url': self.url,
+            'snippet': self.snippet,
+            'source': self.source,
+            'published_date': self.published_date,
+            'passage': self.passage,
+        }
+
+
+@dataclass(slots=True)
+class Article:
+    """A generated (or translated) article on its way to publication"""
+    title: str
+    slug: str
+    content: str
+    language: str = 'en'
+    date: str = ''
+    excerpt: str = ''
+    category: str = 'iGaming'
+    seo_title: str = ''
+    seo_description: str = ''
+    sources: Tuple[str, ...] = ()
+    word_count: int = 0
+    should_index: Optional[bool] = None
+    reading_time: Optional[int] = None
+    translated_from: Optional[str] = None
+    _published: Any = field(default=_MISSING, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.language = _intern(self.language)
+        self.category = _intern(self.category)
+        if isinstance(self.sources, str):
+            self.sources = (self.sources,)
+        self.sources = tuple(dict.fromkeys(_intern(url) for url in self.sources if isinstance(url, str) and url))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Article':
+        """
+        Build from parsed LLM output, ignoring keys that are not fields
+
+        Raises:
+            ValueError: a required field (title, slug, content) is missing
+        """
+        try:
+            return cls(**{key: value for key, value in data.items() if key in FIELD_NAMES and value is not None})
+        except TypeError as e:
+            raise ValueError(f"incomplete article: {e}") from None
+
+    @property
+    def published_at(self) -> Optional[datetime]:
+        """date as a datetime, parsed on first access"""
+        if self._published is _MISSING:
+            self._published = parse_iso(self.date)
+        return self._published
+
+    def replace(self, **changes: Any) -> 'Article':
+        return replace(self, **changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in FIELD_NAMES}
+
+    # Read-only mapping protocol for helpers shared with frontmatter dicts
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in FIELD_NAMES:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+FIELD_NAMES = frozenset(f.name for f in fields(Article) if not f.name.startswith('_'))
+
+
+def _measure(build) -> Tuple[int, Any]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = build()
+        return tracemalloc.get_traced_memory()[0] - before, objects
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(count: int = 10000) -> Dict[str, Dict[str, float]]:
+    """Bytes per news item/article held as dicts vs as records"""
+    sources = ['Times of India', 'ESPNcricinfo', 'Reuters', 'NDTV Sports', 'Hindustan Times']
+    body = '<p>' + 'Cricket and iGaming news. ' * 40 + '</p>'
+
+    def news_rows(i: int) -> Dict[str, Any]:
+        # Fresh strings per row, as json.loads would produce them
+        return {
+            'title': f'Headline {i}',
+            'url': f'https://example.com/news/{i}',
+            'snippet': f'Snippet for story {i}',
+            'source': ''.join(sources[i % len(sources)]),
+            'published_date': f'2025-01-{i % 28 + 1:02d}T10:00:00',
+        }
+
+    def article_rows(i: int) -> Dict[str, Any]:
+        return {
+            'title': f'Article {i}', 'slug': f'2025-01-01-article-{i}', 'content': body,
+            'language': ''.join('en'), 'date': '2025-01-01T10:00:00', 'excerpt': f'Excerpt {i}',
+            'category': ''.join('iGaming'), 'seo_title': f'Article {i}', 'seo_description': f'Excerpt {i}',
+            'sources': [f'https://example.com/news/{i}', f'https://example.com/news/{i + 1}'],
+            'word_count': 240,
+        }
+
+    results = {}
+    builders = (
+        ('news_item', news_rows, lambda row: NewsItem(**row)),
+        ('article', article_rows, Article.from_dict),
+    )
+    for name, make, build in builders:
+        as_dicts, _ = _measure(lambda: [make(i) for i in range(count)])
+        as_records, _ = _measure(lambda: [build(make(i)) for i in range(count)])
+        results[name] = {
+            'dict_bytes': round(as_dicts / count, 1),
+            'record_bytes': round(as_records / count, 1),
+            'saved_pct': round(100 * (1 - as_records / as_dicts), 1),
+        }
+    return results
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != 'bench':
+        print(__doc__)
+        return 1
+
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    for name, row in benchmark(count).items():
+        print(f"{name:10} dict {row['dict_bytes']:>8} B   record {row['record_bytes']:>8} B   saved {row['saved_pct']}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
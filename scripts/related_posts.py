@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Inverted-index related-posts linker
+
+Keeps a TF-IDF inverted index over published posts so ContentPublisher can
+pick the top-k related posts for a new article without scanning the corpus,
+and inject internal links into the MDX body.
+
+The index is persisted as an append-only JSONL log under ops/index
+(one add/remove record per publish) and replayed into memory on load. The
+log is compacted once dead records outnumber live documents.
+
+Several processes can share the log: appends and compaction happen under
+its lock, and before each query or append a process replays the records
+others appended since it last read (or the whole log, after a compaction).
+Queries take no lock.
+
+Usage:
+    python scripts/related_posts.py query "IPL auction squads" [--language en] [-k 5]
+    python scripts/related_posts.py rebuild
+"""
+
+import argparse
+import heapq
+import html
+import json
+import logging
+import math
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from content_files import atomic_write, iter_post_files, split_frontmatter
+from content_quality import WORD_RE
+from file_locks import file_lock
+from sitemap_feeds import is_served, post_path
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'related-index.jsonl'
+
+TAG_RE = re.compile(r'<[^>]+>')
+ASCII_RE = re.compile(r'^[\x00-\x7f]+$')
+
+# Terms kept per document and per query - bounds index size and query cost
+MAX_DOC_TERMS = 64
+MAX_QUERY_TERMS = 24
+TITLE_WEIGHT = 3
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can for from has have in into is it its more
+most new not of on or our over than that the their them there these they this
+to was were what when which who will with you your also about after all any
+""".split())
+
+RELATED_HEADINGS = {
+    'en': 'Related Posts',
+    'hi': 'संबंधित लेख',
+    'zh': '相关文章',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased index terms from HTML/Markdown text"""
+    terms = []
+    for match in WORD_RE.finditer(TAG_RE.sub(' ', text)):
+        term = match.group(0).lower()
+        if ASCII_RE.match(term) and (len(term) < 3 or term in STOPWORDS or term.isdigit()):
+            continue
+        terms.append(term)
+    return terms
+
+
+def term_frequencies(title: str, content: str, limit: int) -> Dict[str, int]:
+    counts = Counter(tokenize(content))
+    for term in tokenize(title):
+        counts[term] += TITLE_WEIGHT
+    return dict(counts.most_common(limit))
+
+
+class RelatedPostsIndex:
+    """Persistent TF-IDF inverted index over published posts"""
+
+    def __init__(self, state_dir: Path):
+        self.path = Path(state_dir) / INDEX_FILE
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._norms: Dict[str, float] = {}
+        self._log_records = 0
+        # Position in the log replayed so far, and which file it belongs to
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self.load()
+
+    # Persistence
+
+    def load(self) -> None:
+        """Replay records appended since the last load (all of them the first time)"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                # First load, or another process compacted the log
+                self.docs.clear()
+                self.postings.clear()
+                self._log_records = 0
+                self._offset = 0
+                self._inode = stat.st_ino
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+
+        # A trailing partial line is still being written; read it next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            self._log_records += 1
+            if record['op'] == 'add':
+                self._add(record['slug'], record['doc'])
+            else:
+                self._remove(record['slug'])
+        self._offset += end
+        self._norms.clear()
+
+    def _commit(self, record: Dict[str, Any]) -> None:
+        """Apply a record on top of everything other processes logged, and append it"""
+        with file_lock(self.path):
+            self.load()
+            if record['op'] == 'add':
+                self._add(record['slug'], record['doc'])
+            elif not self._remove(record['slug']):
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                stat = os.fstat(f.fileno())
+            self._inode, self._offset = stat.st_ino, stat.st_size
+            self._log_records += 1
+            if self._log_records > 2 * max(len(self.docs), 16):
+                self._compact()
+
+    def compact(self) -> None:
+        """Rewrite the log with one add record per live document"""
+        with file_lock(self.path):
+            self._compact()
+
+    def _compact(self) -> None:
+        lines = [
+            json.dumps({'op': 'add', 'slug': slug, 'doc': doc}, ensure_ascii=False)
+            for slug, doc in sorted(self.docs.items())
+        ]
+        atomic_write(self.path, ''.join(line + '\n' for line in lines))
+        stat = self.path.stat()
+        self._inode, self._offset = stat.st_ino, stat.st_size
+        self._log_records = len(lines)
+
+    # In-memory index maintenance
+
+    def _add(self, slug: str, doc: Dict[str, Any]) -> None:
+        self._remove(slug)
+        self.docs[slug] = doc
+        for term, tf in doc['terms'].items():
+            self.postings.setdefault(term, {})[slug] = tf
+        self._norms.pop(slug, None)
+
+    def _remove(self, slug: str) -> bool:
+        doc = self.docs.pop(slug, None)
+        if doc is None:
+            return False
+        for term in doc['terms']:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(slug, None)
+                if not posting:
+                    del self.postings[term]
+        self._norms.pop(slug, None)
+        return True
+
+    def add(self, article: Dict[str, Any]) -> None:
+        """Index (or re-index) a published post; posts in unserved locales have no page to link to"""
+        if not is_served(article.get('language', 'en')):
+            return
+        doc = {
+            'title': article.get('title', ''),
+            'path': post_path(article['slug'], article.get('language', 'en')),
+            'language': article.get('language', 'en'),
+            'terms': term_frequencies(article.get('title', ''), article.get('content', ''), MAX_DOC_TERMS),
+        }
+        self._commit({'op': 'add', 'slug': article['slug'], 'doc': doc})
+
+    def remove(self, slug: str) -> None:
+        self._commit({'op': 'remove', 'slug': slug})
+
+    # Scoring
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log((1 + len(self.docs)) / (1 + df)) + 1
+
+    def _norm(self, slug: str) -> float:
+        # Cached per document; idf drift from later additions is tolerated
+        norm = self._norms.get(slug)
+        if norm is None:
+            terms = self.docs[slug]['terms']
+            norm = math.sqrt(sum((tf * self.idf(term)) ** 2 for term, tf in terms.items())) or 1.0
+            self._norms[slug] = norm
+        return norm
+
+    def query(
+        self,
+        title: str,
+        content: str = '',
+        language: Optional[str] = 'en',
+        k: int = 3,
+        exclude: Optional[str] = None,
+    ) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Top-k related posts by cosine similarity over TF-IDF vectors"""
+        query_tf = term_frequencies(title, content, MAX_QUERY_TERMS)
+        scores: Dict[str, float] = {}
+        query_norm = 0.0
+
+        for term, qtf in query_tf.items():
+            idf = self.idf(term)
+            query_norm += (qtf * idf) ** 2
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            weight = qtf * idf * idf
+            for slug, tf in posting.items():
+                scores[slug] = scores.get(slug, 0.0) + weight * tf
+
+        query_norm = math.sqrt(query_norm) or 1.0
+
+        results = []
+        for slug, score in scores.items():
+            doc = self.docs[slug]
+            if slug == exclude or (language and doc['language'] != language) or not is_served(doc['language']):
+                continue
+            results.append((score / (query_norm * self._norm(slug)), slug, doc))
+
+        return heapq.nlargest(k, results, key=lambda r: r[0])
+
+    def related(self, article: Dict[str, Any], k: int = 3) -> List[Dict[str, Any]]:
+        """Related posts for an article about to be published"""
+        self.load()
+        matches = self.query(
+            article.get('title', ''),
+            article.get('content', ''),
+            language=article.get('language', 'en'),
+            k=k,
+            exclude=article.get('slug'),
+        )
+        return [dict(doc, slug=slug, score=round(score, 4)) for score, slug, doc in matches]
+
+    def rebuild(self, content_dir: Path) -> int:
+        """Re-index the whole archive from scratch"""
+        self.docs.clear()
+        self.postings.clear()
+        self._norms.clear()
+        for path in iter_post_files(Path(content_dir)):
+            frontmatter, body, _ = split_frontmatter(path.read_text(encoding='utf-8'))
+            if frontmatter.get('should_index') is False or not is_served(frontmatter.get('language', 'en')):
+                continue
+            slug = frontmatter.get('slug') or path.parent.name
+            self._add(slug, {
+                'title': frontmatter.get('title', ''),
+                'path': post_path(slug, frontmatter.get('language', 'en')),
+                'language': frontmatter.get('language', 'en'),
+                'terms': term_frequencies(frontmatter.get('title', ''), body, MAX_DOC_TERMS),
+            })
+        self.compact()
+        return len(self.docs)
+
+
+def inject_related_links(content: str, related: List[Dict[str, Any]], language: str = 'en') -> str:
+    """Append a related-posts section with internal links to the article HTML"""
+    # Entries indexed before a locale was dropped from the site would 404
+    related = [post for post in related if post.get('path') and is_served(post.get('language', 'en'))]
+    if not related:
+        return content
+
+    heading = RELATED_HEADINGS.get(language, RELATED_HEADINGS['en'])
+    items = '\n'.join(
+        f'  <li><a href="{html.escape(post["path"])}">{html.escape(post["title"])}</a></li>' for post in related
+    )
+    return f"""{content.rstrip()}
+
+<h2>{heading}</h2>
+<ul>
+{items}
+</ul>
+"""
+
+
+def main():
+    from daily_content_generator import Config
+
+    parser = argparse.ArgumentParser(description="Query or rebuild the related-posts index")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    query_parser = sub.add_parser('query', help='Find posts related to some text')
+    query_parser.add_argument('text')
+    query_parser.add_argument('--language', default='en')
+    query_parser.add_argument('-k', type=int, default=5)
+
+    sub.add_parser('rebuild', help='Re-index the whole archive')
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    index = RelatedPostsIndex(Path(config.ops_dir) / 'index')
+
+    if args.command == 'rebuild':
+        count = index.rebuild(Path(config.content_dir))
+        logger.info(f"Indexed {count} posts")
+        return 0
+
+    for score, slug, doc in index.query(args.text, language=args.language, k=args.k):
+        print(f"{score:.4f}  {doc['path']}  {doc['title']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Re-score the published archive after quality thresholds change
+
+Runs ContentPublisher.assess_quality over every post in src/content/posts and
+src/content/ops/low-quality using a process pool. Files whose content hash and
+scorer fingerprint (version, thresholds and keywords) are unchanged since the
+last run are skipped. Posts whose
+should_index verdict flipped are moved between the two trees, and frontmatter
+is only rewritten when the stored verdict actually changed.
+
+Usage:
+    python scripts/rescore_content.py [--workers N] [--dry-run] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from content_files import (
+    atomic_write,
+    iter_post_files,
+    render_mdx,
+    split_frontmatter,
+    update_yaml_frontmatter,
+)
+from content_bundle import ContentBundle
+from content_layout import ContentLayout
+from content_quality import SCORER_VERSION
+from daily_content_generator import Config, ContentPublisher
+from file_locks import file_lock
+from related_posts import RelatedPostsIndex
+from sitemap_feeds import SitemapFeedWriter
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = 'index/rescore-state.json'
+
+# Worker-process publisher, built once per process by _init_worker
+_publisher: Optional[ContentPublisher] = None
+
+
+def _init_worker(config: Config) -> None:
+    global _publisher
+    _publisher = ContentPublisher(config)
+
+
+def _score_file(path: str) -> Dict[str, Any]:
+    """Score a single MDX file (runs in a worker process)"""
+    text = Path(path).read_text(encoding='utf-8')
+    frontmatter, body, fmt = split_frontmatter(text)
+
+    article = {
+        'title': frontmatter.get('title', ''),
+        'content': body,
+        'language': frontmatter.get('language', 'en'),
+        'sources': frontmatter.get('sources', []),
+    }
+    quality = _publisher.assess_quality(article)
+
+    return {
+        'path': path,
+        'should_index': quality.should_index,
+        'reason': quality.reason,
+        'quality': quality.to_dict(),
+    }
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class ArchiveRescorer:
+    """Re-evaluates indexability of every stored post"""
+
+    def __init__(self, config: Config, workers: Optional[int] = None, dry_run: bool = False):
+        self.config = config
+        self.content_dir = Path(config.content_dir)
+        self.low_quality_dir = Path(config.ops_dir) / 'low-quality'
+        self.state_path = Path(config.ops_dir) / STATE_FILE
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.scorer_fingerprint = ContentPublisher.quality_scorer(config).fingerprint()
+        self.feeds = SitemapFeedWriter(
+            config.public_dir, Path(config.ops_dir) / 'index', config.site_url, config.brand_name
+        )
+        self.related_index = RelatedPostsIndex(Path(config.ops_dir) / 'index')
+        sharded = config.content_layout == 'sharded'
+        self.layout = ContentLayout(self.content_dir, sharded)
+        self.low_quality_layout = ContentLayout(self.low_quality_dir, sharded)
+        self.bundle = ContentBundle(Path(config.cache_dir) / 'bundle')
+
+    def load_state(self) -> Dict[str, Dict[str, Any]]:
+        if not self.state_path.exists():
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self, state: Dict[str, Dict[str, Any]]) -> None:
+        atomic_write(self.state_path, json.dumps(state, indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+
+    def collect(self, state: Dict[str, Dict[str, Any]], force: bool, include_unmanaged: bool) -> List[Path]:
+        """Find files that need re-scoring"""
+        pending = []
+        for root in (self.content_dir, self.low_quality_dir):
+            for path in iter_post_files(root):
+                entry = state.get(str(path))
+                if (
+                    not force
+                    and entry
+                    and entry.get('scorer_version') == SCORER_VERSION
+                    and entry.get('scorer') == self.scorer_fingerprint
+                    and entry.get('hash') == file_hash(path)
+                ):
+                    continue
+
+                if not include_unmanaged:
+                    frontmatter, _, _ = split_frontmatter(path.read_text(encoding='utf-8'))
+                    if 'should_index' not in frontmatter:
+                        # Hand-written posts never had a quality verdict
+                        continue
+
+                pending.append(path)
+        return pending
+
+    def run(self, force: bool = False, include_unmanaged: bool = False) -> Dict[str, int]:
+        state = self.load_state()
+        pending = self.collect(state, force, include_unmanaged)
+        stats = {'scored': len(pending), 'moved': 0, 'rewritten': 0, 'unchanged': 0}
+
+        if not pending:
+            logger.info("Archive is up to date, nothing to re-score")
+            return stats
+
+        logger.info(f"Re-scoring {len(pending)} posts with {self.workers} workers")
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.config,),
+        ) as pool:
+            results = list(pool.map(_score_file, [str(p) for p in pending], chunksize=8))
+
+        for result in results:
+            # Same per-slug lock the publishers hold while writing a post
+            with file_lock(self.content_dir / Path(result['path']).parent.name):
+                path = self.apply(result, stats)
+                if path is not None and not self.dry_run:
+                    if result['should_index']:
+                        self.bundle.put(path.parent.name, path)
+                    else:
+                        self.bundle.remove(path.parent.name)
+            if path is not None and not self.dry_run:
+                state.pop(result['path'], None)
+                state[str(path)] = {
+                    'hash': file_hash(path),
+                    'scorer_version': SCORER_VERSION,
+                    'scorer': self.scorer_fingerprint,
+                    'should_index': result['should_index'],
+                }
+
+        if not self.dry_run:
+            self.save_state(state)
+            self.layout.save()
+            self.low_quality_layout.save()
+
+        logger.info(
+            f"Re-scored {stats['scored']} posts: {stats['moved']} moved, "
+            f"{stats['rewritten']} rewritten, {stats['unchanged']} unchanged"
+        )
+        return stats
+
+    def apply(self, result: Dict[str, Any], stats: Dict[str, int]) -> Optional[Path]:
+        """Rewrite frontmatter and move the post if its verdict changed"""
+        path = Path(result['path'])
+        text = path.read_text(encoding='utf-8')
+        frontmatter, body, fmt = split_frontmatter(text)
+
+        currently_indexed = self.content_dir in path.parents
+        updates = {'should_index': result['should_index'], 'quality_note': result['reason']}
+        if fmt == 'json':
+            updates['quality'] = result['quality']
+
+        changed = {k: v for k, v in updates.items() if frontmatter.get(k) != v}
+        # Score metrics alone drifting is not worth a rewrite
+        if set(changed) == {'quality'} and frontmatter.get('quality', {}).get('scorer_version') == SCORER_VERSION:
+            changed = {}
+
+        if changed:
+            stats['rewritten'] += 1
+            if not self.dry_run:
+                if fmt == 'json':
+                    frontmatter.update(updates)
+                    new_text = render_mdx(frontmatter, body)
+                else:
+                    new_text = update_yaml_frontmatter(text, updates)
+                atomic_write(path, new_text)
+
+        if currently_indexed == result['should_index']:
+            if not changed:
+                stats['unchanged'] += 1
+            return path
+
+        post_dir = path.parent
+        source_layout, target_layout = (self.low_quality_layout, self.layout)
+        if not result['should_index']:
+            source_layout, target_layout = target_layout, source_layout
+        target_dir = target_layout.root / target_layout.relative_dir(post_dir.name, frontmatter.get('date'))
+
+        if target_dir.exists():
+            logger.warning(f"Cannot move {post_dir}: {target_dir} already exists")
+            return path
+
+        logger.info(f"{'Would move' if self.dry_run else 'Moving'} {post_dir} -> {target_dir} ({result['reason']})")
+        stats['moved'] += 1
+        if self.dry_run:
+            return path
+
+        target_dir.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(post_dir), str(target_dir))
+        source_layout.unregister(post_dir.name)
+        target_layout.register(post_dir.name, target_dir)
+
+        slug = frontmatter.get('slug') or post_dir.name
+        language = frontmatter.get('language', 'en')
+        if result['should_index']:
+            post = {
+                'slug': slug,
+                'title': frontmatter.get('title', ''),
+                'excerpt': frontmatter.get('excerpt', ''),
+                'date': frontmatter.get('date'),
+                'language': language,
+                'content': body,
+            }
+            self.feeds.record(post)
+            self.related_index.add(post)
+        else:
+            self.feeds.remove(slug, language, frontmatter.get('date'))
+            self.related_index.remove(slug)
+
+        return target_dir / path.name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score the content archive with the current quality engine")
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--min-word-count', type=int, default=None, help='Override Config.min_word_count')
+    parser.add_argument('--dry-run', action='store_true', help='Report changes without touching files')
+    parser.add_argument('--force', action='store_true', help='Ignore the hash/scorer cache')
+    parser.add_argument(
+        '--include-unmanaged', action='store_true',
+        help='Also score hand-written posts that have no should_index frontmatter'
+    )
+    args = parser.parse_args()
+
+    config = Config.from_env()
+    if args.min_word_count is not None:
+        config = replace(config, min_word_count=args.min_word_count)
+
+    rescorer = ArchiveRescorer(config, workers=args.workers, dry_run=args.dry_run)
+    rescorer.run(force=args.force, include_unmanaged=args.include_unmanaged)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Incremental sitemap shards and RSS/Atom feeds
+
+Maintained by ContentPublisher at publish time so the site does not need to
+walk the content tree at build time:
+
+    public/sitemaps/posts.xml               sitemap index
+    public/sitemaps/<lang>-<YYYY-MM>.xml    one shard per language and month
+    public/feeds/<lang>/rss.xml             latest posts per language
+    public/feeds/<lang>/atom.xml
+
+Each shard and feed keeps its entries in a small JSON state file under
+ops/index, so a publish or move only rewrites the shards and feeds it touches.
+Only languages the site serves (LOCALE_PREFIXES) get URLs; posts in other
+languages are left out of shards and feeds.
+Every update re-reads its state file under that file's lock, so concurrent
+publishers add to the same shard or feed without dropping each other's posts.
+
+Usage:
+    python scripts/sitemap_feeds.py rebuild   # seed state from the archive
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from xml.sax.saxutils import escape
+
+from content_files import atomic_write, iter_post_files, split_frontmatter
+from file_locks import file_lock
+
+logger = logging.getLogger(__name__)
+
+FEED_SIZE = 50
+
+# URL prefix per locale the site serves; mirrors localePrefixes in src/i18n/config.ts
+LOCALE_PREFIXES = {'en': '', 'hi': '/hi'}
+
+
+def parse_date(value: Optional[str]) -> datetime:
+    """Parse ISO dates from frontmatter; naive values are treated as UTC"""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        parsed = datetime.now(timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def url_slug(slug: str) -> str:
+    """Public URL slug - the site strips the YYYY-MM-DD directory prefix"""
+    parts = slug.split('-')
+    if len(parts) > 3 and all(p.isdigit() for p in parts[:3]):
+        return '-'.join(parts[3:])
+    return slug
+
+
+def is_served(language: str) -> bool:
+    return language in LOCALE_PREFIXES
+
+
+def post_path(slug: str, language: str) -> Optional[str]:
+    """Site-relative path of a post; None when the site does not serve its language"""
+    if not is_served(language):
+        return None
+    return f"{LOCALE_PREFIXES[language]}/blog/{url_slug(slug)}"
+
+
+def post_url(site_url: str, slug: str, language: str) -> Optional[str]:
+    path = post_path(slug, language)
+    return f"{site_url.rstrip('/')}{path}" if path else None
+
+
+class SitemapFeedWriter:
+    """Keeps sitemap shards and feeds in sync with published posts"""
+
+    def __init__(self, public_dir: str, state_dir: Path, site_url: str, site_name: str = 'Dogplay Agent'):
+        self.public_dir = Path(public_dir)
+        self.state_dir = Path(state_dir)
+        self.site_url = site_url.rstrip('/')
+        self.site_name = site_name
+        self.changed_files: Set[str] = set()
+
+    # State helpers
+
+    def _load(self, path: Path, default: Any) -> Any:
+        if not path.exists():
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, path: Path, data: Any) -> None:
+        atomic_write(path, json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+
+    def _shard_state_path(self, shard: str) -> Path:
+        return self.state_dir / 'sitemap' / f'{shard}.json'
+
+    def _feed_state_path(self, language: str) -> Path:
+        return self.state_dir / 'feeds' / f'{language}.json'
+
+    @property
+    def _index_state_path(self) -> Path:
+        return self.state_dir / 'sitemap' / 'index.json'
+
+    @staticmethod
+    def shard_name(language: str, date: datetime) -> str:
+        return f"{language}-{date.strftime('%Y-%m')}"
+
+    # Public API
+
+    def record(self, article: Dict[str, Any]) -> bool:
+        """Add or update an indexable post in its shard and language feed; False if its language is not served"""
+        language = article.get('language', 'en')
+        if not is_served(language):
+            logger.info(f"Not adding {article['slug']} to sitemaps and feeds: the site does not serve '{language}'")
+            return False
+        published = parse_date(article.get('date'))
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        entry = {
+            'url': post_url(self.site_url, article['slug'], language),
+            'title': article.get('title', ''),
+            'excerpt': article.get('excerpt', ''),
+            'date': published.isoformat(timespec='seconds'),
+            'lastmod': now,
+        }
+
+        shard = self.shard_name(language, published)
+        self._update_shard(shard, article['slug'], entry)
+        self._update_feed(language, article['slug'], entry)
+        return True
+
+    def remove(self, slug: str, language: str, date: Optional[str] = None) -> None:
+        """Drop a post that is no longer indexable (e.g. moved to low-quality)"""
+        shards = [self.shard_name(language, parse_date(date))] if date else self._shards_for(language)
+        for shard in shards:
+            self._update_shard(shard, slug, None)
+        self._update_feed(language, slug, None)
+
+    def _shards_for(self, language: str) -> List[str]:
+        index = self._load(self._index_state_path, {})
+        return [name for name in index if name.startswith(f'{language}-')]
+
+    def _update_shard(self, shard: str, slug: str, entry: Optional[Dict[str, Any]]) -> None:
+        state_path = self._shard_state_path(shard)
+        with file_lock(state_path):
+            self._update_shard_locked(shard, state_path, slug, entry)
+
+    def _update_shard_locked(self, shard: str, state_path: Path, slug: str, entry: Optional[Dict[str, Any]]) -> None:
+        entries = self._load(state_path, {})
+
+        if entry is None:
+            if slug not in entries:
+                return
+            del entries[slug]
+        else:
+            entries[slug] = entry
+
+        self._save(state_path, entries)
+        self.changed_files.add(str(state_path))
+        self._write_shard(shard, entries)
+
+        with file_lock(self._index_state_path):
+            index = self._load(self._index_state_path, {})
+            if entries:
+                index[shard] = max(e['lastmod'] for e in entries.values())
+            else:
+                index.pop(shard, None)
+            self._save(self._index_state_path, index)
+            self.changed_files.add(str(self._index_state_path))
+            self._write_index(index)
+
+    def _update_feed(self, language: str, slug: str, entry: Optional[Dict[str, Any]]) -> None:
+        state_path = self._feed_state_path(language)
+        with file_lock(state_path):
+            self._update_feed_locked(language, state_path, slug, entry)
+
+    def _update_feed_locked(self, language: str, state_path: Path, slug: str, entry: Optional[Dict[str, Any]]) -> None:
+        items: List[Dict[str, Any]] = self._load(state_path, [])
+
+        remaining = [item for item in items if item['slug'] != slug]
+        if entry is None and len(remaining) == len(items):
+            return
+        if entry is not None:
+            remaining.append(dict(entry, slug=slug))
+            remaining.sort(key=lambda item: item['date'], reverse=True)
+        items = remaining[:FEED_SIZE]
+
+        self._save(state_path, items)
+        self.changed_files.add(str(state_path))
+        self._write_feeds(language, items)
+
+    # XML writers
+
+    def _write(self, path: Path, content: str) -> None:
+        atomic_write(path, content)
+        self.changed_files.add(str(path))
+
+    def _write_shard(self, shard: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for entry in sorted(entries.values(), key=lambda e: e['date'], reverse=True):
+            lines.append(
+                f"  <url><loc>{escape(entry['url'])}</loc><lastmod>{entry['lastmod']}</lastmod></url>"
+            )
+        lines.append('</urlset>')
+        self._write(self.public_dir / 'sitemaps' / f'{shard}.xml', '\n'.join(lines) + '\n')
+
+    def _write_index(self, index: Dict[str, str]) -> None:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for shard in sorted(index):
+            lines.append(
+                f"  <sitemap><loc>{self.site_url}/sitemaps/{shard}.xml</loc>"
+                f"<lastmod>{index[shard]}</lastmod></sitemap>"
+            )
+        lines.append('</sitemapindex>')
+        self._write(self.public_dir / 'sitemaps' / 'posts.xml', '\n'.join(lines) + '\n')
+
+    def _write_feeds(self, language: str, items: List[Dict[str, Any]]) -> None:
+        feed_dir = self.public_dir / 'feeds' / language
+        blog_url = f"{self.site_url}{LOCALE_PREFIXES[language]}/blog"
+        title = f"{self.site_name} Blog ({language})"
+        updated = max((item['lastmod'] for item in items), default=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+
+        rss = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">',
+            '<channel>',
+            f'  <title>{escape(title)}</title>',
+            f'  <link>{blog_url}</link>',
+            f'  <description>{escape(title)}</description>',
+            f'  <language>{language}</language>',
+            f'  <lastBuildDate>{format_datetime(parse_date(updated))}</lastBuildDate>',
+            f'  <atom:link href="{self.site_url}/feeds/{language}/rss.xml" rel="self" type="application/rss+xml"/>',
+        ]
+        atom = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="{language}">',
+            f'  <title>{escape(title)}</title>',
+            f'  <id>{blog_url}</id>',
+            f'  <updated>{updated}</updated>',
+            f'  <link href="{blog_url}"/>',
+            f'  <link rel="self" href="{self.site_url}/feeds/{language}/atom.xml"/>',
+        ]
+
+        for item in items:
+            url = escape(item['url'])
+            rss.append(
+                f"  <item><title>{escape(item['title'])}</title><link>{url}</link>"
+                f"<guid isPermaLink=\"true\">{url}</guid>"
+                f"<pubDate>{format_datetime(parse_date(item['date']))}</pubDate>"
+                f"<description>{escape(item['excerpt'])}</description></item>"
+            )
+            atom.append(
+                f"  <entry><title>{escape(item['title'])}</title><link href=\"{url}\"/>"
+                f"<id>{url}</id><published>{item['date']}</published><updated>{item['lastmod']}</updated>"
+                f"<summary>{escape(item['excerpt'])}</summary></entry>"
+            )
+
+        rss.extend(['</channel>', '</rss>'])
+        atom.append('</feed>')
+
+        self._write(feed_dir / 'rss.xml', '\n'.join(rss) + '\n')
+        self._write(feed_dir / 'atom.xml', '\n'.join(atom) + '\n')
+
+    def prune_unserved(self) -> None:
+        """Delete shards and feeds of languages the site does not serve"""
+        stale_files = []
+        with file_lock(self._index_state_path):
+            index = self._load(self._index_state_path, {})
+            stale = [shard for shard in index if not is_served(shard.rsplit('-', 2)[0])]
+            for shard in stale:
+                del index[shard]
+                stale_files += [self._shard_state_path(shard), self.public_dir / 'sitemaps' / f'{shard}.xml']
+            if stale:
+                self._save(self._index_state_path, index)
+                self.changed_files.add(str(self._index_state_path))
+                self._write_index(index)
+        for state_path in sorted((self.state_dir / 'feeds').glob('*.json')):
+            if not is_served(state_path.stem):
+                feed_dir = self.public_dir / 'feeds' / state_path.stem
+                stale_files += [state_path, feed_dir / 'rss.xml', feed_dir / 'atom.xml']
+
+        removed = [path for path in stale_files if path.exists()]
+        for path in removed:
+            path.unlink()
+            self.changed_files.add(str(path))
+        if removed:
+            logger.info(f"Removed {len(removed)} sitemap and feed files of unserved languages")
+
+    def rebuild(self, content_dir: Path) -> int:
+        """Seed all shards and feeds from the archive (one-off, O(archive))"""
+        self.prune_unserved()
+        count = 0
+        for path in iter_post_files(Path(content_dir)):
+            frontmatter, _, _ = split_frontmatter(path.read_text(encoding='utf-8'))
+            if frontmatter.get('should_index') is False:
+                continue
+            count += self.record({
+                'slug': frontmatter.get('slug') or path.parent.name,
+                'title': frontmatter.get('title', ''),
+                'excerpt': frontmatter.get('excerpt', ''),
+                'date': frontmatter.get('date'),
+                'language': frontmatter.get('language', 'en'),
+            })
+        return count
+
+
+def main():
+    from daily_content_generator import Config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'rebuild':
+        print(__doc__)
+        return 1
+
+    config = Config.from_env()
+    writer = SitemapFeedWriter(config.public_dir, Path(config.ops_dir) / 'index', config.site_url, config.brand_name)
+    count = writer.rebuild(Path(config.content_dir))
+    logger.info(f"Rebuilt sitemap shards and feeds for {count} posts")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""ChutesLLMClient.generate_articles_batch against a local OpenAI-compatible stand-in"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from daily_content_generator import ChutesLLMClient, GenerationJob
+from deadline import Deadline
+from records import NewsItem
+
+BODY = ' '.join(['IPL teams named their retained players ahead of the auction.'] * 20)
+
+
+def article_json(title, content=BODY):
+    return json.dumps({
+        'title': title,
+        'excerpt': 'Franchises confirmed their retained players before the auction.',
+        'content': f'<p>{content}</p>',
+        'seo_title': title[:60],
+        'seo_description': 'Which players the IPL franchises kept ahead of the mega auction.',
+        'category': 'Cricket',
+        'sources': [],
+    })
+
+
+def completion(*contents):
+    return {'choices': [
+        {'index': n, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}
+        for n, content in enumerate(contents)
+    ]}
+
+
+class StubBackend:
+    """Records every request; tests replace the handlers they care about"""
+
+    def __init__(self):
+        self.calls = []
+        self.batch_status = 'completed'
+        self.batch_lines = []
+
+    def paths(self, prefix=''):
+        return [path for method, path, body in self.calls if path.startswith(prefix)]
+
+    def chat(self, body):
+        user = body['messages'][-1]['content']
+        if 'ARTICLE 1' in user:
+            count = len(re.findall(r'^ARTICLE \d+$', user, re.MULTILINE))
+            return completion('[' + ', '.join(article_json(f'Packed {n}') for n in range(count)) + ']')
+        return completion(*[article_json('Single') for _ in range(body.get('n', 1))])
+
+    def handle(self, method, path, body):
+        self.calls.append((method, path, body))
+        if path == '/chat/completions':
+            return self.chat(json.loads(body))
+        if path == '/files':
+            lines = body.replace(b'\r\n', b'\n').split(b'\n')
+            self.batch_lines = [json.loads(line) for line in lines if line.startswith(b'{"custom_id"')]
+            return {'id': 'file-in'}
+        if path == '/batches' or re.fullmatch(r'/batches/[^/]+', path):
+            return {'id': 'batch-1', 'status': self.batch_status, 'output_file_id': 'file-out'}
+        if path.endswith('/cancel'):
+            return {'id': 'batch-1', 'status': 'cancelling'}
+        if path == '/files/file-out/content':
+            return '\n'.join(json.dumps({
+                'custom_id': line['custom_id'],
+                'response': {'status_code': 200, 'body': completion(article_json(f"Batch {line['custom_id']}"))},
+            }) for line in self.batch_lines)
+        raise KeyError(path)
+
+
+@pytest.fixture
+def backend():
+    stub = StubBackend()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, method):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            try:
+                data = stub.handle(method, self.path, body)
+            except KeyError:
+                self.send_error(404)
+                return
+            payload = (data if isinstance(data, str) else json.dumps(data)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._reply('GET')
+
+        def do_POST(self):
+            self._reply('POST')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f'http://127.0.0.1:{server.server_address[1]}'
+    yield stub
+    server.shutdown()
+
+
+def jobs(*topics):
+    return [
+        GenerationJob([NewsItem(title=f'{topic} news', url=f'https://news.example/{topic}', snippet=topic)])
+        for topic in topics
+    ]
+
+
+def test_n_choices_share_one_request_and_only_bad_choices_are_retried(backend):
+    def chat(body):
+        if body.get('n') == 3:
+            return completion(article_json('Choice 0'), 'not an article', article_json('Choice 2'))
+        return StubBackend.chat(backend, body)
+    backend.chat = chat
+
+    results = ChutesLLMClient('key', base_url=backend.url).generate_articles_batch(jobs('ipl', 'ipl', 'ipl'))
+
+    assert [article.title for article in results] == ['Choice 0', 'Single', 'Choice 2']
+    assert len(backend.paths('/chat/completions')) == 2
+
+
+def test_same_language_jobs_are_packed(backend):
+    results = ChutesLLMClient('key', base_url=backend.url).generate_articles_batch(jobs('ipl', 'auction'))
+
+    assert [article.title for article in results] == ['Packed 0', 'Packed 1']
+    assert len(backend.paths('/chat/completions')) == 1
+
+
+def test_failed_pack_falls_back_to_single_requests(backend):
+    def chat(body):
+        if 'ARTICLE 1' in body['messages'][-1]['content']:
+            return completion('I cannot write several articles at once.')
+        return StubBackend.chat(backend, body)
+    backend.chat = chat
+
+    results = ChutesLLMClient('key', base_url=backend.url).generate_articles_batch(jobs('ipl', 'auction'))
+
+    assert [article.title for article in results] == ['Single', 'Single']
+    assert len(backend.paths('/chat/completions')) == 3
+
+
+def test_batch_endpoint(backend):
+    client = ChutesLLMClient('key', base_url=backend.url, supports_batch_api=True)
+    results = client.generate_articles_batch(jobs('ipl', 'auction'))
+
+    assert [article.title for article in results] == ['Batch 0', 'Batch 1']
+    assert backend.paths('/chat/completions') == []
+
+
+def test_unfinished_batch_is_cancelled_before_falling_back(backend):
+    backend.batch_status = 'in_progress'
+    client = ChutesLLMClient('key', base_url=backend.url, supports_batch_api=True)
+    # Too little budget left to keep polling
+    client.deadline = Deadline(30)
+
+    results = client.generate_articles_batch(jobs('ipl', 'auction'))
+
+    assert backend.paths('/batches/batch-1/cancel') == ['/batches/batch-1/cancel']
+    assert [article.title for article in results] == ['Packed 0', 'Packed 1']
+
+
+def test_unexpected_errors_only_lose_their_own_job(backend, monkeypatch):
+    client = ChutesLLMClient('key', base_url=backend.url)
+
+    def broken_pack(jobs, indices, results):
+        raise AttributeError('bug in packing')
+    monkeypatch.setattr(client, '_run_packed', broken_pack)
+    generate = client.generate_article
+
+    def flaky(news_items, language='en', brand=None):
+        if news_items[0].snippet == 'auction':
+            raise TypeError('bug in one job')
+        return generate(news_items, language, brand)
+    monkeypatch.setattr(client, 'generate_article', flaky)
+
+    results = client.generate_articles_batch(jobs('ipl', 'auction'))
+
+    assert [article and article.title for article in results] == ['Single', None]
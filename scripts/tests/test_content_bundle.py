@@ -0,0 +1,50 @@
+from content_bundle import BundleReader, ContentBundle
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+    return path
+
+
+def test_reader_survives_compact(tmp_path):
+    bundle_dir = tmp_path / 'bundle'
+    a = write(tmp_path / 'posts' / 'a' / 'index.mdx', 'post a ' + 'x' * 10)
+    b = write(tmp_path / 'posts' / 'b' / 'index.mdx', 'post b ' + 'x' * 10)
+    writer = ContentBundle(bundle_dir)
+    writer.put('a', a)
+    writer.put('b', b)
+    writer.put('a', write(a, 'post a xxx'))
+
+    with BundleReader(bundle_dir, writer) as reader:
+        assert reader.get('a') == 'post a xxx'
+        # The shared writer compacts: the entries move, the old mapping is larger
+        writer.compact()
+        assert reader.get('a') == 'post a xxx'
+        assert reader.get('b') == 'post b ' + 'x' * 10
+
+    with BundleReader(bundle_dir) as reader:
+        assert reader.get('b') == 'post b ' + 'x' * 10
+        writer.put('b', write(b, 'post b'))
+        # Another process compacts
+        ContentBundle(bundle_dir).compact()
+        assert reader.get('a') == 'post a xxx'
+        assert reader.get('b') == 'post b'
+
+
+def test_reader_sees_appends_and_rebuilds(tmp_path):
+    bundle_dir = tmp_path / 'bundle'
+    a = write(tmp_path / 'posts' / 'a' / 'index.mdx', 'post a')
+    writer = ContentBundle(bundle_dir)
+    writer.put('a', a)
+
+    with BundleReader(bundle_dir) as reader:
+        assert reader.get('a') == 'post a'
+        writer.put('c', write(tmp_path / 'posts' / 'c' / 'index.mdx', 'post c'))
+        assert 'c' in reader
+        assert reader.get('c') == 'post c'
+
+        write(a, 'post a, rewritten')
+        ContentBundle(bundle_dir).rebuild(tmp_path / 'posts')
+        assert reader.get('a') == 'post a, rewritten'
+        assert dict(reader) == {'a': 'post a, rewritten', 'c': 'post c'}
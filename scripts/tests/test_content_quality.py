@@ -0,0 +1,26 @@
+from content_quality import QualityScorer
+
+
+def test_keywords_match_whole_words_only():
+    scorer = QualityScorer()
+    metrics = scorer.measure("Multiple principles of discipline. Abetting is bad.", 'en')
+    assert metrics.keyword_counts == {}
+
+    article = {
+        'language': 'en',
+        'content': "<p>Multiple principles of discipline. Abetting is bad.</p>",
+        'sources': ['https://example.com'],
+    }
+    assert scorer.rule_keyword_stuffing(scorer.measure(article['content']), article) is None
+
+
+def test_keywords_still_counted():
+    scorer = QualityScorer()
+    metrics = scorer.measure("IPL betting: the IPL's cricket (IPL-2025) season.", 'en')
+    assert metrics.keyword_counts == {'ipl': 3, 'betting': 1, 'cricket': 1}
+
+
+def test_cjk_keywords_match_inside_text():
+    scorer = QualityScorer()
+    metrics = scorer.measure("今年的板球比赛和博彩市场", 'zh')
+    assert metrics.keyword_counts == {'板球': 1, '博彩': 1}
@@ -0,0 +1,13 @@
+"""NewsStore persistence of search results"""
+
+from news_store import NewsStore
+from records import NewsItem
+
+
+def test_item_without_source_is_stored(tmp_path):
+    store = NewsStore(tmp_path)
+    item = NewsItem(title='IPL auction', url='https://news.example/ipl', snippet='', source=None)
+
+    assert store.add([item], 'newsapi', 'IPL 2025') == 1
+    assert [found.source for found in store.recent('newsapi', 'IPL 2025', 60)] == ['Unknown']
+    store.close()
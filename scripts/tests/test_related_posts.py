@@ -0,0 +1,27 @@
+import json
+
+from related_posts import INDEX_FILE, RelatedPostsIndex, inject_related_links
+
+CONTENT = "IPL auction squads and retained players for the new cricket season"
+
+
+def test_only_served_locales_are_linked(tmp_path):
+    index = RelatedPostsIndex(tmp_path)
+    index.add({'slug': '2025-01-01-ipl-auction', 'title': 'IPL auction', 'language': 'en', 'content': CONTENT})
+    index.add({'slug': '2025-01-01-ipl-auction-zh', 'title': 'IPL auction', 'language': 'zh', 'content': CONTENT})
+    assert '2025-01-01-ipl-auction-zh' not in index.docs
+
+    related = index.related({'slug': 'new', 'title': 'IPL auction squads', 'language': 'en', 'content': CONTENT})
+    html = inject_related_links('<p>Body</p>', related)
+    assert 'href="/blog/ipl-auction"' in html
+    assert index.related({'slug': 'new', 'title': 'IPL auction', 'language': 'zh', 'content': CONTENT}) == []
+
+
+def test_stale_unserved_entries_are_not_linked(tmp_path):
+    # Logged before the locale was dropped from the site
+    doc = {'title': 'IPL auction', 'path': '/zh/blog/ipl-auction', 'language': 'zh', 'terms': {'ipl': 1, 'auction': 1}}
+    (tmp_path / INDEX_FILE).write_text(json.dumps({'op': 'add', 'slug': 'zh-post', 'doc': doc}) + '\n')
+
+    index = RelatedPostsIndex(tmp_path)
+    assert index.related({'slug': 'new', 'title': 'IPL auction', 'language': 'zh', 'content': CONTENT}) == []
+    assert inject_related_links('<p>Body</p>', [dict(doc, slug='zh-post')], 'zh') == '<p>Body</p>'
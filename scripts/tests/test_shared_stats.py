@@ -0,0 +1,47 @@
+"""Concurrent runs saving the planner, router and link-checker state"""
+
+import time
+
+from link_checker import LinkChecker
+from model_router import ModelRouter
+from records import NewsItem
+from topic_planner import TopicPlanner
+
+
+def test_planner_runs_add_up(tmp_path):
+    first, second = TopicPlanner(tmp_path), TopicPlanner(tmp_path)
+    first.record_search('ipl', [NewsItem(title='a', url='https://a.example/1', snippet='')])
+    second.record_search('ipl', [NewsItem(title='b', url='https://b.example/1', snippet='')])
+    first.seen['https://a.example/1'] = '2026-01-01T00:00:00'
+    second.seen['https://b.example/1'] = '2026-01-02T00:00:00'
+    first.save()
+    second.save()
+
+    merged = TopicPlanner(tmp_path)
+    assert merged.stats['ipl']['pulls'] == 2
+    assert merged.stats['ipl']['found'] == 2
+    assert set(merged.seen) == {'https://a.example/1', 'https://b.example/1'}
+
+
+def test_router_runs_add_up(tmp_path):
+    first, second = ModelRouter(['m'], tmp_path), ModelRouter(['m'], tmp_path)
+    first.record_success('m', 10.0, 100)
+    second.record_success('m', 10.0, 100)
+    second.record_failure('m')
+    first.save()
+    second.save()
+
+    assert ModelRouter(['m'], tmp_path).stats['m']['calls'] == 3
+
+
+def test_link_results_are_kept_newest_first(tmp_path):
+    first, second = LinkChecker(tmp_path), LinkChecker(tmp_path)
+    now = time.time()
+    first.cache = {'https://a.example/': {'ok': True, 'checked': now}, 'https://c.example/': {'ok': True, 'checked': now}}
+    second.cache = {'https://b.example/': {'ok': True, 'checked': now}, 'https://c.example/': {'ok': False, 'checked': now + 1}}
+    first.save()
+    second.save()
+
+    cache = LinkChecker(tmp_path).cache
+    assert set(cache) == {'https://a.example/', 'https://b.example/', 'https://c.example/'}
+    assert cache['https://c.example/']['ok'] is False
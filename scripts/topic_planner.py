@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Yield-driven keyword planner
+
+Records what each search keyword produced - items found, items that were
+new after de-duplication, and how many of the articles built from them
+passed the quality gate - and picks the keywords for the next run with a
+UCB1 bandit, so API calls go to the keywords that actually turn into
+indexable posts while untried or long-unused keywords still get explored.
+
+Counts decay a little every run so a keyword that dried up (or came back)
+is re-evaluated. State is kept in ops/index/topic-stats.json.
+
+Usage:
+    python scripts/topic_planner.py status
+"""
+
+import json
+import logging
+import math
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from content_files import atomic_write
+from file_locks import file_lock, merge_stats
+from records import NewsItem
+
+logger = logging.getLogger(__name__)
+
+STATS_FILE = 'topic-stats.json'
+
+# Per-run decay applied to every keyword's counts
+DECAY = 0.95
+# Exploration weight in the UCB1 bonus
+EXPLORATION = 0.5
+# URLs remembered for de-duplication across runs
+MAX_SEEN_URLS = 5000
+
+
+class TopicPlanner:
+    """Bandit-style keyword selection driven by per-keyword yield"""
+
+    def __init__(self, state_dir: Path, max_results: int = 5):
+        self.path = Path(state_dir) / STATS_FILE
+        self.max_results = max_results
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.seen: Dict[str, str] = {}
+        # Stats as last read from / written to disk, for merging in save()
+        self._saved: Dict[str, Dict[str, float]] = {}
+        # url -> keyword for items found in the current run (None: from the news store)
+        self._run_sources: Dict[str, Optional[str]] = {}
+        self.load()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.stats = data.get('keywords', {})
+        self.seen = data.get('seen', {})
+        self._saved = {keyword: dict(entry) for keyword, entry in self.stats.items()}
+
+    def save(self) -> str:
+        # Concurrent runs update the same file; add this run's changes to theirs
+        with file_lock(self.path):
+            on_disk = {}
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    on_disk = json.load(f)
+            self.stats = merge_stats(on_disk.get('keywords', {}), self._saved, self.stats)
+            seen = {**on_disk.get('seen', {})}
+            for url, used in self.seen.items():
+                seen[url] = max(used, seen.get(url, used))
+            self.seen = dict(sorted(seen.items(), key=lambda item: item[1])[-MAX_SEEN_URLS:])
+            data = {'keywords': self.stats, 'seen': self.seen}
+            atomic_write(self.path, json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+        self._saved = {keyword: dict(entry) for keyword, entry in self.stats.items()}
+        return str(self.path)
+
+    def _entry(self, keyword: str) -> Dict[str, float]:
+        if keyword not in self.stats:
+            self.stats[keyword] = dict.fromkeys(('pulls', 'found', 'new', 'used', 'indexed', 'seconds'), 0.0)
+            self._saved.setdefault(keyword, dict(self.stats[keyword]))
+        return self.stats[keyword]
+
+    # Policy
+
+    def expected_yield(self, keyword: str) -> float:
+        """Estimated indexable items per search call, scaled to 0..1"""
+        entry = self.stats.get(keyword)
+        if not entry or entry['pulls'] <= 0:
+            return 0.0
+        new_rate = entry['new'] / entry['pulls'] / self.max_results
+        pass_rate = (entry['indexed'] + 1) / (entry['used'] + 2)
+        return min(new_rate, 1.0) * pass_rate
+
+    def choose(self, keywords: List[str], k: int) -> List[str]:
+        """
+        Pick k keywords for this run (UCB1), best first
+
+        Keywords that were never queried are tried before anything else.
+        """
+        for entry in self.stats.values():
+            for field in entry:
+                entry[field] *= DECAY
+        self._run_sources.clear()
+
+        total = sum(self.stats.get(keyword, {}).get('pulls', 0.0) for keyword in keywords)
+        log_total = math.log(max(total, 1.0) + 1)
+
+        def ucb(keyword: str) -> float:
+            pulls = self.stats.get(keyword, {}).get('pulls', 0.0)
+            if pulls < 0.5:
+                return math.inf
+            return self.expected_yield(keyword) + EXPLORATION * math.sqrt(log_total / pulls)
+
+        ranked = sorted(keywords, key=lambda keyword: (-ucb(keyword), keywords.index(keyword)))
+        chosen = ranked[:k]
+        logger.info(f"Planned keywords: {', '.join(chosen)}")
+        return chosen
+
+    # Feedback
+
+    def unseen(self, items: Iterable[NewsItem], keyword: Optional[str] = None) -> List[NewsItem]:
+        """
+        Items not used in an earlier run or found earlier in this one
+
+        Args:
+            keyword: Credited with articles built from the items; None for
+                items that did not come from a search call (the news store)
+        """
+        fresh = []
+        for item in items:
+            url = item.url
+            if not url or url in self.seen or url in self._run_sources:
+                continue
+            self._run_sources[url] = keyword
+            fresh.append(item)
+        return fresh
+
+    def record_search(self, keyword: str, items: List[NewsItem], seconds: float = 0.0) -> List[NewsItem]:
+        """
+        Record one search API call and return only the items not seen before
+        """
+        fresh = self.unseen(items, keyword)
+
+        entry = self._entry(keyword)
+        entry['pulls'] += 1
+        entry['found'] += len(items)
+        entry['new'] += len(fresh)
+        entry['seconds'] += seconds
+        logger.info(f"Keyword {keyword!r}: {len(items)} found, {len(fresh)} new")
+        return fresh
+
+    def record_article(self, news_items: Iterable[NewsItem], indexable: bool) -> None:
+        """Credit the keywords whose items went into a published article"""
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        for item in news_items:
+            url = item.url
+            keyword = self._run_sources.get(url)
+            if url:
+                self.seen[url] = now
+            if keyword is None:
+                continue
+            entry = self._entry(keyword)
+            entry['used'] += 1
+            if indexable:
+                entry['indexed'] += 1
+
+    def status(self) -> List[Dict[str, Any]]:
+        rows = []
+        for keyword, entry in self.stats.items():
+            pulls = entry['pulls'] or 1.0
+            rows.append({
+                'keyword': keyword,
+                'pulls': round(entry['pulls'], 2),
+                'new_per_call': round(entry['new'] / pulls, 2),
+                'pass_rate': round((entry['indexed'] + 1) / (entry['used'] + 2), 2),
+                'seconds_per_call': round(entry['seconds'] / pulls, 2),
+                'expected_yield': round(self.expected_yield(keyword), 3),
+            })
+        return sorted(rows, key=lambda row: -row['expected_yield'])
+
+
+def main():
+    from daily_content_generator import Config
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'status':
+        print(__doc__)
+        return 1
+
+    config = Config.from_env()
+    planner = TopicPlanner(Path(config.ops_dir) / 'index')
+    print(json.dumps(planner.status(), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -99,7 +99,7 @@ export default async function BlogPostPage({
 
         <div
           className="prose prose-lg mt-8 max-w-none"
-          dangerouslySetInnerHTML={{ __html: markdownToHtml(post.content) }}
+          dangerouslySetInnerHTML={{ __html: post.html ?? markdownToHtml(post.content) }}
         />
 
         <div className="mt-12 rounded-lg bg-primary-50 p-6">
@@ -6,6 +6,15 @@ import fs from 'fs';
 import path from 'path';
 
 const CONTENT_DIR = path.join(process.cwd(), 'src', 'content', 'posts');
+// Written by scripts/content_layout.py: directory slug -> relative post directory
+const SLUG_INDEX = path.join(CONTENT_DIR, 'slug-index.json');
+const SHARD_RE = /^\d{4}$/;
+
+export interface TocEntry {
+  level: number;
+  text: string;
+  id: string;
+}
 
 export interface Post {
   slug: string;
@@ -15,6 +24,10 @@ export interface Post {
   category: string;
   tags: string[];
   content: string;
+  /** Sanitized HTML pre-rendered at publish time (index.html), if available */
+  html?: string;
+  readingTime?: number;
+  toc?: TocEntry[];
 }
 
 export interface PostListItem {
@@ -74,18 +87,78 @@ function parseFrontmatter(content: string) {
 }
 
 /**
- * Get all post directories
+ * Read publish-time artifacts (index.html + meta.json) next to index.mdx
+ */
+function readPrerendered(postDir: string) {
+  const htmlPath = path.join(postDir, 'index.html');
+  const metaPath = path.join(postDir, 'meta.json');
+
+  if (!fs.existsSync(htmlPath) || !fs.existsSync(metaPath)) {
+    return null;
+  }
+
+  const meta = JSON.parse(fs.readFileSync(metaPath, 'utf-8'));
+  return {
+    html: fs.readFileSync(htmlPath, 'utf-8'),
+    excerpt: meta.excerpt as string | undefined,
+    readingTime: meta.reading_time as number | undefined,
+    toc: (meta.toc || []) as TocEntry[],
+  };
+}
+
+/**
+ * Subdirectories of a directory
+ */
+function listDirs(dir: string): string[] {
+  return fs.readdirSync(dir, { withFileTypes: true })
+    .filter(dirent => dirent.isDirectory())
+    .map(dirent => dirent.name);
+}
+
+/**
+ * Get all post directories, relative to CONTENT_DIR
+ *
+ * Supports both the flat layout (posts/<slug>) and the sharded layout
+ * (posts/<YYYY>/<MM>/<slug>). Shards are resolved through slug-index.json
+ * when present; top-level post directories are always listed so hand-added
+ * posts show up without an index update.
  */
 function getPostDirs(): string[] {
   if (!fs.existsSync(CONTENT_DIR)) {
     return [];
   }
 
-  return fs.readdirSync(CONTENT_DIR, { withFileTypes: true })
-    .filter(dirent => dirent.isDirectory())
-    .map(dirent => dirent.name)
-    .sort()
-    .reverse(); // Newest first
+  const dirs = new Set<string>();
+  const topLevel = listDirs(CONTENT_DIR);
+
+  for (const name of topLevel) {
+    if (!SHARD_RE.test(name)) dirs.add(name);
+  }
+
+  if (fs.existsSync(SLUG_INDEX)) {
+    const index = JSON.parse(fs.readFileSync(SLUG_INDEX, 'utf-8'));
+    for (const relative of Object.values(index.posts || {}) as string[]) {
+      dirs.add(relative);
+    }
+  } else {
+    for (const year of topLevel.filter(name => SHARD_RE.test(name))) {
+      for (const month of listDirs(path.join(CONTENT_DIR, year))) {
+        for (const name of listDirs(path.join(CONTENT_DIR, year, month))) {
+          dirs.add(path.posix.join(year, month, name));
+        }
+      }
+    }
+  }
+
+  // Newest first (directory names start with YYYY-MM-DD)
+  return Array.from(dirs).sort((a, b) => path.basename(b).localeCompare(path.basename(a)));
+}
+
+/**
+ * Public URL slug from a post directory (date-slug format)
+ */
+function dirToSlug(dir: string): string {
+  return path.basename(dir).split('-').slice(3).join('-');
 }
 
 /**
@@ -100,7 +173,7 @@ export function getAllPostSlugs(): string[] {
     if (!fs.existsSync(filePath)) continue;
 
     // Extract slug from directory name (date-slug format)
-    const slug = dir.split('-').slice(3).join('-');
+    const slug = dirToSlug(dir);
     slugs.push(slug);
   }
 
@@ -123,7 +196,7 @@ export function getAllPosts(): PostListItem[] {
     const { frontmatter } = parseFrontmatter(content);
 
     // Extract slug from directory name (date-slug format)
-    const slug = dir.split('-').slice(3).join('-');
+    const slug = dirToSlug(dir);
 
     posts.push({
       slug: frontmatter.slug || slug,
@@ -144,7 +217,7 @@ export function getPostBySlug(slug: string): Post | null {
   const dirs = getPostDirs();
 
   for (const dir of dirs) {
-    const dirSlug = dir.split('-').slice(3).join('-');
+    const dirSlug = dirToSlug(dir);
 
     if (dirSlug === slug) {
       const filePath = path.join(CONTENT_DIR, dir, 'index.mdx');
@@ -153,15 +226,19 @@ export function getPostBySlug(slug: string): Post | null {
 
       const content = fs.readFileSync(filePath, 'utf-8');
       const { frontmatter, body } = parseFrontmatter(content);
+      const prerendered = readPrerendered(path.join(CONTENT_DIR, dir));
 
       return {
         slug,
         title: frontmatter.title || 'Untitled',
         date: frontmatter.date || new Date().toISOString().split('T')[0],
-        excerpt: frontmatter.excerpt || '',
+        excerpt: frontmatter.excerpt || prerendered?.excerpt || '',
         category: frontmatter.category || 'Cricket',
         tags: frontmatter.tags || [],
         content: body,
+        html: prerendered?.html,
+        readingTime: prerendered?.readingTime,
+        toc: prerendered?.toc,
       };
     }
   }